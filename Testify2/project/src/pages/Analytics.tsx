@@ -25,36 +25,117 @@ type TestDetails = {
   issues?: string[];
 };
 
+type LiveEvent = {
+  id: string;
+  type: string;
+  data: any;
+};
+
+const LIVE_EVENT_TYPES = ['run_started', 'test_started', 'step_executed', 'selector_chosen', 'test_passed', 'test_failed', 'run_finished'];
+const MAX_LIVE_EVENTS = 50;
+const LOG_POLL_INTERVAL_MS = 3000;
+const MAX_LOG_CHARS = 200000;
+
+const describeEvent = (event: LiveEvent) => {
+  const { data } = event;
+  switch (event.type) {
+    case 'run_started':
+      return `Run started${data.total ? ` (${data.total} tests)` : ''}`;
+    case 'test_started':
+      return `Started: ${data.test} (attempt ${data.attempt})`;
+    case 'step_executed':
+      return `${data.test} - step ${data.step} ${data.action} took ${(data.duration * 1000).toFixed(0)} ms`;
+    case 'selector_chosen':
+      return `${data.test} - step ${data.step} matched ${data.selector}`;
+    case 'test_passed':
+      return `Passed: ${data.test}`;
+    case 'test_failed':
+      return `Failed: ${data.test} - ${data.error}`;
+    case 'run_finished':
+      return `Run finished: ${data.passed}/${data.total} passed`;
+    default:
+      return event.type;
+  }
+};
+
 function Analytics() {
   const navigate = useNavigate();
   const [viewMode, setViewMode] = useState<'log' | 'formatted'>('log');
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [analyticsData, setAnalyticsData] = useState<any>(null);
+  const [liveEvents, setLiveEvents] = useState<LiveEvent[]>([]);
+  const [logText, setLogText] = useState<string | null>(null);
+  const [logOffset, setLogOffset] = useState<number | null>(null);
 
-  useEffect(() => {
-    const fetchAnalyticsData = async () => {
-      try {
+  const fetchAnalyticsData = async (showLoading = true) => {
+    try {
+      if (showLoading) {
         setLoading(true);
-        console.log("Fetching analytics data...");
-        
-        const response = await axios.get('http://localhost:5000/api/get-analytics');
-        
-        console.log("API Response:", response.data);
-        setAnalyticsData(response.data);
-        setError(null);
-      } catch (err) {
-        console.error('Error fetching analytics data:', err);
-        setError('Failed to fetch analytics data. Please try again later.');
-      } finally {
-        setLoading(false);
       }
-    };
+      console.log("Fetching analytics data...");
+      
+      const response = await axios.get('http://localhost:5000/api/get-analytics');
+      
+      console.log("API Response:", response.data);
+      setAnalyticsData(response.data);
+      setError(null);
+    } catch (err) {
+      console.error('Error fetching analytics data:', err);
+      setError('Failed to fetch analytics data. Please try again later.');
+    } finally {
+      setLoading(false);
+    }
+  };
 
-  
+  useEffect(() => {
     fetchAnalyticsData();
   }, []);
 
+  // Follow live executor events and refresh the report when a run finishes
+  useEffect(() => {
+    const source = new EventSource('http://localhost:5000/api/events');
+    const handleEvent = (message: MessageEvent) => {
+      const event = { id: message.lastEventId, type: message.type, data: JSON.parse(message.data) };
+      setLiveEvents((prev) => [event, ...prev].slice(0, MAX_LIVE_EVENTS));
+      if (event.type === 'run_finished') {
+        fetchAnalyticsData(false);
+      }
+    };
+    LIVE_EVENT_TYPES.forEach((type) => source.addEventListener(type, handleEvent));
+    return () => source.close();
+  }, []);
+
+  useEffect(() => {
+    if (analyticsData) {
+      setLogText(analyticsData.logContent ?? null);
+      setLogOffset(analyticsData.logOffset ?? null);
+    }
+  }, [analyticsData]);
+
+  // Follow the execution log from the last offset instead of refetching it whole
+  useEffect(() => {
+    if (viewMode !== 'log' || logOffset === null) {
+      return;
+    }
+    let offset = logOffset;
+    const timer = setInterval(async () => {
+      try {
+        const response = await axios.get('http://localhost:5000/api/logs', { params: { since: offset } });
+        const chunk = response.data;
+        if (chunk.reset) {
+          setLogText(chunk.content);
+        } else if (chunk.content) {
+          setLogText((prev) => ((prev || '') + chunk.content).slice(-MAX_LOG_CHARS));
+        }
+        offset = chunk.nextOffset;
+      } catch (err) {
+        console.error('Error following log:', err);
+      }
+    }, LOG_POLL_INTERVAL_MS);
+    return () => clearInterval(timer);
+  }, [viewMode, logOffset]);
+
   // useEffect(() => {
   //   // Comment this to use mock data instead
   //   // fetchAnalyticsData();
@@ -75,7 +156,7 @@ function Analytics() {
   //   setLoading(false);
   // }, []);
 
-  const logContent = analyticsData?.logContent || `NA`;
+  const logContent = logText || analyticsData?.logContent || `NA`;
 
   // temp testing
   const formattedContent = analyticsData ? {
@@ -222,6 +303,28 @@ function Analytics() {
             </div>
           </div>
 
+          {liveEvents.length > 0 && (
+            <div className="bg-[#1a1a1a] rounded-xl border border-gray-800 p-6 mb-6">
+              <h2 className="text-xl font-semibold text-white mb-4">Live Activity</h2>
+              <ul className="space-y-1 max-h-48 overflow-y-auto font-mono text-sm">
+                {liveEvents.map((event) => (
+                  <li
+                    key={event.id}
+                    className={
+                      event.type === 'test_failed'
+                        ? 'text-red-400'
+                        : event.type === 'test_passed'
+                        ? 'text-green-400'
+                        : 'text-gray-300'
+                    }
+                  >
+                    {describeEvent(event)}
+                  </li>
+                ))}
+              </ul>
+            </div>
+          )}
+
           {loading ? (
             <div className="flex items-center justify-center h-64">
               <div className="flex flex-col items-center">
@@ -29,6 +29,7 @@ function Tests() {
   const [attachedFiles, setAttachedFiles] = useState<File[]>([]);
   const [isLoading, setIsLoading] = useState<boolean>(false);
   const [testResults, setTestResults] = useState<TestResults | null>(null);
+  const [generatedJobId, setGeneratedJobId] = useState<string | null>(null);
 
   const handleFileUpload = (event: ChangeEvent<HTMLInputElement>) => {
     const files = event.target.files;
@@ -46,6 +47,22 @@ function Tests() {
     setWebsiteUrl('');
     setAttachedFiles([]);
     setTestResults(null);
+    setGeneratedJobId(null);
+  };
+
+  // Jobs run in the background, so poll until one finishes
+  const pollJob = async (jobId: string) => {
+    let job: TestResults = { status: 'queued' };
+    while (['queued', 'running'].includes(job.status)) {
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+      const jobResponse = await fetch(`http://localhost:5000/api/jobs/${jobId}`);
+      if (!jobResponse.ok) {
+        throw new Error('Failed to fetch job status');
+      }
+      job = await jobResponse.json();
+      setTestResults(job);
+    }
+    return job;
   };
 
   const handleGenerateTests = async () => {
@@ -74,6 +91,10 @@ function Tests() {
 
       const data = await response.json();
       setTestResults(data);
+      const job = await pollJob(data.jobId);
+      if (job.status === 'completed') {
+        setGeneratedJobId(data.jobId);
+      }
     } catch (error) {
       console.error('Error generating tests:', error);
     } finally {
@@ -81,6 +102,29 @@ function Tests() {
     }
   };
 
+  // Re-executes the tests a generation job produced on the server's warm browser pool
+  const handleRerunTests = async () => {
+    if (!generatedJobId) return;
+    try {
+      setIsLoading(true);
+      const response = await fetch(`http://localhost:5000/api/jobs/${generatedJobId}/rerun`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ websiteUrl }),
+      });
+      if (!response.ok) {
+        throw new Error('Failed to rerun tests');
+      }
+      const data = await response.json();
+      setTestResults(data);
+      await pollJob(data.jobId);
+    } catch (error) {
+      console.error('Error rerunning tests:', error);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
   return (
     <div className="min-h-screen bg-[#111] flex">
       {/* Sidebar */}
@@ -227,6 +271,17 @@ function Tests() {
                 >
                   {isLoading ? 'Generating...' : 'Generate Tests'}
                 </button>
+                {generatedJobId && (
+                  <button
+                    onClick={handleRerunTests}
+                    disabled={isLoading}
+                    className={`px-6 py-2 bg-[#222] text-gray-300 rounded-lg border border-gray-800 transition-colors ${
+                      isLoading ? 'opacity-70 cursor-not-allowed' : 'hover:border-[#a855f7]'
+                    }`}
+                  >
+                    Run Again
+                  </button>
+                )}
                 <button 
                   onClick={handleClear}
                   className="px-6 py-2 bg-[#222] text-gray-300 rounded-lg border border-gray-800 hover:border-[#a855f7] transition-colors"
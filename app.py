@@ -1,171 +1,390 @@
-from flask import Flask, request, jsonify
-from werkzeug.utils import secure_filename
-from vw import run_test_generation_pipeline
-import os
-from docx import Document
-import sys
-from flask_cors import CORS
-import json
-
-app = Flask(__name__)
-CORS(app)
-
-UPLOAD_FOLDER = './uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-
-LATEST_REPORT_PATH = None
-
-def update_latest_report_path(path):
-    global LATEST_REPORT_PATH
-    LATEST_REPORT_PATH = path
-    print(f"Updated latest report path: {LATEST_REPORT_PATH}")
-
-remote_file = None
-
-@app.route('/api/generate-tests', methods=['POST'])
-def generate_tests():
-    try:
-        website_url = request.form.get('websiteUrl')
-        document_text = request.form.get('documentText')
-
-        def text_to_docx(text, file_name):
-            doc = Document()
-            doc.add_paragraph(text)
-            doc.save(file_name)
-        
-        text_to_docx(document_text, os.path.join(app.config['UPLOAD_FOLDER'], 'output.docx'))
-        run_test_generation_pipeline(os.path.join(app.config['UPLOAD_FOLDER'], 'output.docx'),output_dir='.',gemini_key="Your API Key here")
-
-        # import argparse
-        # parser = argparse.ArgumentParser(description="Run automated Playwright tests")
-        # parser.add_argument("--test-file", default="playwright_tests.json", help="Path to test cases JSON file")
-        # parser.add_argument("--headless", action="store_true", default=True, help="Run in headless mode")
-        # parser.add_argument("--timeout", type=int, default=5000, help="Timeout in milliseconds")
-        # parser.add_argument("--retries", type=int, default=2, help="Number of retries for failed tests")
-        # parser.add_argument("--base-url", default=website_url, help="Base URL for tests")
-        # args = parser.parse_args()
-    
-        # # Load and execute test cases
-        # print(f"🚀 Starting automated test execution")
-        # print(f"📋 Loading test cases from: {args.test_file}")
-        
-        # if __name__ == "__main__":
-        #     app.run(debug=True, use_reloader=False, port=5000)
-        #     text = document_text
-        #     file_name = "output.docx"
-        #     text_to_docx(text, file_name)
-        #     print(f"Text has been converted to {file_name}")
-
-        # Process attached files
-
-        # Mock test generation logic
-        # test_results = {
-        #     "websiteUrl": website_url,
-        #     "documentText": document_text,
-        #     "attachedFiles": attached_files,
-        #     "generatedTests": [
-        #         {
-        #             "testName": "Test Home Page Load",
-        #             "description": "Verify that the home page loads successfully.",
-        #             "status": "Pending"
-        #         },
-        #         {
-        #             "testName": "Test Login Functionality",
-        #             "description": "Verify that the login functionality works as expected.",
-        #             "status": "Pending"
-        #         }
-        #     ]
-        # }
-
-        get_analytics()
-        return True
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route('/api/get-analytics', methods=['GET'])
-def get_analytics():
-    try:
-        global LATEST_REPORT_PATH
-        
-        if not LATEST_REPORT_PATH:
-            import glob
-            report_files = glob.glob("test_report_*.json")
-            if not report_files:
-                return jsonify({"error": "No test reports found"}), 404
-                
-            LATEST_REPORT_PATH = max(report_files, key=os.path.getmtime)
-            print(f"Using most recent report: {LATEST_REPORT_PATH}")
-        
-        if os.path.exists(LATEST_REPORT_PATH):
-            with open(LATEST_REPORT_PATH, 'r') as f:
-                report_data = json.load(f)
-                
-            return jsonify({
-                "summary": {
-                    "totalTests": report_data["summary"]["total"],
-                    "passedTests": report_data["summary"]["passed"],
-                    "failedTests": report_data["summary"]["failed"],
-                    "lastGenerated": report_data["summary"]["timestamp"],
-                    "sourceFile": "playwright_tests.json",
-                    "baseUrl": "https://krishi-mitra-front.vercel.app/",
-                    "status": "Test execution completed"
-                },
-                "tests": format_tests(report_data["tests"]),
-                "observations": generate_observations(report_data),
-                "logContent": get_log_content()
-            })
-        else:
-            return jsonify({
-                "error": f"Test report file not found: {LATEST_REPORT_PATH}"
-            }), 404
-            
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return jsonify({
-            "error": str(e)
-        }), 500
-
-def format_tests(tests_data):
-    """Format the test data for frontend display"""
-    formatted_tests = []
-    
-    for test in tests_data:
-        formatted_test = {
-            "name": test.get("name"),
-            "status": "Passed" if test.get("status") == "passed" else "Failed",
-            "steps": [f"Step {i+1}: Executed" for i in range(test.get("steps_executed", 0))],
-            "issues": []
-        }
-        
-        if test.get("error"):
-            formatted_test["issues"] = [f"Error: {test.get('error')}"]
-            
-        formatted_tests.append(formatted_test)
-        
-    return formatted_tests
-
-def generate_observations(report_data):
-    """Generate observations based on test results"""
-    observations = []
-    
-    if report_data["summary"]["failed"] > 0:
-        observations.append(f"{report_data['summary']['failed']} tests failed out of {report_data['summary']['total']}")
-    
-    if report_data["summary"]["passed"] == report_data["summary"]["total"]:
-        observations.append("All tests passed successfully")
-        
-    return observations
-
-def get_log_content():
-    """Get contents of the test execution log"""
-    try:
-        with open("test_execution.log", "r") as f:
-            return f.read()
-    except:
-        return "No log content available"
-
-if __name__ == '__main__':
-    app.run(debug=True, use_reloader=False, port=5000)
+from flask import Flask, Response, request, jsonify, stream_with_context
+from werkzeug.utils import secure_filename
+from vw import run_test_generation_pipeline
+from testing import apply_base_url, execute_test_cases, load_test_cases
+from browser_pool import BrowserPool
+import os
+from docx import Document
+import sys
+from flask_cors import CORS
+import json
+from jobs import JobManager
+from events import EVENT_BUS, format_sse
+from report_store import ReportStore, summarize_timing
+from log_reader import DEFAULT_CHUNK_BYTES, DEFAULT_TAIL_LINES, read_lines, read_range, tail_lines
+from datetime import datetime
+import hashlib
+import queue
+import threading
+
+app = Flask(__name__)
+CORS(app)
+
+UPLOAD_FOLDER = './uploads'
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+
+LATEST_REPORT_PATH = None
+
+def update_latest_report_path(path):
+    global LATEST_REPORT_PATH
+    LATEST_REPORT_PATH = path
+    print(f"Updated latest report path: {LATEST_REPORT_PATH}")
+
+MAX_CONCURRENT_JOBS = int(os.environ.get("TESTIFY_MAX_JOBS", "2"))
+JOB_MANAGER = JobManager(max_workers=MAX_CONCURRENT_JOBS)
+JOBS_FOLDER = './jobs'
+SSE_HEARTBEAT_SECONDS = 15
+REPORT_STORE = ReportStore()
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+LOG_FILE = "test_execution.log"
+ANALYTICS_CACHE = {"key": None, "etag": None, "body": None}
+ANALYTICS_CACHE_LOCK = threading.Lock()
+BROWSER_POOL_SIZE = int(os.environ.get("TESTIFY_BROWSER_POOL", str(MAX_CONCURRENT_JOBS)))
+BROWSER_POOL = BrowserPool(BROWSER_POOL_SIZE) if BROWSER_POOL_SIZE > 0 else None
+
+@app.route('/api/generate-tests', methods=['POST'])
+def generate_tests():
+    try:
+        website_url = request.form.get('websiteUrl')
+        document_text = request.form.get('documentText')
+
+        if not document_text:
+            return jsonify({"error": "documentText is required"}), 400
+
+        def text_to_docx(text, file_name):
+            doc = Document()
+            doc.add_paragraph(text)
+            doc.save(file_name)
+
+        def run_job(job):
+            job_dir = os.path.join(JOBS_FOLDER, job.id)
+            os.makedirs(job_dir, exist_ok=True)
+            doc_path = os.path.join(job_dir, 'output.docx')
+            text_to_docx(document_text, doc_path)
+            return run_test_generation_pipeline(
+                doc_path,
+                output_dir=job_dir,
+                gemini_key="Your API Key here",
+                base_url=website_url or None,
+                progress=job.update_progress,
+                cancel_event=job.cancel_event,
+                on_event=job_event_handler(job),
+                browser_pool=BROWSER_POOL
+            )
+
+        job = JOB_MANAGER.submit(
+            website_url or "Test generation",
+            run_job,
+            on_complete=lambda job: update_latest_report_path(job.result)
+        )
+        return jsonify({"jobId": job.id, "status": job.status}), 202
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def job_event_handler(job):
+    """Return an executor on_event callback that publishes events for a job."""
+    def on_event(event_type, data):
+        EVENT_BUS.publish(event_type, {"jobId": job.id, **data})
+        if event_type == "test_started":
+            job.update_progress("execute", f"Running {data['test']}")
+    return on_event
+
+@app.route('/api/jobs/<job_id>/rerun', methods=['POST'])
+def rerun_job(job_id):
+    """Run the Playwright tests a finished job generated again, on a warm pooled browser."""
+    test_file = os.path.join(JOBS_FOLDER, secure_filename(job_id), 'playwright_tests.json')
+    if not os.path.exists(test_file):
+        return jsonify({"error": f"No generated tests for job: {job_id}"}), 404
+    website_url = (request.get_json(silent=True) or {}).get('websiteUrl')
+
+    def run_job(job):
+        job.update_progress("execute", "Executing tests")
+        test_cases = load_test_cases(test_file)
+        if test_cases and website_url:
+            for test in test_cases.get("tests", []):
+                apply_base_url(test, website_url)
+        return execute_test_cases(
+            test_cases,
+            headless=True,
+            cancel_event=job.cancel_event,
+            on_event=job_event_handler(job),
+            suite=test_file,
+            pool=BROWSER_POOL
+        )
+
+    job = JOB_MANAGER.submit(
+        f"Rerun {job_id}",
+        run_job,
+        on_complete=lambda job: update_latest_report_path(job.result)
+    )
+    return jsonify({"jobId": job.id, "status": job.status}), 202
+
+@app.route('/api/pool', methods=['GET'])
+def get_pool_status():
+    if not BROWSER_POOL:
+        return jsonify({"size": 0})
+    return jsonify(BROWSER_POOL.status())
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify({
+        "maxConcurrentJobs": JOB_MANAGER.max_workers,
+        "jobs": [job.to_dict() for job in JOB_MANAGER.list()]
+    })
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = JOB_MANAGER.get(job_id)
+    if not job:
+        return jsonify({"error": f"Job not found: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = JOB_MANAGER.cancel(job_id)
+    if not job:
+        return jsonify({"error": f"Job not found: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Stream live executor events to the dashboard as Server-Sent Events."""
+    job_id = request.args.get('jobId')
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    subscriber = EVENT_BUS.subscribe(int(last_event_id) if last_event_id and last_event_id.isdigit() else None)
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = subscriber.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                if job_id and event["data"].get("jobId") != job_id:
+                    continue
+                yield format_sse(event)
+        finally:
+            EVENT_BUS.unsubscribe(subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def import_existing_reports():
+    """Index JSON reports written before the store existed or by runs it did not see."""
+    imported = REPORT_STORE.import_json_reports()
+    if imported:
+        print(f"Imported {imported} existing reports into the report store")
+
+def find_latest_report():
+    """Return the summary row of the latest report."""
+    if LATEST_REPORT_PATH:
+        report = REPORT_STORE.find_report(path=LATEST_REPORT_PATH)
+        if report:
+            return report
+        if os.path.exists(LATEST_REPORT_PATH):
+            REPORT_STORE.add_report_file(LATEST_REPORT_PATH)
+            return REPORT_STORE.find_report(path=LATEST_REPORT_PATH)
+    return REPORT_STORE.find_report()
+
+def file_signature(path):
+    """Return (mtime, size) for a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except (OSError, TypeError):
+        return None
+
+def analytics_cache_key(report):
+    """Identify an analytics payload by report identity and the mtimes of its inputs."""
+    return (report["id"], report["path"], file_signature(report["path"]), file_signature(LOG_FILE))
+
+def parse_time_arg(name):
+    """Parse an ISO-8601 query argument into epoch seconds."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' timestamp: {value}")
+
+def parse_page_args():
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('perPage', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    return page, per_page
+
+@app.route('/api/get-analytics', methods=['GET'])
+def get_analytics():
+    try:
+        report = find_latest_report()
+        if not report:
+            return jsonify({"error": "No test reports found"}), 404
+
+        key = analytics_cache_key(report)
+        with ANALYTICS_CACHE_LOCK:
+            cached = dict(ANALYTICS_CACHE) if ANALYTICS_CACHE["key"] == key else None
+
+        if not cached:
+            report_data = REPORT_STORE.get_report(report["id"])
+            body = build_analytics_payload(report_data)
+            cached = {"key": key, "etag": hashlib.sha1(repr(key).encode("utf-8")).hexdigest(), "body": body}
+            with ANALYTICS_CACHE_LOCK:
+                ANALYTICS_CACHE.update(cached)
+
+        if request.if_none_match.contains(cached["etag"]):
+            response = Response(status=304)
+        else:
+            response = Response(cached["body"], mimetype='application/json')
+        response.set_etag(cached["etag"])
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({
+            "error": str(e)
+        }), 500
+
+def build_analytics_payload(report_data):
+    """Serialize the analytics response body for a report."""
+    log_tail = get_log_content()
+    return json.dumps({
+        "summary": {
+            "totalTests": report_data["summary"]["total"],
+            "passedTests": report_data["summary"]["passed"],
+            "failedTests": report_data["summary"]["failed"],
+            "lastGenerated": report_data["summary"]["timestamp"],
+            "sourceFile": "playwright_tests.json",
+            "baseUrl": "https://krishi-mitra-front.vercel.app/",
+            "status": "Test execution completed"
+        },
+        "tests": format_tests(report_data["tests"]),
+        "observations": generate_observations(report_data),
+        "timing": summarize_timing(report_data["tests"]),
+        "logContent": log_tail["content"] or "No log content available",
+        "logOffset": log_tail["nextOffset"]
+    })
+
+@app.route('/api/logs', methods=['GET'])
+def get_logs():
+    """Page through the execution log without reading the whole file.
+
+    ?tail=N returns the last N lines, ?line=&lines= pages by line number,
+    and ?since=<offset>&limit=<bytes> reads from a byte offset so clients
+    can follow the log using the nextOffset of their previous read.
+    """
+    try:
+        if 'line' in request.args:
+            return jsonify(read_lines(
+                LOG_FILE,
+                request.args.get('line', 0, type=int),
+                request.args.get('lines', DEFAULT_TAIL_LINES, type=int)
+            ))
+        if 'since' in request.args or 'offset' in request.args:
+            offset = request.args.get('since', request.args.get('offset', 0, type=int), type=int)
+            return jsonify(read_range(LOG_FILE, offset, request.args.get('limit', DEFAULT_CHUNK_BYTES, type=int)))
+        return jsonify(tail_lines(LOG_FILE, request.args.get('tail', DEFAULT_TAIL_LINES, type=int)))
+    except OSError as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/reports', methods=['GET'])
+def list_reports():
+    """Paginated report history, filterable by suite, status and time range."""
+    try:
+        page, per_page = parse_page_args()
+        reports, total = REPORT_STORE.list_reports(
+            page=page,
+            per_page=per_page,
+            suite=request.args.get('suite'),
+            status=request.args.get('status'),
+            since=parse_time_arg('since'),
+            until=parse_time_arg('until')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"page": page, "perPage": per_page, "total": total, "reports": reports})
+
+@app.route('/api/reports/<int:report_id>', methods=['GET'])
+def get_report(report_id):
+    report_data = REPORT_STORE.get_report(report_id)
+    if not report_data:
+        return jsonify({"error": f"Report not found: {report_id}"}), 404
+    return jsonify(report_data)
+
+@app.route('/api/tests', methods=['GET'])
+def query_tests():
+    """Paginated test results across reports, filterable by status, name and time range."""
+    try:
+        page, per_page = parse_page_args()
+        tests, total = REPORT_STORE.query_tests(
+            page=page,
+            per_page=per_page,
+            status=request.args.get('status'),
+            name=request.args.get('name'),
+            since=parse_time_arg('since'),
+            until=parse_time_arg('until'),
+            report_id=request.args.get('reportId', type=int)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"page": page, "perPage": per_page, "total": total, "tests": tests})
+
+def format_tests(tests_data):
+    """Format the test data for frontend display"""
+    formatted_tests = []
+    
+    for test in tests_data:
+        formatted_test = {
+            "name": test.get("name"),
+            "status": "Passed" if test.get("status") == "passed" else "Failed",
+            "steps": [f"Step {i+1}: Executed" for i in range(test.get("steps_executed", 0))],
+            "issues": [],
+            "duration": test.get("duration")
+        }
+        
+        timed_steps = [step for step in test.get("steps", []) if step.get("duration") is not None]
+        if timed_steps:
+            formatted_test["steps"] = [
+                f"Step {step['index']}: {step['action']} ({step['duration'] * 1000:.0f} ms)"
+                for step in timed_steps
+            ]
+        
+        if test.get("error"):
+            formatted_test["issues"] = [f"Error: {test.get('error')}"]
+            
+        formatted_tests.append(formatted_test)
+        
+    return formatted_tests
+
+def generate_observations(report_data):
+    """Generate observations based on test results"""
+    observations = []
+    
+    if report_data["summary"]["failed"] > 0:
+        observations.append(f"{report_data['summary']['failed']} tests failed out of {report_data['summary']['total']}")
+    
+    if report_data["summary"]["passed"] == report_data["summary"]["total"]:
+        observations.append("All tests passed successfully")
+        
+    return observations
+
+def get_log_content():
+    """Get the tail of the test execution log and the offset to follow it from"""
+    try:
+        return tail_lines(LOG_FILE, DEFAULT_TAIL_LINES)
+    except OSError:
+        return {"content": "", "nextOffset": 0}
+
+import_existing_reports()
+
+if __name__ == '__main__':
+    app.run(debug=True, use_reloader=False, port=5000)
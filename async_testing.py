@@ -0,0 +1,545 @@
+import asyncio
+import time
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from flaky_history import FLAKINESS_HISTORY_FILE
+from network_filter import PLACEHOLDER_IMAGE, response_headers
+from report_store import REPORT_DB
+from scheduler import DurationScheduler
+from selector_cache import SelectorCache, SELECTOR_CACHE_FILE
+from session_state import SESSION_STATE_FILE, is_login_page, login_landing_url, login_step_count
+from testing import (
+    DOCUMENT_REPLACED_SCRIPT, DOM_OBSERVER_SCRIPT, DOM_QUIET_MS, LOAD_STATES, MARK_WAIT_START_SCRIPT,
+    NAVIGATION_TIMING_SCRIPT, PAGE_SETTLED_SCRIPT, SMART_WAIT_TIMEOUT, SelectorResolutionError, emit_event,
+    execution_order, fail_attempt, finish_run, finish_step,
+    is_cancelled, is_form_submit_selector, make_options, new_test_result, record_attempt,
+    record_attempt_duration, run_in_order, save_run_state, skipped_test_result
+)
+
+async def check_text_content(page, selector, expected_text):
+    """Check if text is present in element and raise AssertionError if not."""
+    content = await page.text_content(selector)
+    if expected_text not in content:
+        raise AssertionError(f"Text '{expected_text}' not found in '{content}'")
+    return True
+
+async def check_visibility(page, selector):
+    """Check if element is visible and raise AssertionError if not."""
+    if not await page.is_visible(selector):
+        raise AssertionError(f"Element '{selector}' is not visible")
+    return True
+
+async def try_selectors(page, action_fn, selectors, cache=None, cache_key=None, attempts=None):
+    """Try an async action with multiple selectors until one works."""
+    if not isinstance(selectors, list):
+        selectors = [selectors]
+
+    selectors = [s for s in selectors if s]
+
+    if not selectors:
+        raise ValueError("No valid selectors provided")
+
+    if cache and cache_key:
+        selectors = cache.order(cache_key, selectors)
+
+    errors = []
+    for selector in selectors:
+        attempt_start = time.perf_counter()
+        try:
+            print(f"    🔍 Trying with selector: '{selector}'")
+            await action_fn(selector)
+            print(f"    ✅ Selector worked: '{selector}'")
+            record_attempt(attempts, selector, attempt_start, True)
+            if cache and cache_key:
+                cache.record(cache_key, selector, True)
+            return selector
+        except Exception as e:
+            errors.append(e)
+            print(f"    ⚠️ Failed with selector: '{selector}' - {str(e)}")
+            record_attempt(attempts, selector, attempt_start, False)
+            if cache and cache_key:
+                cache.record(cache_key, selector, False)
+
+    raise SelectorResolutionError(selectors, errors, all(isinstance(e, PlaywrightTimeoutError) for e in errors))
+
+async def race_selectors(page, action_fn, selectors, timeout, cache=None, cache_key=None, attempts=None):
+    """Wait for all candidate selectors concurrently and act on the first that matches."""
+    if not isinstance(selectors, list):
+        selectors = [selectors]
+
+    selectors = [s for s in selectors if s]
+
+    if not selectors:
+        raise ValueError("No valid selectors provided")
+
+    if cache and cache_key:
+        selectors = cache.order(cache_key, selectors)
+
+    print(f"    🏁 Racing {len(selectors)} selectors")
+    race_start = time.perf_counter()
+    waits = {
+        asyncio.ensure_future(page.wait_for_selector(s, state="attached", timeout=timeout)): s
+        for s in selectors
+    }
+    pending = set(waits)
+    winner = None
+    errors = []
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    candidate = waits[task]
+                    if winner is None or selectors.index(candidate) < selectors.index(winner):
+                        winner = candidate
+                else:
+                    errors.append(task.exception())
+    finally:
+        for task in pending:
+            task.cancel()
+
+    record_attempt(attempts, "race", race_start, winner is not None)
+    if winner is None:
+        if cache and cache_key:
+            for selector in selectors:
+                cache.record(cache_key, selector, False)
+        raise SelectorResolutionError(selectors, errors, all(isinstance(e, PlaywrightTimeoutError) for e in errors))
+
+    remaining = [s for s in selectors if s != winner]
+    return await try_selectors(page, action_fn, [winner] + remaining, cache, cache_key, attempts)
+
+async def collect_navigation_timing(page):
+    """Read page-load metrics for the current document from the Performance API."""
+    try:
+        return await page.evaluate(NAVIGATION_TIMING_SCRIPT)
+    except Exception as e:
+        print(f"    ⚠️ Could not read navigation timing: {e}")
+        return None
+
+async def watch_dom(page):
+    """Start tracking DOM mutations on the page and return its current URL."""
+    try:
+        await page.evaluate(DOM_OBSERVER_SCRIPT)
+    except Exception as e:
+        print(f"    ⚠️ Could not watch DOM changes: {e}")
+    return page.url
+
+async def document_replaced(page):
+    """Check whether the page loaded a new document since watch_dom, even at the same URL."""
+    try:
+        return await page.evaluate(DOCUMENT_REPLACED_SCRIPT)
+    except Exception:
+        # The execution context is destroyed while a navigation is in progress
+        return True
+
+async def wait_until_settled(page, url_before, timeout=SMART_WAIT_TIMEOUT):
+    """Wait until the page navigates (a new document at the same URL counts) or requests and the DOM have been quiet.
+
+    Returns True if the page navigated.
+    """
+    wait_start = time.perf_counter()
+    replaced = False
+    try:
+        if page.url == url_before:
+            replaced = not await page.evaluate(MARK_WAIT_START_SCRIPT)
+        if not replaced:
+            await page.wait_for_function(
+                PAGE_SETTLED_SCRIPT, arg={"url": url_before, "quiet": DOM_QUIET_MS}, polling=100, timeout=timeout
+            )
+    except PlaywrightTimeoutError:
+        print(f"    ⚠️ Page still changing after {timeout} ms, continuing")
+    except Exception:
+        # The execution context is destroyed when the page navigates mid-wait
+        pass
+
+    navigated = replaced or page.url != url_before or await document_replaced(page)
+    if navigated:
+        remaining = max(1, timeout - int((time.perf_counter() - wait_start) * 1000))
+        try:
+            await page.wait_for_load_state("load", timeout=remaining)
+        except PlaywrightTimeoutError:
+            print(f"    ⚠️ Page did not finish loading within {timeout} ms, continuing")
+        await watch_dom(page)
+    print(f"    ⏳ Page settled in {(time.perf_counter() - wait_start) * 1000:.0f} ms")
+    return navigated
+
+async def click_expecting_response(page, selector, url_part, timeout=SMART_WAIT_TIMEOUT):
+    """Click and wait for a response whose URL contains url_part, without failing if none arrives."""
+    clicked = False
+    try:
+        async with page.expect_response(lambda response: url_part in response.url, timeout=timeout):
+            await page.click(selector)
+            clicked = True
+        print(f"    ✓ Received response matching '{url_part}'")
+    except PlaywrightTimeoutError:
+        if not clicked:
+            raise
+        print(f"    ⚠️ No response matching '{url_part}' within {timeout} ms")
+
+async def resume_session(page, login_steps, session):
+    """Skip a login fixture by opening its landing page with the context's saved session."""
+    landing_url = login_landing_url(login_steps)
+    if not landing_url:
+        return False
+    await page.goto(landing_url)
+    if is_login_page(page.url, login_steps):
+        print("    🔐 Saved session expired, logging in again")
+        session.forget(page.context)
+        return False
+    print(f"    🔐 Reusing logged-in session, skipped {len(login_steps)} login steps")
+    return True
+
+async def save_session(page, session):
+    """Save the storage state of a context that just logged in."""
+    try:
+        session.save(await page.context.storage_state())
+        session.mark(page.context)
+    except Exception as e:
+        print(f"    ⚠️ Could not save session state: {e}")
+
+async def execute_steps(page, test, test_result, options):
+    """Execute the steps of a single test on the given page."""
+    test_name = test["name"]
+    selector_cache = options.get("selector_cache")
+    race = options.get("selector_mode") == "race"
+    smart_wait = options.get("wait_mode") == "smart"
+    session = options.get("session")
+    login_count = login_step_count(test) if session else 0
+    if login_count:
+        session.bind([test])
+    steps_executed = 0
+    test_result["steps"] = []
+    test_result["session_reused"] = False
+
+    if login_count and session.has_session(page.context) and await resume_session(
+        page, test["steps"][:login_count], session
+    ):
+        steps_executed = login_count
+        test_result["steps_executed"] = steps_executed
+        test_result["session_reused"] = True
+
+    # Every test runs in a fresh context, so there is never a shared prefix to reuse
+    test_result["prefix_reused"] = 0
+
+    for step in test["steps"][steps_executed:]:
+        action = step["action"]
+        selector = step.get("selector", "")
+        value = step.get("value", "")
+
+        print(f"  [{test_name}] Step {steps_executed + 1}: {action}")
+        step_start = time.perf_counter()
+
+        cache_key = SelectorCache.make_key(page.url, step) if selector_cache and selector else None
+
+        step_record = {"index": steps_executed + 1, "action": action, "selector": None, "attempts": []}
+
+        async def resolve(action_fn):
+            if race:
+                winner = await race_selectors(
+                    page, action_fn, selector, options["timeout"], selector_cache, cache_key, step_record["attempts"]
+                )
+            else:
+                winner = await try_selectors(page, action_fn, selector, selector_cache, cache_key, step_record["attempts"])
+            step_record["selector"] = winner
+            emit_event(options, "selector_chosen", test=test_name, step=step_record["index"], selector=winner)
+            return winner
+
+        try:
+            if action == "navigate":
+                await page.goto(value)
+                step_record["navigation"] = await collect_navigation_timing(page)
+            elif action == "click":
+                is_form_submit = is_form_submit_selector(selector)
+                response_url = step.get("wait_for_response")
+
+                if smart_wait and is_form_submit:
+                    url_before = await watch_dom(page)
+                if response_url:
+                    await resolve(lambda s: click_expecting_response(page, s, response_url))
+                else:
+                    await resolve(lambda s: page.click(s))
+
+                if smart_wait and is_form_submit:
+                    if await wait_until_settled(page, url_before):
+                        print(f"    ✓ Navigation completed. Current URL: {page.url}")
+                        step_record["navigation"] = await collect_navigation_timing(page)
+                elif is_form_submit:
+                    try:
+                        async with page.expect_navigation(timeout=5000, wait_until='networkidle'):
+                            pass
+                        print(f"    ✓ Navigation completed. Current URL: {page.url}")
+                        step_record["navigation"] = await collect_navigation_timing(page)
+                    except PlaywrightTimeoutError:
+                        print(f"    ⚠️ No navigation occurred after form submission. URL: {page.url}")
+
+                    await page.wait_for_timeout(2000)
+            elif action == "type":
+                await resolve(lambda s: page.fill(s, value))
+            elif action == "wait":
+                if value == "visible" and selector:
+                    await resolve(lambda s: page.wait_for_selector(s, state="visible"))
+                elif value in LOAD_STATES:
+                    await page.wait_for_load_state(value)
+                else:
+                    wait_time = int(value) if value.isdigit() else 1000
+                    if smart_wait:
+                        await wait_until_settled(page, await watch_dom(page), timeout=wait_time)
+                    else:
+                        await page.wait_for_timeout(wait_time)
+            elif action == "assert":
+                await resolve(lambda s: check_text_content(page, s, value))
+            elif action == "assert_visible":
+                await resolve(lambda s: check_visibility(page, s))
+            elif action == "expect" and selector == "url":
+                if smart_wait:
+                    try:
+                        await page.wait_for_url(lambda url: value in url)
+                    except PlaywrightTimeoutError:
+                        pass
+                assert value in page.url, f"Expected URL to contain '{value}', but got '{page.url}'"
+        except Exception:
+            finish_step(test_result, step_record, step_start, "failed")
+            raise
+
+        steps_executed += 1
+        test_result["steps_executed"] = steps_executed
+        finish_step(test_result, step_record, step_start, "passed")
+        if login_count and steps_executed == login_count:
+            await save_session(page, session)
+        emit_event(
+            options,
+            "step_executed",
+            test=test_name,
+            step=step_record["index"],
+            action=action,
+            selector=step_record["selector"],
+            duration=step_record["duration"]
+        )
+
+async def run_test(browser, test, semaphore, options):
+    """Run a single test with retries once a concurrency slot is free.
+
+    Every attempt gets its own browser context, started from the saved
+    session, so cookies and storage of concurrently running tests stay
+    apart.
+    """
+    async with semaphore:
+        test_name = test["name"]
+        timeout = options["timeout"]
+        retries = options["retries"]
+        if is_cancelled(options):
+            print(f"⏭️ Skipping {test_name}: run cancelled")
+            return skipped_test_result(test, "Run was cancelled")
+        test_result = new_test_result(test)
+
+        for retry in range(retries + 1):
+            if retry > 0:
+                print(f"🔄 Retry {retry}/{retries} for test: {test_name} in a fresh browser context")
+                test_result["retry_count"] = retry
+
+            context = None
+            page = None
+            attempt_start = time.perf_counter()
+            try:
+                context = await new_test_context(
+                    browser, options.get("session"), options.get("network"), options.get("har")
+                )
+                page = await context.new_page()
+                page.set_default_timeout(timeout)
+
+                print(f"⏱️ Running: {test_name}")
+                emit_event(options, "test_started", test=test_name, attempt=retry + 1, total_steps=test_result["total_steps"])
+                await execute_steps(page, test, test_result, options)
+
+                print(f"✅ {test_name} passed!")
+                test_result["status"] = "passed"
+                emit_event(options, "test_passed", test=test_name, attempt=retry + 1)
+                await page.close()
+                record_attempt_duration(test_result, attempt_start)
+                break
+
+            except PlaywrightTimeoutError as e:
+                error_msg = f"Timeout: {str(e)}"
+                print(f"⚠️ [{test_name}] {error_msg}")
+                await save_error_screenshot(page, test_name, retry)
+
+                final = fail_attempt(test_result, e, error_msg, retry, options)
+                await close_page(page)
+                record_attempt_duration(test_result, attempt_start)
+                if final:
+                    break
+
+            except Exception as e:
+                error_msg = f"Error: {str(e)}"
+                print(f"❌ [{test_name}] {error_msg}")
+                await save_error_screenshot(page, test_name, retry)
+
+                final = fail_attempt(test_result, e, error_msg, retry, options)
+                await close_page(page)
+                record_attempt_duration(test_result, attempt_start)
+                if final:
+                    break
+
+            finally:
+                await close_context(context)
+
+        if options.get("history"):
+            options["history"].record(test_result)
+        return test_result
+
+async def save_error_screenshot(page, test_name, retry):
+    """Save a screenshot of the page after a failed attempt."""
+    try:
+        screenshot_path = f"error_{test_name.replace(' ', '_')}_{retry}.png"
+        await page.screenshot(path=screenshot_path)
+        print(f"📸 Screenshot saved: {screenshot_path}")
+    except:
+        pass
+
+async def close_page(page):
+    """Close a page, ignoring errors from pages that are already gone."""
+    try:
+        if page:
+            await page.close()
+    except:
+        pass
+
+async def close_context(context):
+    """Close a browser context, ignoring errors from contexts that are already gone."""
+    try:
+        if context:
+            await context.close()
+    except:
+        pass
+
+async def install_network_filter(browser_context, network):
+    """Route every request of a context through a NetworkFilter."""
+    async def handle(route):
+        request = route.request
+        try:
+            action = network.decide(request.url, request.resource_type, request.method)
+            if action == "block":
+                network.count("blocked")
+                if request.resource_type == "image":
+                    await route.fulfill(status=200, content_type="image/png", body=PLACEHOLDER_IMAGE)
+                else:
+                    await route.abort("blockedbyclient")
+            elif action == "cache":
+                cached = network.cached(request.url)
+                if cached:
+                    status, headers, body = cached
+                    await route.fulfill(status=status, headers=headers, body=body)
+                    return
+                response = await route.fetch()
+                body = await response.body()
+                network.store(request.url, response.status, response.headers, body)
+                await route.fulfill(status=response.status, headers=response_headers(response.headers), body=body)
+            else:
+                await route.continue_()
+        except Exception:
+            # Let the request through unfiltered rather than leave it hanging
+            try:
+                await route.continue_()
+            except Exception:
+                pass
+
+    await browser_context.route("**/*", handle)
+
+async def new_test_context(browser, session=None, network=None, har=None):
+    """Create a clean browser context, starting from the saved session if there is one."""
+    storage_state = session.storage_state() if session else None
+    browser_context = await browser.new_context(
+        viewport={"width": 1280, "height": 720},
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/90.0.4430.212 Safari/537.36",
+        storage_state=storage_state
+    )
+    if storage_state:
+        print(f"🔐 Starting browser context from saved session: {storage_state}")
+        session.mark(browser_context)
+    if network:
+        await install_network_filter(browser_context, network)
+    if har and har.mode:
+        await browser_context.route_from_har(har.context_path(), **har.route_options())
+    return browser_context
+
+async def run_tests_async(tests, options, concurrency=10):
+    """Run all tests concurrently in isolated contexts of one browser and event loop."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    print(f"⚡ Running {len(tests)} tests with up to {concurrency} concurrent pages")
+
+    session = options.get("session")
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=options["headless"])
+        try:
+            if session:
+                session.bind(tests)
+                if not session.storage_state():
+                    await establish_session(browser, tests, options)
+            return await asyncio.gather(*[
+                run_test(browser, test, semaphore, options)
+                for test in tests
+            ])
+        finally:
+            await browser.close()
+
+async def establish_session(browser, tests, options):
+    """Log in once and save the session before concurrent tests start, so their contexts begin logged in."""
+    protected = next((test for test in tests if login_step_count(test)), None)
+    if not protected:
+        return
+    login = {"name": "Session login", "steps": protected["steps"][:login_step_count(protected)]}
+    print(f"🔐 Logging in once for {sum(1 for test in tests if login_step_count(test))} protected tests")
+    context = None
+    try:
+        context = await new_test_context(browser, options.get("session"), options.get("network"), options.get("har"))
+        page = await context.new_page()
+        page.set_default_timeout(options["timeout"])
+        await execute_steps(page, login, new_test_result(login), options)
+    except Exception as e:
+        print(f"⚠️ Session login failed, tests will log in themselves: {e}")
+    finally:
+        await close_context(context)
+
+def execute_test_cases_async(test_cases, headless=False, timeout=5000, retries=2, concurrency=10,
+                             selector_cache=SELECTOR_CACHE_FILE, selector_mode="sequential", cancel_event=None,
+                             on_event=None, suite=None, report_db=REPORT_DB, wait_mode="fixed",
+                             session_state=SESSION_STATE_FILE, history=FLAKINESS_HISTORY_FILE,
+                             report_file=None, schedule=True, network=None, har=None):
+    """Execute Playwright test cases on the asyncio engine and write the usual report.
+
+    Unlike the sync engine there is no shared-prefix reuse: each test gets
+    its own browser context, so no context has run another test's prefix.
+    """
+    if not test_cases:
+        print("❌ No test cases to execute.")
+        return False
+
+    options = make_options(
+        headless=headless, timeout=timeout, retries=retries, selector_cache=selector_cache,
+        selector_mode=selector_mode, cancel_event=cancel_event, on_event=on_event, suite=suite, report_db=report_db,
+        wait_mode=wait_mode, session_state=session_state, history=history, network=network, har=har
+    )
+    tests = test_cases["tests"]
+    options["prefix_plan"] = None
+    options["scheduler"] = (
+        DurationScheduler(report_db, options["history"], concurrency, suite=options["suite"])
+        if schedule and concurrency > 1 else None
+    )
+    options["report_file"] = report_file
+    emit_event(options, "run_started", total=len(tests))
+    start_time = time.time()
+
+    try:
+        details = run_in_order(
+            tests,
+            execution_order(tests, options),
+            lambda ordered: asyncio.run(run_tests_async(ordered, options, concurrency))
+        )
+    except Exception as e:
+        print(f"❌ Fatal error: {str(e)}")
+        return False
+    finally:
+        save_run_state(options)
+
+    execution_time = time.time() - start_time
+    return finish_run(list(details), execution_time, options)
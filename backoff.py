@@ -0,0 +1,31 @@
+import random
+
+class BackoffPolicy:
+    """Exponential backoff with full jitter and a longer floor for rate limits.
+
+    rate_limit_errors and transient_errors list the exception types worth
+    retrying; an error mentioning HTTP 429 also counts as a rate limit.
+    """
+
+    rate_limit_errors = ()
+    transient_errors = (ConnectionError, TimeoutError)
+
+    def __init__(self, max_retries=3, base_delay=1.0, max_delay=30.0, rate_limit_delay=10.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limit_delay = rate_limit_delay
+
+    def is_rate_limit(self, error):
+        return isinstance(error, self.rate_limit_errors) or "429" in str(error)
+
+    def is_retryable(self, error):
+        """Only rate limits and transient server or network errors are worth retrying."""
+        return self.is_rate_limit(error) or isinstance(error, self.transient_errors)
+
+    def delay(self, attempt, error):
+        """Return how long to sleep before the next attempt (attempt is 0-based)."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if self.is_rate_limit(error):
+            delay = max(delay, self.rate_limit_delay * (attempt + 1))
+        return min(delay, self.max_delay)
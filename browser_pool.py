@@ -0,0 +1,149 @@
+import queue
+import threading
+from concurrent.futures import Future
+from playwright.sync_api import sync_playwright
+from testing import close_context, new_test_context
+
+POOL_SIZE = 2
+BROWSER_MAX_USES = 20
+
+class BrowserPool:
+    """Long-lived Chromium browsers with pre-warmed contexts for API-triggered runs.
+
+    Playwright's sync objects belong to the thread that created them, so
+    every browser lives on its own slot thread and run() hands work to a
+    free slot instead of handing out the browser. After each run the slot
+    closes the used context and prepares a fresh one for the next run, so
+    both the browser launch and the context setup happen between runs.
+    Browsers are relaunched after max_uses runs or once they disconnect.
+    """
+
+    def __init__(self, size=POOL_SIZE, headless=True, max_uses=BROWSER_MAX_USES):
+        self.size = max(1, size)
+        self.headless = headless
+        self.max_uses = max_uses
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.busy = 0
+        self.stats = {"runs": 0, "launches": 0, "recycled": 0, "crashes": 0, "warm_hits": 0}
+        self.threads = [
+            threading.Thread(target=self._serve, args=(slot + 1,), name=f"browser-pool-{slot + 1}", daemon=True)
+            for slot in range(self.size)
+        ]
+        for thread in self.threads:
+            thread.start()
+        print(f"🏊 Browser pool started with {self.size} browsers")
+
+    def run(self, fn, options):
+        """Run fn(browser_context) on a pooled browser and return its result.
+
+        The context matches the run's session, network filter and HAR
+        settings; it is closed once fn returns. options["headless"] is
+        ignored, pooled browsers use the pool's setting.
+        """
+        if self.closed:
+            raise RuntimeError("Browser pool is closed")
+        future = Future()
+        self.jobs.put((fn, options, future))
+        return future.result()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def status(self):
+        with self.lock:
+            return {"size": self.size, "busy": self.busy, "queued": self.jobs.qsize(), **self.stats}
+
+    def _launch(self, p, slot, browser):
+        if browser:
+            try:
+                browser.close()
+            except Exception:
+                pass
+        browser = p.chromium.launch(headless=self.headless)
+        self.count("launches")
+        print(f"🏊 Pool slot {slot} launched a browser")
+        return browser
+
+    def _context_for(self, browser, warm, options):
+        """Hand out the warm context if it fits the run, otherwise build a matching one."""
+        session = options.get("session")
+        wanted = session.storage_state() if session else None
+        if warm and warm[1] == wanted and not options.get("network") and not options.get("har"):
+            self.count("warm_hits")
+            if wanted:
+                session.mark(warm[0])
+            return warm[0]
+        if warm:
+            close_context(warm[0])
+        return new_test_context(browser, session, options.get("network"), options.get("har"))
+
+    def _serve(self, slot):
+        with sync_playwright() as p:
+            browser, warm, uses, last_session = None, None, 0, None
+            while True:
+                try:
+                    if browser is None or not browser.is_connected() or uses >= self.max_uses:
+                        if browser is not None and browser.is_connected():
+                            self.count("recycled")
+                        browser, warm, uses = self._launch(p, slot, browser), None, 0
+                    if warm is None:
+                        warm_state = last_session.storage_state() if last_session else None
+                        warm = (new_test_context(browser, last_session), warm_state)
+                except Exception as e:
+                    print(f"⚠️ Pool slot {slot} could not prepare a browser: {e}")
+                    browser, warm = None, None
+                    # Fail the next run instead of leaving it waiting on a browser that will not start
+                    job = self.jobs.get()
+                    if job is None:
+                        break
+                    if job[2].set_running_or_notify_cancel():
+                        job[2].set_exception(e)
+                    continue
+
+                job = self.jobs.get()
+                if job is None:
+                    break
+                fn, options, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                with self.lock:
+                    self.busy += 1
+                context, result, error = None, None, None
+                try:
+                    context = self._context_for(browser, warm, options)
+                    result = fn(context)
+                except Exception as e:
+                    error = e
+                # Close before waking the caller: a recorded HAR is only written when its context closes
+                close_context(context)
+                warm = None
+                uses += 1
+                last_session = options.get("session")
+                with self.lock:
+                    self.busy -= 1
+                    self.stats["runs"] += 1
+                if not browser.is_connected():
+                    self.count("crashes")
+                    print(f"💥 Pool slot {slot} lost its browser, relaunching")
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+            if warm:
+                close_context(warm[0])
+            if browser:
+                browser.close()
+
+    def close(self):
+        """Stop the slot threads after the runs already queued."""
+        self.closed = True
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        print("🏊 Browser pool closed")
@@ -0,0 +1,64 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+EVENT_HISTORY_SIZE = 500
+
+class EventBus:
+    """Fan executor events out to any number of live subscribers.
+
+    Each subscriber gets its own bounded queue; a slow subscriber loses its
+    oldest events instead of blocking the executor. Recent events are kept
+    so reconnecting clients can catch up from their last event id.
+    """
+
+    def __init__(self, history_size=EVENT_HISTORY_SIZE):
+        self.subscribers = set()
+        self.history = deque(maxlen=history_size)
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def publish(self, event_type, data):
+        """Publish an event to every subscriber and return it."""
+        with self.lock:
+            event = {"id": next(self.ids), "type": event_type, "time": time.time(), "data": data}
+            self.history.append(event)
+            subscribers = list(self.subscribers)
+
+        for subscriber in subscribers:
+            while True:
+                try:
+                    subscriber.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+        return event
+
+    def subscribe(self, last_event_id=None):
+        """Register a subscriber queue, pre-filled with events after last_event_id."""
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            if last_event_id is not None:
+                for event in self.history:
+                    if event["id"] > last_event_id:
+                        subscriber.put_nowait(event)
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+def format_sse(event):
+    """Serialize an event in Server-Sent Events wire format."""
+    payload = json.dumps(event["data"], default=str)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+EVENT_BUS = EventBus()
@@ -0,0 +1,40 @@
+import os
+import time
+from contextlib import contextmanager
+
+LOCK_TIMEOUT = 30
+STALE_LOCK_SECONDS = 60
+LOCK_POLL_SECONDS = 0.05
+
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT, stale=STALE_LOCK_SECONDS):
+    """Hold an exclusive lock on path across processes via an adjacent .lock file.
+
+    A lock file older than stale seconds is assumed to belong to a process
+    that died while holding it and is removed.
+    """
+    lock_path = f"{path}.lock"
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            os.close(fd)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"Timed out waiting for lock {lock_path}")
+            time.sleep(LOCK_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,155 @@
+import json
+import os
+import statistics
+import threading
+from file_lock import file_lock
+
+FLAKINESS_HISTORY_FILE = "flakiness_history.json"
+FLAKY_RATE = 0.2
+SLOW_FACTOR = 2.0
+DURATION_SMOOTHING = 0.3
+
+def history_key(suite, name):
+    """Return the history key of a test; names are only unique within a suite."""
+    return f"{suite}::{name}" if suite else name
+
+def apply_outcome(entries, key, test_result):
+    """Update the entry for key in entries with one final outcome."""
+    status = test_result["status"]
+    entry = entries.setdefault(key, {
+        "runs": 0,
+        "passes": 0,
+        "failures": 0,
+        "flaky_passes": 0,
+        "flips": 0,
+        "avg_duration": None,
+        "last_status": None,
+        "last_failure_kind": None
+    })
+    entry["runs"] += 1
+    if status == "passed":
+        entry["passes"] += 1
+        if test_result.get("retry_count"):
+            entry["flaky_passes"] += 1
+    else:
+        entry["failures"] += 1
+        entry["last_failure_kind"] = test_result.get("failure_kind")
+    if entry["last_status"] and entry["last_status"] != status:
+        entry["flips"] += 1
+    entry["last_status"] = status
+
+    duration = test_result.get("duration")
+    if duration:
+        if entry["avg_duration"] is None:
+            entry["avg_duration"] = duration
+        else:
+            entry["avg_duration"] = round(
+                DURATION_SMOOTHING * duration + (1 - DURATION_SMOOTHING) * entry["avg_duration"], 4
+            )
+
+class FlakinessHistory:
+    """Per-test outcome and duration statistics kept across runs.
+
+    A test counts as flaky when it needed a retry to pass or its outcome
+    flipped between runs. The statistics decide whether a failure is worth
+    retrying and which tests should be started first. Entries are kept per
+    suite, since generated test names like "Login Test" repeat across
+    suites. Outcomes recorded since the last save are replayed onto the
+    file's current contents under a file lock, so concurrent runs sharing
+    it keep each other's data.
+    """
+
+    def __init__(self, path=FLAKINESS_HISTORY_FILE, suite=None):
+        self.path = path
+        self.suite = suite
+        self.lock = threading.Lock()
+        self.pending = []
+        self.entries = self.read()
+        if self.entries:
+            print(f"📈 Loaded flakiness history with {len(self.entries)} entries from {self.path}")
+
+    def read(self):
+        """Read history from disk, returning an empty one if the file is missing or corrupt."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("tests", {})
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, AttributeError) as e:
+            print(f"⚠️ Ignoring unreadable flakiness history '{self.path}': {e}")
+            return {}
+
+    def save(self):
+        """Merge the outcomes recorded since the last save into the file."""
+        with self.lock:
+            if not self.pending:
+                return
+            with file_lock(self.path):
+                entries = self.read()
+                for test_result in self.pending:
+                    apply_outcome(entries, history_key(self.suite, test_result["name"]), test_result)
+                tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"tests": entries}, f, indent=2)
+                os.replace(tmp_path, self.path)
+            self.entries = entries
+            self.pending = []
+        print(f"📈 Flakiness history saved: {self.path}")
+
+    def record(self, test_result):
+        """Add the final outcome of a test to its history."""
+        if test_result.get("status") not in ("passed", "failed"):
+            return
+        with self.lock:
+            apply_outcome(self.entries, history_key(self.suite, test_result["name"]), test_result)
+            self.pending.append({
+                key: test_result.get(key) for key in ("name", "status", "retry_count", "failure_kind", "duration")
+            })
+
+    def entry(self, name):
+        """Return the history entry of a test in this suite, or None."""
+        with self.lock:
+            return self.entries.get(history_key(self.suite, name))
+
+    def flaky_rate(self, name):
+        entry = self.entry(name)
+        if not entry or not entry["runs"]:
+            return 0.0
+        return min(1.0, (entry["flaky_passes"] + entry["flips"]) / entry["runs"])
+
+    def is_flaky(self, name):
+        return self.flaky_rate(name) >= FLAKY_RATE
+
+    def avg_duration(self, name):
+        entry = self.entry(name)
+        return entry["avg_duration"] if entry else None
+
+    def should_retry(self, name, failure_kind):
+        """Retry transient failures, and deterministic ones only for tests known to be flaky."""
+        return failure_kind != "deterministic" or self.is_flaky(name)
+
+    def prioritize(self, tests, order):
+        """Move flaky tests, then historically slow ones, to the front of an execution order.
+
+        Remaining tests keep their relative order so grouping by shared
+        prefix is preserved for them.
+        """
+        durations = [d for d in (self.avg_duration(test["name"]) for test in tests) if d]
+        slow_after = statistics.median(durations) * SLOW_FACTOR if durations else None
+
+        flaky, slow, rest = [], [], []
+        for index in order:
+            name = tests[index]["name"]
+            duration = self.avg_duration(name)
+            if self.is_flaky(name):
+                flaky.append(index)
+            elif slow_after and duration and duration >= slow_after:
+                slow.append(index)
+            else:
+                rest.append(index)
+
+        if flaky or slow:
+            print(f"📈 Starting {len(flaky)} flaky and {len(slow)} slow tests first")
+        flaky.sort(key=lambda index: self.flaky_rate(tests[index]["name"]), reverse=True)
+        slow.sort(key=lambda index: self.avg_duration(tests[index]["name"]), reverse=True)
+        return flaky + slow + rest
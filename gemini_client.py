@@ -0,0 +1,108 @@
+import threading
+import time
+import backoff
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+RATE_LIMIT_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+TRANSIENT_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.GatewayTimeout,
+    ConnectionError,
+    TimeoutError,
+)
+
+class BackoffPolicy(backoff.BackoffPolicy):
+    """Backoff policy that knows the Gemini API's rate-limit and transient errors."""
+
+    rate_limit_errors = RATE_LIMIT_ERRORS
+    transient_errors = TRANSIENT_ERRORS
+
+class GeminiClient:
+    """A Gemini session that is configured once and reused across calls.
+
+    genai.configure sets process-wide state, so every client shares one
+    lock and the library is only reconfigured when a different API key is
+    used. Models are created once per name and keep their transport alive.
+    When the API signals a rate limit, all callers pause until it clears.
+    """
+
+    _configure_lock = threading.Lock()
+    _configured_key = None
+
+    def __init__(self, api_key, backoff=None):
+        self.api_key = api_key
+        self.backoff = backoff or BackoffPolicy()
+        self.models = {}
+        self.lock = threading.Lock()
+        self.blocked_until = 0.0
+
+    def _ensure_configured(self):
+        with GeminiClient._configure_lock:
+            if GeminiClient._configured_key != self.api_key:
+                genai.configure(api_key=self.api_key)
+                GeminiClient._configured_key = self.api_key
+                with self.lock:
+                    self.models = {}
+
+    def model(self, name):
+        """Return the cached GenerativeModel for a model name."""
+        self._ensure_configured()
+        with self.lock:
+            if name not in self.models:
+                self.models[name] = genai.GenerativeModel(name)
+            return self.models[name]
+
+    def _wait_for_rate_limit(self):
+        remaining = self.blocked_until - time.time()
+        if remaining > 0:
+            print(f"⏳ Waiting {remaining:.1f}s for Gemini rate limit to clear...")
+            time.sleep(remaining)
+
+    def call(self, model_name, request_fn):
+        """Run request_fn(model) with backoff on retryable errors."""
+        for attempt in range(self.backoff.max_retries):
+            self._wait_for_rate_limit()
+            try:
+                return request_fn(self.model(model_name))
+            except Exception as e:
+                retryable = self.backoff.is_retryable(e)
+                print(f"⚠️ API error on attempt {attempt+1}/{self.backoff.max_retries}: {e}")
+                if not retryable or attempt == self.backoff.max_retries - 1:
+                    raise
+                delay = self.backoff.delay(attempt, e)
+                if self.backoff.is_rate_limit(e):
+                    with self.lock:
+                        self.blocked_until = max(self.blocked_until, time.time() + delay)
+                else:
+                    time.sleep(delay)
+
+        raise Exception("Failed all API call attempts")
+
+    def generate(self, model_name, prompt):
+        """Generate content and return the stripped response text."""
+        return self.call(model_name, lambda model: model.generate_content(prompt).text.strip())
+
+    def generate_stream(self, model_name, prompt):
+        """Yield response text chunks as they arrive.
+
+        Only opening the stream is retried; an error after the first chunk
+        is raised to the caller.
+        """
+        response = self.call(model_name, lambda model: model.generate_content(prompt, stream=True))
+        for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_gemini_client(api_key, backoff=None):
+    """Return the shared client for an API key, creating it on first use."""
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = GeminiClient(api_key, backoff)
+        return _clients[api_key]
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import re
+
+MANIFEST_FILE = "generation_manifest.json"
+
+def fingerprint_requirement(text):
+    """Return a stable hash of a requirement paragraph, ignoring whitespace changes."""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+def group_id(requirement_hashes):
+    """Return the id of a group of requirements generated together."""
+    return hashlib.sha256("|".join(requirement_hashes).encode("utf-8")).hexdigest()[:16]
+
+class GenerationManifest:
+    """Map requirement fingerprints to the test plan and tests generated from them.
+
+    Requirements are generated in groups (one Gemini call per group), so the
+    manifest stores groups and a group can be reused only while every
+    requirement in it is still present unchanged.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.groups = {}
+        self.load()
+
+    @classmethod
+    def for_output_dir(cls, output_dir="."):
+        return cls(os.path.join(output_dir, MANIFEST_FILE))
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.groups = json.load(f).get("groups", {})
+            print(f"📒 Loaded generation manifest with {len(self.groups)} groups from {self.path}")
+        except FileNotFoundError:
+            self.groups = {}
+        except (json.JSONDecodeError, AttributeError) as e:
+            print(f"⚠️ Ignoring unreadable generation manifest '{self.path}': {e}")
+            self.groups = {}
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"groups": self.groups}, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        print(f"📒 Generation manifest saved: {self.path}")
+
+    def reusable_groups(self, requirement_hashes):
+        """Return ids of stored groups whose requirements are all still present."""
+        present = set(requirement_hashes)
+        return [
+            gid for gid, group in self.groups.items()
+            if group["requirements"] and all(h in present for h in group["requirements"])
+        ]
+
+    def add_group(self, requirement_hashes, test_plan, tests):
+        gid = group_id(requirement_hashes)
+        self.groups[gid] = {
+            "requirements": list(requirement_hashes),
+            "test_plan": test_plan,
+            "tests": tests
+        }
+        return gid
+
+    def retain(self, group_ids):
+        """Drop every group that is not in group_ids."""
+        keep = set(group_ids)
+        self.groups = {gid: group for gid, group in self.groups.items() if gid in keep}
@@ -0,0 +1,114 @@
+import glob
+import json
+import os
+import re
+import threading
+import time
+
+HAR_DIR = "har_archives"
+HAR_MODES = ("record", "replay")
+STALE_PART_SECONDS = 24 * 3600
+
+def archive_name(suite):
+    """Turn a suite name or test file path into a file-system friendly archive name."""
+    base = os.path.splitext(os.path.basename(suite or ""))[0]
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", base).strip("_") or "default"
+
+def entry_key(entry):
+    request = entry.get("request", {})
+    return request.get("method"), request.get("url"), (request.get("postData") or {}).get("text")
+
+class HarArchive:
+    """Per-suite HAR archive of the responses a run received.
+
+    In record mode every browser context records into its own part file
+    (contexts run concurrently and Playwright writes a HAR when its context
+    closes); finish() merges the parts into the suite archive, keeping the
+    latest response for each request. In replay mode contexts are served
+    from the archive through Playwright routing; offline aborts requests
+    that were never recorded instead of sending them to the live site.
+    """
+
+    def __init__(self, suite=None, mode="replay", har_dir=HAR_DIR, offline=True):
+        self.mode = mode
+        self.offline = offline
+        self.har_dir = har_dir
+        self.name = archive_name(suite)
+        self.path = os.path.join(har_dir, f"{self.name}.har")
+        self.parts_pattern = os.path.join(har_dir, f"{self.name}.part_{os.getpid()}_*.har")
+        self.lock = threading.Lock()
+        self.parts = 0
+        os.makedirs(har_dir, exist_ok=True)
+        if mode == "replay" and not os.path.exists(self.path):
+            print(f"⚠️ No HAR archive at {self.path}, running against the live site")
+            self.mode = None
+        elif mode:
+            print(f"📼 HAR {mode} mode: {self.path}")
+        if self.mode == "record":
+            self.remove_stale_parts()
+
+    def remove_stale_parts(self):
+        """Delete part files an interrupted recording left behind.
+
+        Other processes may be recording the same suite, so only parts with
+        this process id or older than STALE_PART_SECONDS are removed.
+        """
+        cutoff = time.time() - STALE_PART_SECONDS
+        own_parts = set(glob.glob(self.parts_pattern))
+        for part in glob.glob(os.path.join(self.har_dir, f"{self.name}.part_*.har")):
+            try:
+                if part in own_parts or os.path.getmtime(part) < cutoff:
+                    os.remove(part)
+            except FileNotFoundError:
+                pass
+
+    def context_path(self):
+        """Return the HAR file a new browser context should record into or replay from."""
+        if self.mode != "record":
+            return self.path
+        with self.lock:
+            self.parts += 1
+            part = self.parts
+        return os.path.join(self.har_dir, f"{self.name}.part_{os.getpid()}_{part}.har")
+
+    def route_options(self):
+        """Return the keyword arguments for BrowserContext.route_from_har."""
+        if self.mode == "record":
+            return {"update": True, "update_content": "embed", "update_mode": "full"}
+        return {"update": False, "not_found": "abort" if self.offline else "fallback"}
+
+    def finish(self):
+        """Merge the part files this process recorded into the suite archive."""
+        if self.mode != "record":
+            return
+        parts = sorted(glob.glob(self.parts_pattern), key=os.path.getmtime)
+        if not parts:
+            print("⚠️ No HAR parts were recorded")
+            return
+
+        har = None
+        entries = {}
+        for part in parts:
+            try:
+                with open(part, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping unreadable HAR part {part}: {e}")
+                continue
+            har = har or data
+            for entry in data.get("log", {}).get("entries", []):
+                entries[entry_key(entry)] = entry
+
+        if har is None:
+            return
+        har["log"]["entries"] = sorted(entries.values(), key=lambda entry: entry.get("startedDateTime", ""))
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(har, f)
+        os.replace(tmp_path, self.path)
+        for part in parts:
+            try:
+                os.remove(part)
+            except FileNotFoundError:
+                pass
+        print(f"📼 Recorded {len(entries)} responses from {len(parts)} contexts into {self.path}")
@@ -0,0 +1,134 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_STATUSES = ("queued", "running", "completed", "failed", "cancelled")
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+class Job:
+    """A background pipeline run with status, progress and cooperative cancellation."""
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = {"stage": "queued", "message": "Waiting for a free worker"}
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def update_progress(self, stage, message="", **extra):
+        """Record the current stage of the job, raising JobCancelled if it was cancelled."""
+        with self.lock:
+            self.progress = {"stage": stage, "message": message, **extra}
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "createdAt": self.created_at,
+                "startedAt": self.started_at,
+                "finishedAt": self.finished_at,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error
+            }
+
+class JobManager:
+    """Run jobs on a bounded thread pool and keep their state for status queries."""
+
+    def __init__(self, max_workers=2, max_history=100):
+        self.max_workers = max_workers
+        self.max_history = max_history
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, name, fn, on_complete=None):
+        """Queue fn(job) to run in the background and return the Job.
+
+        on_complete(job) is called after fn returns successfully.
+        """
+        job = Job(name)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._prune()
+        self.executor.submit(self._run, job, fn, on_complete)
+        print(f"📥 Queued job {job.id}: {name}")
+        return job
+
+    def _run(self, job, fn, on_complete):
+        with job.lock:
+            if job.cancel_event.is_set():
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                return
+            job.status = "running"
+            job.started_at = time.time()
+        print(f"🏃 Starting job {job.id}")
+
+        try:
+            result = fn(job)
+            job.check_cancelled()
+            with job.lock:
+                job.result = result
+                job.status = "completed" if result else "failed"
+                if not result:
+                    job.error = "Pipeline did not produce a report"
+            if result and on_complete:
+                on_complete(job)
+        except JobCancelled:
+            with job.lock:
+                job.status = "cancelled"
+        except Exception as e:
+            with job.lock:
+                job.status = "failed"
+                job.error = str(e)
+        finally:
+            with job.lock:
+                job.finished_at = time.time()
+            print(f"🏁 Job {job.id} {job.status}")
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id):
+        """Request cancellation; running jobs stop at their next checkpoint."""
+        job = self.get(job_id)
+        if not job:
+            return None
+        job.cancel_event.set()
+        with job.lock:
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.finished_at = time.time()
+        return job
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_history."""
+        finished = sorted(
+            (job for job in self.jobs.values() if job.status in ("completed", "failed", "cancelled")),
+            key=lambda job: job.created_at
+        )
+        for job in finished[:max(0, len(self.jobs) - self.max_history)]:
+            del self.jobs[job.id]
@@ -0,0 +1,58 @@
+import json
+import re
+
+class StreamingJsonArrayParser:
+    """Incrementally parse the objects of one JSON array from streamed text.
+
+    Text is fed in arbitrary pieces and every object in the array under
+    array_key is returned as soon as its closing brace arrives.
+    """
+
+    def __init__(self, array_key="tests"):
+        self.array_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(array_key))
+        self.buffer = ""
+        self.pos = None
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.object_start = None
+        self.closed = False
+
+    def feed(self, text):
+        """Add text and return the list of objects completed by it."""
+        self.buffer += text
+        if self.pos is None:
+            match = self.array_pattern.search(self.buffer)
+            if not match:
+                return []
+            self.pos = match.end()
+        
+        objects = []
+        while self.pos < len(self.buffer) and not self.closed:
+            ch = self.buffer[self.pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                if self.depth == 0 and ch == "{":
+                    self.object_start = self.pos
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth < 0:
+                    self.closed = True
+                elif self.depth == 0 and ch == "}" and self.object_start is not None:
+                    object_text = self.buffer[self.object_start:self.pos + 1]
+                    self.object_start = None
+                    try:
+                        objects.append(json.loads(object_text))
+                    except json.JSONDecodeError as e:
+                        print(f"⚠️ Skipping malformed streamed object: {e}")
+            self.pos += 1
+        return objects
@@ -0,0 +1,119 @@
+import mmap
+import os
+
+DEFAULT_CHUNK_BYTES = 64 * 1024
+MAX_CHUNK_BYTES = 4 * 1024 * 1024
+DEFAULT_TAIL_LINES = 200
+MAX_LINES = 10000
+TAIL_BLOCK_BYTES = 8192
+
+def _decode(data):
+    return data.decode("utf-8", errors="replace")
+
+def log_size(path):
+    """Return the size of the log in bytes, or 0 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def read_range(path, offset=0, length=DEFAULT_CHUNK_BYTES, whole_lines=True):
+    """Read up to length bytes starting at offset without loading the rest of the file.
+
+    With whole_lines, a chunk that ends mid-line is cut back to its last
+    newline so followers never see half a line; nextOffset tells them where
+    to resume. An offset past the end of the file (the log was truncated or
+    rotated) restarts from the beginning and sets reset.
+    """
+    size = log_size(path)
+    length = max(1, min(length, MAX_CHUNK_BYTES))
+    offset = max(0, offset)
+    reset = offset > size
+    if reset:
+        offset = 0
+
+    data = b""
+    if size and offset < size:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        if whole_lines and offset + len(data) < size:
+            cut = data.rfind(b"\n")
+            if cut >= 0:
+                data = data[:cut + 1]
+
+    return {
+        "offset": offset,
+        "nextOffset": offset + len(data),
+        "size": size,
+        "eof": offset + len(data) >= size,
+        "reset": reset,
+        "content": _decode(data)
+    }
+
+def tail_lines(path, lines=DEFAULT_TAIL_LINES):
+    """Return the last lines of the log by reading backwards from the end."""
+    size = log_size(path)
+    lines = max(1, min(lines, MAX_LINES))
+    if not size:
+        return {"offset": 0, "nextOffset": 0, "size": 0, "eof": True, "reset": False, "content": ""}
+
+    with open(path, "rb") as f:
+        position = size
+        data = b""
+        # One extra newline is needed to find the start of the first wanted line
+        while position > 0 and data.count(b"\n") <= lines:
+            step = min(TAIL_BLOCK_BYTES, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+
+    trailing_newline = data.endswith(b"\n")
+    parts = data.split(b"\n")
+    if trailing_newline:
+        parts.pop()
+    kept = parts[-lines:]
+    content = b"\n".join(kept) + (b"\n" if trailing_newline else b"")
+    return {
+        "offset": size - len(content),
+        "nextOffset": size,
+        "size": size,
+        "eof": True,
+        "reset": False,
+        "content": _decode(content)
+    }
+
+def read_lines(path, start=0, count=DEFAULT_TAIL_LINES):
+    """Return count lines starting at zero-based line start, scanning newlines via mmap."""
+    size = log_size(path)
+    start = max(0, start)
+    count = max(1, min(count, MAX_LINES))
+    result = {"line": start, "nextLine": start, "offset": 0, "nextOffset": 0, "size": size, "eof": True, "content": ""}
+    if not size:
+        return result
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        begin = 0
+        for _ in range(start):
+            newline = mapped.find(b"\n", begin)
+            if newline < 0:
+                begin = size
+                break
+            begin = newline + 1
+
+        end = begin
+        read = 0
+        while read < count and end < size:
+            newline = mapped.find(b"\n", end)
+            end = size if newline < 0 else newline + 1
+            read += 1
+        content = mapped[begin:end]
+
+    result.update({
+        "nextLine": start + read,
+        "offset": begin,
+        "nextOffset": end,
+        "eof": end >= size,
+        "content": _decode(content)
+    })
+    return result
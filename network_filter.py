@@ -0,0 +1,162 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+ASSET_CACHE_DIR = "asset_cache"
+ASSET_CACHE_MAX_AGE = 24 * 60 * 60
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+BLOCKED_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "connect.facebook.net", "hotjar.com", "segment.io", "segment.com", "mixpanel.com",
+    "clarity.ms", "sentry.io", "intercom.io", "vercel-insights.com"
+)
+CACHEABLE_TYPES = ("stylesheet", "script", "image", "font")
+# Headers that no longer describe a body Playwright has already decoded
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+# 1x1 transparent PNG served for blocked images so <img> elements keep loading cleanly
+PLACEHOLDER_IMAGE = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+def split_list(value):
+    """Turn a comma separated CLI value into a tuple, dropping blanks."""
+    return tuple(item.strip() for item in (value or "").split(",") if item.strip())
+
+def domain_matches(host, domains):
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+def cache_lifetime(headers, max_age=ASSET_CACHE_MAX_AGE):
+    """Return how many seconds a response may be reused according to its caching headers, capped at max_age.
+
+    Responses without explicit freshness (max-age, immutable or Expires),
+    marked no-store/no-cache, or varying on anything but the encoding are
+    not reused, so a deploy of the site under test is picked up.
+    """
+    headers = {name.lower(): value for name, value in headers.items()}
+    cache_control = headers.get("cache-control", "").lower()
+    directives = {directive.strip().split("=", 1)[0] for directive in cache_control.split(",")}
+    if directives & {"no-store", "no-cache"}:
+        return 0
+    vary = {value.strip().lower() for value in headers.get("vary", "").split(",") if value.strip()}
+    if vary - {"accept-encoding"}:
+        return 0
+    if "immutable" in directives:
+        return max_age
+    match = re.search(r"(?:^|,)\s*max-age\s*=\s*(\d+)", cache_control)
+    if match:
+        return min(int(match.group(1)), max_age)
+    try:
+        expires = parsedate_to_datetime(headers["expires"]).timestamp()
+        date = parsedate_to_datetime(headers["date"]).timestamp() if "date" in headers else time.time()
+    except (KeyError, TypeError, ValueError):
+        return 0
+    return max(0, min(int(expires - date), max_age))
+
+class NetworkFilter:
+    """Decide what each request of a test page may load.
+
+    Requests to allow_domains always go through. Otherwise requests to
+    block_domains, of a resource type in block_types, or (when allow_types
+    is set) of any other type than those are blocked. Documents are never
+    blocked by type. GET requests for static assets that go through are
+    served from cache_dir for as long as their caching headers allow (at
+    most max_age seconds).
+    """
+
+    def __init__(self, block_types=BLOCKED_RESOURCE_TYPES, block_domains=BLOCKED_DOMAINS, allow_types=(),
+                 allow_domains=(), cache_dir=ASSET_CACHE_DIR, max_age=ASSET_CACHE_MAX_AGE):
+        self.block_types = tuple(block_types)
+        self.block_domains = tuple(block_domains)
+        self.allow_types = tuple(allow_types)
+        self.allow_domains = tuple(allow_domains)
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.stats = {"blocked": 0, "cache_hits": 0, "cache_stores": 0, "bytes_served": 0}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def decide(self, url, resource_type, method="GET"):
+        """Return "block", "cache" or "continue" for a request."""
+        host = urlparse(url).hostname or ""
+        if not url.startswith(("http://", "https://")):
+            return "continue"
+        if self.allow_domains and domain_matches(host, self.allow_domains):
+            action = "continue"
+        elif domain_matches(host, self.block_domains):
+            action = "block"
+        elif resource_type == "document":
+            action = "continue"
+        elif self.allow_types and resource_type not in self.allow_types:
+            action = "block"
+        elif resource_type in self.block_types:
+            action = "block"
+        else:
+            action = "continue"
+
+        if action == "continue" and self.cache_dir and method == "GET" and resource_type in CACHEABLE_TYPES:
+            return "cache"
+        return action
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def _cache_paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+
+    def cached(self, url):
+        """Return (status, headers, body) for a fresh cached asset, or None."""
+        meta_path, body_path = self._cache_paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("expires", 0) <= time.time():
+                return None
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError, AttributeError):
+            return None
+        self.count("cache_hits")
+        self.count("bytes_served", len(body))
+        return meta["status"], meta["headers"], body
+
+    def store(self, url, status, headers, body):
+        """Cache a successful, cacheable asset response; the metadata is written last so readers never see half an entry."""
+        lifetime = cache_lifetime(headers, self.max_age)
+        if status != 200 or not lifetime:
+            return
+        meta_path, body_path = self._cache_paths(url)
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(f"{body_path}.{suffix}", "wb") as f:
+                f.write(body)
+            os.replace(f"{body_path}.{suffix}", body_path)
+            with open(f"{meta_path}.{suffix}", "w", encoding="utf-8") as f:
+                json.dump({
+                    "url": url, "status": status, "headers": response_headers(headers), "expires": time.time() + lifetime
+                }, f)
+            os.replace(f"{meta_path}.{suffix}", meta_path)
+        except OSError as e:
+            print(f"⚠️ Could not cache asset {url}: {e}")
+            return
+        self.count("cache_stores")
+
+    def report(self):
+        with self.lock:
+            stats = dict(self.stats)
+        print(
+            f"🚦 Network filter: {stats['blocked']} requests blocked, {stats['cache_hits']} assets served from cache "
+            f"({stats['bytes_served'] / 1024:.0f} KiB), {stats['cache_stores']} assets cached"
+        )
+
+def response_headers(headers):
+    """Return the headers to replay with a decoded response body."""
+    return {name: value for name, value in headers.items() if name.lower() not in DROPPED_HEADERS}
@@ -0,0 +1,48 @@
+import re
+
+TEST_PLAN_SECTIONS = ["core_tests", "edge_cases", "security_tests", "performance_tests"]
+CHUNK_CHAR_BUDGET = 6000
+
+def split_requirements(requirements, headings=None, max_chars=CHUNK_CHAR_BUDGET):
+    """Split requirement paragraphs into chunks at headings or a character budget.
+
+    headings is a list of paragraph indices that start a new section.
+    """
+    heading_set = set(headings or [])
+    chunks = []
+    current = []
+    current_size = 0
+
+    for index, paragraph in enumerate(requirements):
+        starts_section = index in heading_set
+        over_budget = current_size + len(paragraph) > max_chars
+        if current and (starts_section or over_budget):
+            chunks.append(current)
+            current = []
+            current_size = 0
+        current.append(paragraph)
+        current_size += len(paragraph) + 1
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+def normalize_description(text):
+    """Normalize a test description for de-duplication."""
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+def merge_test_plans(test_plans):
+    """Merge the test plan sections of several plans, dropping duplicate entries."""
+    merged = {section: [] for section in TEST_PLAN_SECTIONS}
+    seen = {section: set() for section in TEST_PLAN_SECTIONS}
+
+    for test_plan in test_plans:
+        for section in TEST_PLAN_SECTIONS:
+            for entry in test_plan.get(section, []) or []:
+                key = normalize_description(entry.get("description", "") if isinstance(entry, dict) else entry)
+                if not key or key in seen[section]:
+                    continue
+                seen[section].add(key)
+                merged[section].append(entry)
+
+    return merged
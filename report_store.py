@@ -0,0 +1,330 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+REPORT_DB = "test_reports.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT UNIQUE,
+    suite TEXT,
+    timestamp TEXT,
+    created_at REAL NOT NULL,
+    execution_time REAL,
+    total INTEGER,
+    passed INTEGER,
+    failed INTEGER,
+    skipped INTEGER,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_created_at ON reports (created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_suite ON reports (suite, created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_status ON reports (status, created_at);
+
+CREATE TABLE IF NOT EXISTS test_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id INTEGER NOT NULL REFERENCES reports (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT,
+    status TEXT,
+    error TEXT,
+    retry_count INTEGER,
+    steps_executed INTEGER,
+    total_steps INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_test_results_report ON test_results (report_id, position);
+CREATE INDEX IF NOT EXISTS idx_test_results_status ON test_results (status);
+CREATE INDEX IF NOT EXISTS idx_test_results_name ON test_results (name);
+"""
+
+def parse_report_timestamp(timestamp):
+    """Convert a report summary timestamp (YYYYmmdd_HHMMSS) to epoch seconds."""
+    try:
+        return datetime.strptime(timestamp, "%Y%m%d_%H%M%S").timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def summarize_timing(tests, limit=5):
+    """Find the tests, steps and selector attempts that dominate a run's time."""
+    steps = [
+        {"test": test.get("name"), **step}
+        for test in tests
+        for step in test.get("steps", [])
+        if step.get("duration") is not None
+    ]
+    attempts = [attempt for step in steps for attempt in step.get("attempts", [])]
+    navigations = [step["navigation"] for step in steps if step.get("navigation")]
+    timed_tests = [test for test in tests if test.get("duration")]
+
+    return {
+        "total_test_time": round(sum(test["duration"] for test in timed_tests), 4),
+        "total_step_time": round(sum(step["duration"] for step in steps), 4),
+        "selector_time": round(sum(attempt["duration"] for attempt in attempts), 4),
+        "failed_selector_time": round(sum(attempt["duration"] for attempt in attempts if not attempt["success"]), 4),
+        "slowest_tests": [
+            {"name": test.get("name"), "duration": test["duration"], "status": test.get("status")}
+            for test in sorted(timed_tests, key=lambda test: test["duration"], reverse=True)[:limit]
+        ],
+        "slowest_steps": [
+            {
+                "test": step["test"],
+                "index": step.get("index"),
+                "action": step.get("action"),
+                "selector": step.get("selector"),
+                "duration": step["duration"]
+            }
+            for step in sorted(steps, key=lambda step: step["duration"], reverse=True)[:limit]
+        ],
+        "slowest_navigations": sorted(
+            navigations, key=lambda navigation: navigation.get("load") or 0, reverse=True
+        )[:limit]
+    }
+
+class ReportStore:
+    """SQLite-backed index of test reports and their per-test results.
+
+    The JSON report files stay the source the executor writes; the store
+    indexes them by time, suite and status so analytics can query history
+    without globbing and re-parsing files.
+    """
+
+    def __init__(self, path=REPORT_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add_report(self, report_path, report_data, suite=None):
+        """Index a report, replacing any earlier entry for the same path, and return its id."""
+        summary = report_data.get("summary", {})
+        created_at = parse_report_timestamp(summary.get("timestamp")) or time.time()
+        status = "failed" if summary.get("failed") else "passed"
+        path = os.path.abspath(report_path) if report_path else None
+
+        with self.lock, self._connect() as conn:
+            if path:
+                conn.execute("DELETE FROM reports WHERE path = ?", (path,))
+            cursor = conn.execute(
+                """INSERT INTO reports
+                   (path, suite, timestamp, created_at, execution_time, total, passed, failed, skipped, status)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    path, suite, summary.get("timestamp"), created_at, summary.get("execution_time"),
+                    summary.get("total"), summary.get("passed"), summary.get("failed"), summary.get("skipped"),
+                    status
+                )
+            )
+            report_id = cursor.lastrowid
+            conn.executemany(
+                """INSERT INTO test_results
+                   (report_id, position, name, status, error, retry_count, steps_executed, total_steps, data)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [
+                    (
+                        report_id, position, test.get("name"), test.get("status"), test.get("error"),
+                        test.get("retry_count"), test.get("steps_executed"), test.get("total_steps"),
+                        json.dumps(test)
+                    )
+                    for position, test in enumerate(report_data.get("tests", []))
+                ]
+            )
+        return report_id
+
+    def add_report_file(self, report_path, suite=None):
+        """Index a JSON report file from disk."""
+        with open(report_path, "r") as f:
+            return self.add_report(report_path, json.load(f), suite)
+
+    def import_json_reports(self, pattern="test_report_*.json"):
+        """Index report files that are not in the store yet and return how many were added."""
+        with self._connect() as conn:
+            known = {row["path"] for row in conn.execute("SELECT path FROM reports WHERE path IS NOT NULL")}
+        added = 0
+        for report_path in sorted(glob.glob(pattern), key=os.path.getmtime):
+            if os.path.abspath(report_path) in known:
+                continue
+            try:
+                self.add_report_file(report_path)
+                added += 1
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not import report {report_path}: {e}")
+        return added
+
+    def count_reports(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    @staticmethod
+    def _report_row(row):
+        return {
+            "id": row["id"],
+            "path": row["path"],
+            "suite": row["suite"],
+            "timestamp": row["timestamp"],
+            "createdAt": row["created_at"],
+            "executionTime": row["execution_time"],
+            "total": row["total"],
+            "passed": row["passed"],
+            "failed": row["failed"],
+            "skipped": row["skipped"],
+            "status": row["status"]
+        }
+
+    def _load_report(self, conn, row):
+        """Rebuild the JSON report structure for a reports row."""
+        tests = [
+            json.loads(test_row["data"])
+            for test_row in conn.execute(
+                "SELECT data FROM test_results WHERE report_id = ? ORDER BY position", (row["id"],)
+            )
+        ]
+        return {
+            "id": row["id"],
+            "path": row["path"],
+            "summary": {
+                "timestamp": row["timestamp"],
+                "execution_time": row["execution_time"],
+                "total": row["total"],
+                "passed": row["passed"],
+                "failed": row["failed"],
+                "skipped": row["skipped"]
+            },
+            "tests": tests
+        }
+
+    def find_report(self, path=None):
+        """Return the summary row for a report file (or the latest report when path is None), or None."""
+        with self._connect() as conn:
+            if path:
+                row = conn.execute("SELECT * FROM reports WHERE path = ?", (os.path.abspath(path),)).fetchone()
+            else:
+                row = conn.execute("SELECT * FROM reports ORDER BY created_at DESC, id DESC LIMIT 1").fetchone()
+        return self._report_row(row) if row else None
+
+    def latest_report(self, suite=None):
+        """Return the most recent report (optionally for one suite), or None."""
+        query = "SELECT * FROM reports"
+        params = []
+        if suite:
+            query += " WHERE suite = ?"
+            params.append(suite)
+        query += " ORDER BY created_at DESC, id DESC LIMIT 1"
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+            return self._load_report(conn, row) if row else None
+
+    def get_report(self, report_id=None, path=None):
+        """Return a report by id or by file path, or None."""
+        with self._connect() as conn:
+            if report_id is not None:
+                row = conn.execute("SELECT * FROM reports WHERE id = ?", (report_id,)).fetchone()
+            else:
+                row = conn.execute("SELECT * FROM reports WHERE path = ?", (os.path.abspath(path),)).fetchone()
+            return self._load_report(conn, row) if row else None
+
+    def list_reports(self, page=1, per_page=20, suite=None, status=None, since=None, until=None):
+        """Return (reports, total) for one page of history, newest first."""
+        where, params = [], []
+        if suite:
+            where.append("suite = ?")
+            params.append(suite)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("created_at < ?")
+            params.append(until)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM reports{clause}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM reports{clause} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + [per_page, (max(page, 1) - 1) * per_page]
+            ).fetchall()
+        return [self._report_row(row) for row in rows], total
+
+    def query_tests(self, page=1, per_page=50, status=None, name=None, since=None, until=None, report_id=None):
+        """Return (test results, total) across reports, newest first."""
+        where, params = [], []
+        if status:
+            where.append("t.status = ?")
+            params.append(status)
+        if name:
+            where.append("t.name LIKE ?")
+            params.append(f"%{name}%")
+        if since is not None:
+            where.append("r.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("r.created_at < ?")
+            params.append(until)
+        if report_id is not None:
+            where.append("t.report_id = ?")
+            params.append(report_id)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        base = f"FROM test_results t JOIN reports r ON r.id = t.report_id{clause}"
+
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) {base}", params).fetchone()[0]
+            rows = conn.execute(
+                f"""SELECT t.data, t.report_id, r.timestamp, r.suite {base}
+                    ORDER BY r.created_at DESC, t.report_id DESC, t.position LIMIT ? OFFSET ?""",
+                params + [per_page, (max(page, 1) - 1) * per_page]
+            ).fetchall()
+        return [
+            {**json.loads(row["data"]), "reportId": row["report_id"], "timestamp": row["timestamp"], "suite": row["suite"]}
+            for row in rows
+        ], total
+
+    def test_durations(self, reports=50, suite=None):
+        """Return {test name: [durations newest first]} from the last reports runs (optionally of one suite)."""
+        clause = " WHERE suite = ?" if suite else ""
+        params = [suite] if suite else []
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""SELECT t.name, t.data FROM test_results t
+                    JOIN (SELECT id, created_at FROM reports{clause} ORDER BY created_at DESC, id DESC LIMIT ?) r
+                    ON r.id = t.report_id
+                    WHERE t.status IN ('passed', 'failed')
+                    ORDER BY r.created_at DESC, r.id DESC""",
+                params + [reports]
+            ).fetchall()
+        durations = {}
+        for row in rows:
+            duration = json.loads(row["data"]).get("duration")
+            if duration:
+                durations.setdefault(row["name"], []).append(duration)
+        return durations
+
+def record_report(report_file, suite=None, db_path=REPORT_DB):
+    """Index a freshly written report file, logging instead of failing the run."""
+    try:
+        report_id = ReportStore(db_path).add_report_file(report_file, suite)
+        print(f"🗄️ Report indexed in {db_path} (id {report_id})")
+        return report_id
+    except Exception as e:
+        print(f"⚠️ Could not index report in {db_path}: {e}")
+        return None
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+RESPONSE_CACHE_DIR = ".gemini_cache"
+RESPONSE_CACHE_MAX_AGE = 7 * 24 * 3600
+RESPONSE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+class ResponseCache:
+    """On-disk cache of LLM responses keyed by a hash of model and prompt.
+
+    Each response is stored as its own JSON file. Entries older than
+    max_age seconds are ignored and removed, and the oldest entries are
+    evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=RESPONSE_CACHE_DIR, max_age=RESPONSE_CACHE_MAX_AGE,
+                 max_bytes=RESPONSE_CACHE_MAX_BYTES, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model, prompt):
+        """Return the content address for a model and prompt."""
+        return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, model, prompt):
+        """Return the cached response text, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        path = self._path(self.make_key(model, prompt))
+        with self.lock:
+            try:
+                if time.time() - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+                    self.misses += 1
+                    return None
+                with open(path, "r", encoding="utf-8") as f:
+                    text = json.load(f)["response"]
+            except (OSError, ValueError, KeyError):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return text
+
+    def put(self, model, prompt, text):
+        """Store a response and evict old entries if the cache is over budget."""
+        if not self.enabled:
+            return
+
+        with self.lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(self.make_key(model, prompt))
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"model": model, "created": time.time(), "response": text}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def delete(self, model, prompt):
+        """Drop the cached response for a model and prompt, if any."""
+        with self.lock:
+            try:
+                os.remove(self._path(self.make_key(model, prompt)))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Remove expired entries, then the oldest ones until under max_bytes."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                self._remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        """Delete a cache file that another process may already have evicted."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Delete every cached response."""
+        with self.lock:
+            if not os.path.isdir(self.cache_dir):
+                return
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    self._remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        """Return hit/miss counters for this process."""
+        return {"hits": self.hits, "misses": self.misses, "enabled": self.enabled}
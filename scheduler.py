@@ -0,0 +1,107 @@
+import heapq
+import sqlite3
+import statistics
+from report_store import REPORT_DB, ReportStore
+
+DEFAULT_TEST_DURATION = 10.0
+DURATION_SAMPLES = 5
+HISTORY_REPORTS = 50
+
+def makespan(durations, order, workers):
+    """Return how long workers pulling tests from a queue in this order take to finish them all."""
+    finish_times = [0.0] * max(1, workers)
+    for index in order:
+        heapq.heapreplace(finish_times, finish_times[0] + durations[index])
+    return max(finish_times)
+
+def shard_by_count(tests, shards):
+    """Split test positions into shards of (nearly) equal size, keeping file order."""
+    size, extra = divmod(len(tests), shards)
+    result, start = [], 0
+    for shard in range(shards):
+        end = start + size + (1 if shard < extra else 0)
+        result.append(list(range(start, end)))
+        start = end
+    return result
+
+def shard_by_duration(tests, shards, durations):
+    """Split test positions so each shard gets about the same expected runtime.
+
+    Tests are assigned longest first to the shard with the least work so
+    far, using the estimates from DurationScheduler.
+    """
+    loads = [0.0] * shards
+    result = [[] for _ in range(shards)]
+    for position in sorted(range(len(tests)), key=lambda i: durations[i], reverse=True):
+        shard = loads.index(min(loads))
+        result[shard].append(position)
+        loads[shard] += durations[position]
+    for shard, load in enumerate(loads):
+        print(f"🧩 Shard {shard}: {len(result[shard])} tests, ~{load:.1f}s expected")
+    return [sorted(positions) for positions in result]
+
+class DurationScheduler:
+    """Order tests longest-first from their runtimes in past reports (LPT scheduling).
+
+    Each test's duration is the median of its recent runs in the report
+    store, then its average in the flakiness history; both only count runs
+    of the same suite. Tests never seen before are estimated from their
+    step count at the suite's average time per step. Known-flaky tests are
+    stretched by the retries they are likely to need, since a retry keeps
+    their worker busy too.
+    """
+
+    def __init__(self, report_db=REPORT_DB, history=None, workers=1, samples=DURATION_SAMPLES, suite=None):
+        self.report_db = report_db
+        self.suite = suite
+        self.history = history
+        self.workers = workers
+        self.samples = samples
+
+    def past_durations(self, tests):
+        """Return {name: [durations newest first]} for the tests found in recent reports."""
+        if not self.report_db:
+            return {}
+        names = {test["name"] for test in tests}
+        try:
+            found = ReportStore(self.report_db).test_durations(HISTORY_REPORTS, self.suite)
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Could not read past durations from {self.report_db}: {e}")
+            return {}
+        return {name: durations[:self.samples] for name, durations in found.items() if name in names}
+
+    def estimates(self, tests, retries=0):
+        """Return an estimated duration in seconds for every test."""
+        past = self.past_durations(tests)
+        known = {}
+        for index, test in enumerate(tests):
+            if test["name"] in past:
+                known[index] = statistics.median(past[test["name"]])
+            elif self.history and self.history.avg_duration(test["name"]):
+                known[index] = self.history.avg_duration(test["name"])
+
+        known_steps = sum(len(tests[index].get("steps", [])) for index in known)
+        per_step = sum(known.values()) / known_steps if known_steps else None
+        estimates = []
+        for index, test in enumerate(tests):
+            estimate = known.get(index)
+            if estimate is None:
+                steps = len(test.get("steps", []))
+                estimate = per_step * steps if per_step and steps else DEFAULT_TEST_DURATION
+            if self.history and retries:
+                estimate *= 1 + self.history.flaky_rate(test["name"]) * retries
+            estimates.append(estimate)
+
+        if tests:
+            print(f"⏱️ Estimated durations for {len(tests)} tests ({len(tests) - len(known)} without history)")
+        return estimates
+
+    def order(self, tests, order, retries=0):
+        """Reorder test indices longest-first; ties keep their position in order."""
+        estimates = self.estimates(tests, retries)
+        scheduled = sorted(order, key=lambda index: estimates[index], reverse=True)
+        print(
+            f"⏱️ LPT schedule on {self.workers} workers: ~{makespan(estimates, scheduled, self.workers):.1f}s "
+            f"expected (was ~{makespan(estimates, order, self.workers):.1f}s)"
+        )
+        return scheduled
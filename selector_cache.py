@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+from file_lock import file_lock
+from urllib.parse import urlparse
+
+SELECTOR_CACHE_FILE = "selector_cache.json"
+DEMOTE_AFTER_FAILURES = 2
+
+class SelectorCache:
+    """Remember which candidate selector worked for a step on a given page.
+
+    Entries are keyed by host, URL path and a signature of the step, and
+    each entry tracks per-selector successes and consecutive failures.
+    Outcomes recorded since the last save are replayed onto the file's
+    current contents under a file lock when saving.
+    """
+
+    def __init__(self, path=SELECTOR_CACHE_FILE, demote_after=DEMOTE_AFTER_FAILURES):
+        self.path = path
+        self.demote_after = demote_after
+        self.lock = threading.Lock()
+        self.pending = []
+        self.entries = self.read()
+        if self.entries:
+            print(f"🧠 Loaded selector cache with {len(self.entries)} entries from {self.path}")
+
+    def read(self):
+        """Read cached entries from disk, returning none if the file is missing or corrupt."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("entries", {})
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, AttributeError) as e:
+            print(f"⚠️ Ignoring unreadable selector cache '{self.path}': {e}")
+            return {}
+
+    def save(self):
+        """Merge the outcomes recorded since the last save into the file."""
+        with self.lock:
+            if not self.pending:
+                return
+            with file_lock(self.path):
+                entries = self.read()
+                for key, selector, success in self.pending:
+                    self.apply(entries, key, selector, success)
+                tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"entries": entries}, f, indent=2)
+                os.replace(tmp_path, self.path)
+            self.entries = entries
+            self.pending = []
+        print(f"🧠 Selector cache saved: {self.path}")
+
+    @staticmethod
+    def make_key(url, step):
+        """Build the cache key for a step executed on the given page URL."""
+        parsed = urlparse(url or "")
+        selectors = step.get("selector", "")
+        if not isinstance(selectors, list):
+            selectors = [selectors]
+        signature = json.dumps([step.get("action"), sorted(str(s) for s in selectors if s)])
+        digest = hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+        return f"{parsed.netloc}|{parsed.path or '/'}|{step.get('action')}:{digest}"
+
+    def order(self, key, selectors):
+        """Return the candidates with the last winner first and repeat failures last."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return list(selectors)
+            stats = entry.get("selectors", {})
+            last_success = entry.get("last_success")
+
+        def rank(item):
+            position, selector = item
+            selector_stats = stats.get(selector, {})
+            if selector == last_success:
+                group = 0
+            elif selector_stats.get("consecutive_failures", 0) >= self.demote_after:
+                group = 2
+            else:
+                group = 1
+            return (group, -selector_stats.get("successes", 0), position)
+
+        return [selector for _, selector in sorted(enumerate(selectors), key=rank)]
+
+    def record(self, key, selector, success):
+        """Record the outcome of trying a selector for the given key."""
+        with self.lock:
+            self.apply(self.entries, key, selector, success)
+            self.pending.append((key, selector, success))
+
+    def apply(self, entries, key, selector, success):
+        """Update the entry for key in entries with one selector outcome."""
+        entry = entries.setdefault(key, {"last_success": None, "selectors": {}})
+        stats = entry["selectors"].setdefault(selector, {"successes": 0, "failures": 0, "consecutive_failures": 0})
+        if success:
+            stats["successes"] += 1
+            stats["consecutive_failures"] = 0
+            entry["last_success"] = selector
+        else:
+            stats["failures"] += 1
+            stats["consecutive_failures"] += 1
+            if entry["last_success"] == selector and stats["consecutive_failures"] >= self.demote_after:
+                entry["last_success"] = None
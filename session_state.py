@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from urllib.parse import urljoin, urlparse
+
+SESSION_STATE_FILE = "session_state.json"
+SESSION_MAX_AGE = 60 * 60
+SESSION_FILE_MODE = 0o600
+LOGIN_FIXTURE = "login"
+
+def login_step_count(test):
+    """Return how many leading steps of a test make up its login fixture."""
+    count = 0
+    for step in test.get("steps", []):
+        if step.get("fixture") != LOGIN_FIXTURE:
+            break
+        count += 1
+    return count
+
+def login_landing_url(login_steps):
+    """Return the URL a logged-in test continues from after its login steps."""
+    login_url = next((step.get("value") for step in login_steps if step["action"] == "navigate"), None)
+    expected = next(
+        (step.get("value") for step in reversed(login_steps) if step["action"] == "expect" and step.get("selector") == "url"),
+        None
+    )
+    if login_url and expected:
+        return urljoin(login_url, expected)
+    return login_url
+
+def is_login_page(url, login_steps):
+    """Check whether url is the login page the fixture navigates to."""
+    login_url = next((step.get("value") for step in login_steps if step["action"] == "navigate"), None)
+    return bool(login_url) and urlparse(url).path.rstrip("/") == urlparse(login_url).path.rstrip("/")
+
+def session_key(login_steps):
+    """Return a file-name key for the site and credentials a login fixture signs in with.
+
+    The host keeps the files readable; the digest of the login steps (URL,
+    selectors and typed values) tells base URLs and accounts on one host apart.
+    """
+    login_url = next((step.get("value") for step in login_steps if step["action"] == "navigate"), None)
+    host = re.sub(r"[^A-Za-z0-9_.-]+", "_", urlparse(login_url or "").netloc).strip("_") or "local"
+    digest = hashlib.sha256(json.dumps(
+        [[step.get("action"), step.get("selector"), step.get("value")] for step in login_steps]
+    ).encode("utf-8")).hexdigest()[:12]
+    return f"{host}.{digest}"
+
+class SessionManager:
+    """Share an authenticated browser session between tests.
+
+    The first test that runs its login fixture in a browser context saves
+    the context's storage state; later tests in that context (and contexts
+    created from the saved state) skip their login steps. path is the base
+    name: the state is stored per site and login (see session_key), so a
+    session saved for one site or account is never loaded for another.
+    """
+
+    def __init__(self, path=SESSION_STATE_FILE, max_age=SESSION_MAX_AGE):
+        self.base_path = path
+        self.path = None
+        self.max_age = max_age
+        self.contexts = weakref.WeakSet()
+        self.lock = threading.Lock()
+
+    def bind(self, tests):
+        """Pick the state file for the login fixture of the first test that has one."""
+        if self.path:
+            return
+        protected = next((test for test in tests if login_step_count(test)), None)
+        if not protected:
+            return
+        root, ext = os.path.splitext(self.base_path)
+        with self.lock:
+            if not self.path:
+                key = session_key(protected["steps"][:login_step_count(protected)])
+                self.path = f"{root}.{key}{ext or '.json'}"
+
+    def storage_state(self):
+        """Return the saved storage state path if it is recent enough to reuse."""
+        if not self.path:
+            return None
+        try:
+            if time.time() - os.path.getmtime(self.path) < self.max_age:
+                return self.path
+        except OSError:
+            pass
+        return None
+
+    def has_session(self, context):
+        with self.lock:
+            return context in self.contexts
+
+    def mark(self, context):
+        """Remember that a context holds a logged-in session."""
+        with self.lock:
+            self.contexts.add(context)
+
+    def forget(self, context):
+        """Drop a context whose session turned out to be expired."""
+        with self.lock:
+            self.contexts.discard(context)
+
+    def save(self, state):
+        """Write a storage state dict to disk atomically, readable by the owner only."""
+        with self.lock:
+            path = self.path or self.base_path
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, SESSION_FILE_MODE)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+        print(f"🔐 Session state saved: {path}")
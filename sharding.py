@@ -0,0 +1,279 @@
+import glob
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from flaky_history import FLAKINESS_HISTORY_FILE, FlakinessHistory
+from report_store import REPORT_DB, record_report
+from scheduler import DurationScheduler, shard_by_count, shard_by_duration
+from testing import (
+    apply_base_url, execute_test_cases, load_test_cases, skipped_test_result, summarize_results, write_report
+)
+
+SHARD_ROOT = "shards"
+MANIFEST_FILE = "manifest.json"
+LEASE_SECONDS = 120
+POLL_SECONDS = 1
+
+def shard_path(queue_dir, shard, kind):
+    return os.path.join(queue_dir, f"shard_{shard}.{kind}.json")
+
+def write_json(path, data):
+    """Write JSON atomically so readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def claim_next_shard(queue_dir):
+    """Atomically claim the first shard nobody owns and return its number, or None."""
+    manifest = read_json(os.path.join(queue_dir, MANIFEST_FILE))
+    for shard in range(manifest["shards"]):
+        if os.path.exists(shard_path(queue_dir, shard, "result")):
+            continue
+        try:
+            fd = os.open(shard_path(queue_dir, shard, "claim"), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            continue
+        with os.fdopen(fd, "w") as f:
+            json.dump({"host": socket.gethostname(), "pid": os.getpid(), "claimed_at": time.time()}, f)
+        return shard
+    return None
+
+def release_stale_claims(queue_dir, shards, lease=LEASE_SECONDS):
+    """Drop claims whose worker stopped renewing them so another worker can take the shard."""
+    for shard in range(shards):
+        claim = shard_path(queue_dir, shard, "claim")
+        if os.path.exists(shard_path(queue_dir, shard, "result")):
+            continue
+        try:
+            if time.time() - os.path.getmtime(claim) > lease:
+                os.remove(claim)
+                print(f"♻️ Shard {shard} claim expired, returning it to the queue")
+        except FileNotFoundError:
+            pass
+
+def unclaimed_shard(queue_dir, shards):
+    """Return the first shard that is neither claimed nor finished, without claiming it."""
+    for shard in range(shards):
+        if not os.path.exists(shard_path(queue_dir, shard, "claim")) and \
+                not os.path.exists(shard_path(queue_dir, shard, "result")):
+            return shard
+    return None
+
+def outstanding_claims(queue_dir, shards):
+    """Return the shards that are claimed but have no result yet."""
+    return [
+        shard for shard in range(shards)
+        if os.path.exists(shard_path(queue_dir, shard, "claim"))
+        and not os.path.exists(shard_path(queue_dir, shard, "result"))
+    ]
+
+def start_local_worker(queue_dir):
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker", "--queue-dir", queue_dir])
+
+def keep_claim_alive(claim, stop_event, lease=LEASE_SECONDS):
+    """Renew a shard claim until stop_event is set."""
+    while not stop_event.wait(lease / 3):
+        try:
+            os.utime(claim)
+        except OSError:
+            return
+
+def run_worker(queue_dir):
+    """Claim and execute shards from a queue directory until none are left."""
+    manifest = read_json(os.path.join(queue_dir, MANIFEST_FILE))
+    settings = manifest["settings"]
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"👷 Shard worker {worker_name} polling {queue_dir}")
+
+    while True:
+        shard = claim_next_shard(queue_dir)
+        if shard is None:
+            print(f"👷 Shard worker {worker_name} found no more shards")
+            return
+
+        shard_data = read_json(shard_path(queue_dir, shard, "tests"))
+        print(f"🧩 {worker_name} running shard {shard} ({len(shard_data['tests'])} tests)")
+        stop_event = threading.Event()
+        heartbeat = threading.Thread(
+            target=keep_claim_alive, args=(shard_path(queue_dir, shard, "claim"), stop_event), daemon=True
+        )
+        heartbeat.start()
+        partial_report = shard_path(queue_dir, shard, "partial")
+        try:
+            report_file = execute_test_cases(
+                {"tests": shard_data["tests"]},
+                headless=settings["headless"],
+                timeout=settings["timeout"],
+                retries=settings["retries"],
+                workers=settings["workers"],
+                wait_mode=settings["wait_mode"],
+                suite=manifest["test_file"],
+                report_db=None,
+                report_file=partial_report
+            )
+            result = read_json(report_file) if report_file else {"tests": [], "error": "Shard execution failed"}
+        except Exception as e:
+            result = {"tests": [], "error": str(e)}
+        finally:
+            stop_event.set()
+
+        result["positions"] = shard_data["positions"]
+        result["worker"] = worker_name
+        write_json(shard_path(queue_dir, shard, "result"), result)
+        if os.path.exists(partial_report):
+            os.remove(partial_report)
+
+def merge_shard_results(queue_dir, tests, shards):
+    """Combine shard reports into per-test results in the original file order."""
+    details = [None] * len(tests)
+    for shard in range(shards):
+        try:
+            result = read_json(shard_path(queue_dir, shard, "result"))
+        except FileNotFoundError:
+            print(f"⚠️ Shard {shard} produced no result")
+            continue
+        if result.get("error"):
+            print(f"⚠️ Shard {shard} failed on {result.get('worker')}: {result['error']}")
+        for position, test_result in zip(result["positions"], result.get("tests", [])):
+            details[position] = test_result
+
+    return [
+        test_result or skipped_test_result(tests[position], "Shard was not executed")
+        for position, test_result in enumerate(details)
+    ]
+
+def coordinate(test_file, shards=4, processes=None, strategy="count", base_url=None, headless=True, timeout=5000,
+               retries=2, workers=1, wait_mode="fixed", history=FLAKINESS_HISTORY_FILE, report_db=REPORT_DB,
+               shard_root=SHARD_ROOT, wait_timeout=None):
+    """Shard a test file, run the shards on worker processes and merge one report.
+
+    processes local workers are started (defaults to one per shard); more
+    workers on other hosts can join by running `sharding.py worker` against
+    the same queue directory on a shared filesystem. strategy is "count"
+    or "duration" (balanced by runtimes from past reports and the
+    flakiness history).
+    """
+    test_cases = load_test_cases(test_file)
+    if not test_cases:
+        return False
+    tests = test_cases["tests"]
+    if base_url:
+        for test in tests:
+            apply_base_url(test, base_url)
+
+    shards = max(1, min(shards, len(tests)))
+    if strategy == "duration":
+        scheduler = DurationScheduler(
+            report_db, FlakinessHistory(history, test_file) if history else None, shards, suite=test_file
+        )
+        durations = scheduler.estimates(tests, retries)
+        shard_positions = shard_by_duration(tests, shards, durations)
+    else:
+        shard_positions = shard_by_count(tests, shards)
+
+    # The pid keeps coordinators started in the same second apart; makedirs fails rather than share a queue
+    queue_dir = os.path.join(shard_root, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}")
+    os.makedirs(shard_root, exist_ok=True)
+    os.makedirs(queue_dir)
+    for shard, positions in enumerate(shard_positions):
+        write_json(shard_path(queue_dir, shard, "tests"), {
+            "positions": positions,
+            "tests": [tests[position] for position in positions]
+        })
+    write_json(os.path.join(queue_dir, MANIFEST_FILE), {
+        "test_file": test_file,
+        "shards": shards,
+        "settings": {
+            "headless": headless,
+            "timeout": timeout,
+            "retries": retries,
+            "workers": workers,
+            "wait_mode": wait_mode
+        }
+    })
+    print(f"🧩 Split {len(tests)} tests into {shards} shards by {strategy} in {queue_dir}")
+
+    processes = shards if processes is None else processes
+    procs = [start_local_worker(queue_dir) for _ in range(processes)]
+    restarts = 0
+    print(f"🚀 Started {len(procs)} local shard workers")
+
+    start_time = time.time()
+    while len(glob.glob(os.path.join(queue_dir, "shard_*.result.json"))) < shards:
+        release_stale_claims(queue_dir, shards)
+        if procs and all(proc.poll() is not None for proc in procs):
+            if unclaimed_shard(queue_dir, shards) is None and not outstanding_claims(queue_dir, shards):
+                print("⚠️ All local workers exited before every shard finished")
+                break
+            if unclaimed_shard(queue_dir, shards) is not None:
+                if restarts >= shards:
+                    print("⚠️ Local shard workers keep exiting, giving up")
+                    break
+                restarts += 1
+                procs.append(start_local_worker(queue_dir))
+        if wait_timeout and time.time() - start_time > wait_timeout:
+            print(f"⚠️ Gave up waiting for shards after {wait_timeout}s")
+            break
+        time.sleep(POLL_SECONDS)
+
+    for proc in procs:
+        if proc.poll() is None:
+            proc.wait()
+
+    details = merge_shard_results(queue_dir, tests, shards)
+    execution_time = time.time() - start_time
+    report_file = write_report(summarize_results(details), execution_time)
+    if report_db:
+        record_report(report_file, test_file, report_db)
+    return report_file
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run Playwright tests sharded across executor processes")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    coordinator_parser = subparsers.add_parser("coordinate", help="Shard a test file and merge the results")
+    coordinator_parser.add_argument("--test-file", default="playwright_tests.json", help="Path to test cases JSON file")
+    coordinator_parser.add_argument("--shards", type=int, default=4, help="Number of shards")
+    coordinator_parser.add_argument("--processes", type=int, default=None, help="Local worker processes (default: one per shard)")
+    coordinator_parser.add_argument("--strategy", choices=["count", "duration"], default="count", help="How tests are split")
+    coordinator_parser.add_argument("--headless", action="store_true", default=False, help="Run in headless mode")
+    coordinator_parser.add_argument("--timeout", type=int, default=5000, help="Timeout in milliseconds")
+    coordinator_parser.add_argument("--retries", type=int, default=2, help="Number of retries for failed tests")
+    coordinator_parser.add_argument("--workers", type=int, default=1, help="Browser workers inside each shard process")
+    coordinator_parser.add_argument("--wait-mode", choices=["fixed", "smart"], default="fixed", help="Fixed sleeps or event-driven waits after submissions")
+    coordinator_parser.add_argument("--base-url", default="https://krishi-mitra-front.vercel.app/", help="Base URL for tests")
+    coordinator_parser.add_argument("--wait-timeout", type=int, default=None, help="Seconds to wait for all shards")
+
+    worker_parser = subparsers.add_parser("worker", help="Claim and run shards from a queue directory")
+    worker_parser.add_argument("--queue-dir", required=True, help="Queue directory written by the coordinator")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        run_worker(args.queue_dir)
+        sys.exit(0)
+
+    report_file = coordinate(
+        args.test_file,
+        shards=args.shards,
+        processes=args.processes,
+        strategy=args.strategy,
+        base_url=args.base_url,
+        headless=args.headless,
+        timeout=args.timeout,
+        retries=args.retries,
+        workers=args.workers,
+        wait_mode=args.wait_mode,
+        wait_timeout=args.wait_timeout
+    )
+    sys.exit(0 if report_file else 1)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import threading
+import weakref
+
+# Assertions are never skipped: an earlier test in the same context may have changed what they check
+SNAPSHOT_SAFE_ACTIONS = ("navigate", "wait")
+MIN_SHARED_TESTS = 2
+MIN_PREFIX_STEPS = 2
+
+def step_signature(step):
+    """Return a string identifying what a step does, ignoring executor-only fields."""
+    return json.dumps([step.get("action"), step.get("selector"), step.get("value")], sort_keys=True)
+
+def prefix_key(signatures):
+    return hashlib.sha1("\n".join(signatures).encode("utf-8")).hexdigest()[:16]
+
+class PrefixTrie:
+    """Trie of step signatures recording which tests pass through each prefix."""
+
+    def __init__(self):
+        self.root = {"children": {}, "tests": [], "ends": []}
+
+    def add(self, index, steps):
+        node = self.root
+        node["tests"].append(index)
+        for step in steps:
+            node = node["children"].setdefault(step_signature(step), {"children": {}, "tests": [], "ends": []})
+            node["tests"].append(index)
+        node["ends"].append(index)
+
+    def shared_prefixes(self, min_tests=MIN_SHARED_TESTS):
+        """Return the longest prefixes shared by at least min_tests tests."""
+        shared = []
+
+        def walk(node, signatures):
+            branches = [child for child in node["children"].values() if len(child["tests"]) >= min_tests]
+            if signatures and (node["ends"] or len(branches) != 1 or len(branches[0]["tests"]) < len(node["tests"])):
+                shared.append({"length": len(signatures), "tests": list(node["tests"]), "signatures": list(signatures)})
+            for signature, child in node["children"].items():
+                if len(child["tests"]) >= min_tests:
+                    walk(child, signatures + [signature])
+
+        walk(self.root, [])
+        return shared
+
+    def redundant_steps(self, min_tests=MIN_SHARED_TESTS):
+        """Count step executions that repeat a prefix another test already ran."""
+        total = 0
+        stack = list(self.root["children"].values())
+        while stack:
+            node = stack.pop()
+            if len(node["tests"]) >= min_tests:
+                total += len(node["tests"]) - 1
+                stack.extend(node["children"].values())
+        return total
+
+    def order(self):
+        """Return test indices in depth-first order so tests sharing a prefix run back to back."""
+        ordered = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            ordered.extend(node["ends"])
+            stack.extend(reversed(list(node["children"].values())))
+        return ordered
+
+class PrefixPlan:
+    """Shared setup prefixes of a suite and the pages they lead to in each browser context.
+
+    Only prefixes made of navigation and waits are reused: the state they
+    reach is fully described by the URL plus the context's cookies and
+    storage, so a later test can jump straight to that URL.
+    """
+
+    def __init__(self, tests, min_tests=MIN_SHARED_TESTS, min_steps=MIN_PREFIX_STEPS):
+        self.trie = PrefixTrie()
+        for index, test in enumerate(tests):
+            self.trie.add(index, test.get("steps", []))
+        self.prefixes = {}
+        self.snapshots = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+
+        for test in tests:
+            node = self.trie.root
+            signatures = []
+            candidates = []
+            for step in test.get("steps", []):
+                if step.get("action") not in SNAPSHOT_SAFE_ACTIONS:
+                    break
+                node = node["children"][step_signature(step)]
+                if len(node["tests"]) < min_tests:
+                    break
+                signatures.append(step_signature(step))
+                if len(signatures) >= min_steps:
+                    candidates.append((prefix_key(signatures), len(signatures)))
+            if candidates:
+                self.prefixes[id(test)] = candidates
+
+    def prefixes_for(self, test):
+        """Return the (key, length) of every reusable prefix of a test, shortest first."""
+        return self.prefixes.get(id(test), [])
+
+    def best_snapshot(self, context, prefixes, after=0):
+        """Return (url, length) for the longest prefix longer than after that this context already ran."""
+        with self.lock:
+            snapshots = self.snapshots.get(context, {})
+            for key, length in reversed(prefixes):
+                if length > after and key in snapshots:
+                    return snapshots[key], length
+        return None
+
+    def remember(self, context, key, url):
+        with self.lock:
+            self.snapshots.setdefault(context, {})[key] = url
+
+    def execution_order(self):
+        return self.trie.order()
+
+    def summary(self):
+        return {
+            "reusable_tests": len(self.prefixes),
+            "shared_prefixes": len(self.trie.shared_prefixes()),
+            "redundant_steps": self.trie.redundant_steps()
+        }
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Find step prefixes shared by generated Playwright tests")
+    parser.add_argument("test_file", nargs="?", default="playwright_tests.json", help="Path to test cases JSON file")
+    parser.add_argument("--min-tests", type=int, default=MIN_SHARED_TESTS, help="Minimum tests sharing a prefix")
+    args = parser.parse_args()
+
+    with open(args.test_file, "r", encoding="utf-8") as f:
+        tests = json.load(f).get("tests", [])
+
+    trie = PrefixTrie()
+    for index, test in enumerate(tests):
+        trie.add(index, test.get("steps", []))
+
+    print(f"📋 {len(tests)} tests, {sum(len(test.get('steps', [])) for test in tests)} steps")
+    for prefix in sorted(trie.shared_prefixes(args.min_tests), key=lambda p: p["length"] * len(p["tests"]), reverse=True):
+        first = json.loads(prefix["signatures"][0])
+        print(f"🔁 {prefix['length']} steps shared by {len(prefix['tests'])} tests (starts with {first[0]} {first[2] or ''})")
+    print(f"♻️ {trie.redundant_steps(args.min_tests)} step executions repeat a shared prefix")
+    print(f"📐 {PrefixPlan(tests, args.min_tests).summary()['reusable_tests']} tests can reuse a navigation-only prefix")
@@ -1,9 +1,102 @@
 import json
 import os
+import queue
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from flaky_history import FLAKINESS_HISTORY_FILE, FlakinessHistory
+from har_archive import HAR_DIR, HAR_MODES, HarArchive
+from network_filter import (
+    ASSET_CACHE_DIR, BLOCKED_DOMAINS, BLOCKED_RESOURCE_TYPES, PLACEHOLDER_IMAGE, NetworkFilter, response_headers,
+    split_list
+)
+from selector_cache import SelectorCache, SELECTOR_CACHE_FILE
+from report_store import REPORT_DB, record_report, summarize_timing
+from scheduler import DurationScheduler
+from session_state import SESSION_STATE_FILE, SessionManager, is_login_page, login_landing_url, login_step_count
+from step_prefix import PrefixPlan
+
+NAVIGATION_TIMING_SCRIPT = """() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (!nav) return null;
+    const paint = performance.getEntriesByName('first-contentful-paint')[0];
+    return {
+        url: nav.name,
+        ttfb: nav.responseStart - nav.requestStart,
+        response: nav.responseEnd - nav.responseStart,
+        domInteractive: nav.domInteractive,
+        domContentLoaded: nav.domContentLoadedEventEnd,
+        load: nav.loadEventEnd,
+        firstContentfulPaint: paint ? paint.startTime : null,
+        transferSize: nav.transferSize
+    };
+}"""
+
+SMART_WAIT_TIMEOUT = 5000
+DOM_QUIET_MS = 300
+LOAD_STATES = ("load", "domcontentloaded", "networkidle")
+
+# Tracks DOM mutations and in-flight fetch/XHR requests; the quiet period restarts on every call
+DOM_OBSERVER_SCRIPT = """() => {
+    window.__testifyLastMutation = performance.now();
+    if (window.__testifyObserver) return;
+    window.__testifyPending = 0;
+    const touch = () => { window.__testifyLastMutation = performance.now(); };
+    const done = () => { window.__testifyPending = Math.max(0, window.__testifyPending - 1); touch(); };
+    window.__testifyObserver = new MutationObserver(touch);
+    window.__testifyObserver.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function(...args) {
+            window.__testifyPending++;
+            try {
+                const request = originalFetch.apply(this, args);
+                request.then(done, done);
+                return request;
+            } catch (e) {
+                done();
+                throw e;
+            }
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function(...args) {
+        window.__testifyPending++;
+        this.addEventListener('loadend', done, {once: true});
+        return originalSend.apply(this, args);
+    };
+}"""
+
+# The observer doubles as a tag: a document loaded since watch_dom (e.g. a POST back to the same URL) has none
+MARK_WAIT_START_SCRIPT = """() => {
+    if (!window.__testifyObserver) return false;
+    window.__testifyLastMutation = performance.now();
+    return true;
+}"""
+
+DOCUMENT_REPLACED_SCRIPT = """() => !window.__testifyObserver"""
+
+PAGE_SETTLED_SCRIPT = """({url, quiet}) => {
+    if (location.href !== url || !window.__testifyObserver) return true;
+    if (document.readyState !== 'complete' || window.__testifyLastMutation === undefined) return false;
+    if (window.__testifyPending > 0) return false;
+    return performance.now() - window.__testifyLastMutation >= quiet;
+}"""
+
+class SelectorResolutionError(Exception):
+    """Raised when none of the candidate selectors of a step worked.
+    
+    missing is True when every candidate timed out, i.e. the element never
+    showed up under any selector.
+    """
+    
+    def __init__(self, selectors, errors, missing):
+        self.selectors = selectors
+        self.errors = errors
+        self.missing = missing
+        super().__init__(f"No candidate selector worked ({len(selectors)} tried): {errors[-1] if errors else 'no error'}")
 
 def load_test_cases(filename="test_cases.json"):
     """Load test cases from a JSON file."""
@@ -39,8 +132,13 @@ def check_visibility(page, selector):
         raise AssertionError(f"Element '{selector}' is not visible")
     return True
 
-def try_selectors(page, action_fn, selectors):
-    """Try an action with multiple selectors until one works."""
+def try_selectors(page, action_fn, selectors, cache=None, cache_key=None, attempts=None):
+    """Try an action with multiple selectors until one works.
+    
+    When a selector cache is given, candidates that worked before are tried
+    first and every outcome is recorded under cache_key. When attempts is a
+    list, the duration and outcome of each candidate is appended to it.
+    """
     if not isinstance(selectors, list):
         selectors = [selectors]
     
@@ -49,203 +147,663 @@ def try_selectors(page, action_fn, selectors):
     if not selectors:
         raise ValueError("No valid selectors provided")
     
-    last_error = None
+    if cache and cache_key:
+        selectors = cache.order(cache_key, selectors)
+    
+    errors = []
     for selector in selectors:
+        attempt_start = time.perf_counter()
         try:
             print(f"    🔍 Trying with selector: '{selector}'")
             action_fn(selector)
             print(f"    ✅ Selector worked: '{selector}'")
-            return True
+            record_attempt(attempts, selector, attempt_start, True)
+            if cache and cache_key:
+                cache.record(cache_key, selector, True)
+            return selector
         except Exception as e:
-            last_error = e
+            errors.append(e)
             print(f"    ⚠️ Failed with selector: '{selector}' - {str(e)}")
+            record_attempt(attempts, selector, attempt_start, False)
+            if cache and cache_key:
+                cache.record(cache_key, selector, False)
     
-    if last_error:
-        raise last_error
-    else:
-        raise ValueError("No valid selectors provided")
+    raise SelectorResolutionError(selectors, errors, all(isinstance(e, PlaywrightTimeoutError) for e in errors))
 
-def execute_test_cases(test_cases, headless=False, timeout=5000, retries=2):
-    """Execute Playwright test cases with proper error handling and retries."""
-    if not test_cases:
-        print("❌ No test cases to execute.")
-        return False
+def record_attempt(attempts, selector, start, success):
+    """Append the timing of one selector attempt to attempts, if it is a list."""
+    if attempts is not None:
+        attempts.append({
+            "selector": selector,
+            "duration": round(time.perf_counter() - start, 4),
+            "success": success
+        })
+
+def combined_locator(page, selectors):
+    """Build one locator that matches any of the candidate selectors."""
+    locator = page.locator(selectors[0])
+    for selector in selectors[1:]:
+        locator = locator.or_(page.locator(selector))
+    return locator
+
+def race_selectors(page, action_fn, selectors, timeout, cache=None, cache_key=None, attempts=None):
+    """Wait for all candidate selectors at once and act on the first that matches.
     
-    results = {
-        "total": 0,
-        "passed": 0,
-        "failed": 0,
-        "skipped": 0,
-        "details": []
-    }
+    Falls back to try_selectors when the candidates cannot be combined.
+    Visible matches are tried first, then hidden matches, then the rest.
+    """
+    if not isinstance(selectors, list):
+        selectors = [selectors]
     
-    start_time = time.time()
+    selectors = [s for s in selectors if s]
+    
+    if not selectors:
+        raise ValueError("No valid selectors provided")
+    
+    if cache and cache_key:
+        selectors = cache.order(cache_key, selectors)
     
+    print(f"    🏁 Racing {len(selectors)} selectors")
+    race_start = time.perf_counter()
+    try:
+        combined_locator(page, selectors).first.wait_for(state="attached", timeout=timeout)
+    except PlaywrightTimeoutError as e:
+        record_attempt(attempts, "race", race_start, False)
+        if cache and cache_key:
+            for selector in selectors:
+                cache.record(cache_key, selector, False)
+        raise SelectorResolutionError(selectors, [e], True) from e
+    except Exception as e:
+        print(f"    ⚠️ Could not race selectors ({e}), trying them one by one")
+        return try_selectors(page, action_fn, selectors, cache, cache_key, attempts)
+    record_attempt(attempts, "race", race_start, True)
+    
+    # Visible matches go first so a hidden duplicate cannot use up an action timeout
+    matching = [s for s in selectors if page.locator(s).count() > 0]
+    visible = [s for s in matching if page.locator(s).first.is_visible()]
+    ordered = visible + [s for s in matching if s not in visible] + [s for s in selectors if s not in matching]
+    return try_selectors(page, action_fn, ordered, cache, cache_key, attempts)
+
+def emit_event(options, event_type, **data):
+    """Send an executor event to the on_event callback, if one was given."""
+    on_event = options.get("on_event")
+    if not on_event:
+        return
+    try:
+        on_event(event_type, data)
+    except Exception as e:
+        print(f"⚠️ Event handler failed for '{event_type}': {e}")
+
+def is_form_submit_selector(selector):
+    """Check if a click selector looks like a form submission button."""
+    keywords = ["sign in", "login", "submit", "button"]
+    if isinstance(selector, list):
+        return any(any(keyword in str(s).lower() for keyword in keywords) for s in selector)
+    return any(keyword in str(selector).lower() for keyword in keywords)
+
+def collect_navigation_timing(page):
+    """Read page-load metrics for the current document from the Performance API."""
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=headless)
-            browser_context = browser.new_context(
-                viewport={"width": 1280, "height": 720},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/90.0.4430.212 Safari/537.36"
+        return page.evaluate(NAVIGATION_TIMING_SCRIPT)
+    except Exception as e:
+        print(f"    ⚠️ Could not read navigation timing: {e}")
+        return None
+
+def watch_dom(page):
+    """Start tracking DOM mutations on the page and return its current URL."""
+    try:
+        page.evaluate(DOM_OBSERVER_SCRIPT)
+    except Exception as e:
+        print(f"    ⚠️ Could not watch DOM changes: {e}")
+    return page.url
+
+def document_replaced(page):
+    """Check whether the page loaded a new document since watch_dom, even at the same URL."""
+    try:
+        return page.evaluate(DOCUMENT_REPLACED_SCRIPT)
+    except Exception:
+        # The execution context is destroyed while a navigation is in progress
+        return True
+
+def wait_until_settled(page, url_before, timeout=SMART_WAIT_TIMEOUT):
+    """Wait until the page navigates, or no fetch/XHR is pending and the DOM has been quiet for DOM_QUIET_MS.
+    
+    The quiet period counts from the start of the wait. A new document at
+    the same URL counts as a navigation. Returns True if the page navigated.
+    Running out of time is not an error; the step simply continues with the
+    page as it is.
+    """
+    wait_start = time.perf_counter()
+    replaced = False
+    try:
+        if page.url == url_before:
+            replaced = not page.evaluate(MARK_WAIT_START_SCRIPT)
+        if not replaced:
+            page.wait_for_function(
+                PAGE_SETTLED_SCRIPT, arg={"url": url_before, "quiet": DOM_QUIET_MS}, polling=100, timeout=timeout
             )
-            
-            for test in test_cases["tests"]:
-                test_name = test["name"]
-                results["total"] += 1
-                test_result = {
-                    "name": test_name,
-                    "status": "pending",
-                    "steps_executed": 0,
-                    "total_steps": len(test["steps"]),
-                    "error": None,
-                    "retry_count": 0
-                }
+    except PlaywrightTimeoutError:
+        print(f"    ⚠️ Page still changing after {timeout} ms, continuing")
+    except Exception:
+        # The execution context is destroyed when the page navigates mid-wait
+        pass
+    
+    navigated = replaced or page.url != url_before or document_replaced(page)
+    if navigated:
+        remaining = max(1, timeout - int((time.perf_counter() - wait_start) * 1000))
+        try:
+            page.wait_for_load_state("load", timeout=remaining)
+        except PlaywrightTimeoutError:
+            print(f"    ⚠️ Page did not finish loading within {timeout} ms, continuing")
+        watch_dom(page)
+    print(f"    ⏳ Page settled in {(time.perf_counter() - wait_start) * 1000:.0f} ms")
+    return navigated
+
+def click_expecting_response(page, selector, url_part, timeout=SMART_WAIT_TIMEOUT):
+    """Click and wait for a response whose URL contains url_part, without failing if none arrives."""
+    clicked = False
+    try:
+        with page.expect_response(lambda response: url_part in response.url, timeout=timeout):
+            page.click(selector)
+            clicked = True
+        print(f"    ✓ Received response matching '{url_part}'")
+    except PlaywrightTimeoutError:
+        if not clicked:
+            raise
+        print(f"    ⚠️ No response matching '{url_part}' within {timeout} ms")
+
+def debug_auth_failure(page, test_name):
+    """Capture a screenshot and any visible error messages after a failed login."""
+    print("    🔍 Debugging authentication failure:")
+    try:
+        debug_path = f"auth_debug_{test_name.replace(' ', '_')}.png" 
+        page.screenshot(path=debug_path)
+        print(f"    📸 Auth debug screenshot: {debug_path}")
+        
+        error_selectors = [".error", ".alert", "[role='alert']", ".form-error", ".message"]
+        for error_selector in error_selectors:
+            if page.is_visible(error_selector):
+                print(f"    ❌ Found error element: {error_selector}: {page.text_content(error_selector)}")
+    except Exception as debug_err:
+        print(f"    ⚠️ Error during debugging: {debug_err}")
+
+def resume_session(page, login_steps, session):
+    """Skip a login fixture by opening its landing page with the context's saved session.
+    
+    Returns False (and forgets the session) if the site sends us back to
+    the login page, in which case the login steps run as usual.
+    """
+    landing_url = login_landing_url(login_steps)
+    if not landing_url:
+        return False
+    page.goto(landing_url)
+    if is_login_page(page.url, login_steps):
+        print("    🔐 Saved session expired, logging in again")
+        session.forget(page.context)
+        return False
+    print(f"    🔐 Reusing logged-in session, skipped {len(login_steps)} login steps")
+    return True
+
+def save_session(page, session):
+    """Save the storage state of a context that just logged in."""
+    try:
+        session.save(page.context.storage_state())
+        session.mark(page.context)
+    except Exception as e:
+        print(f"    ⚠️ Could not save session state: {e}")
+
+def execute_steps(page, test, test_result, options):
+    """Execute the steps of a single test on the given page."""
+    test_name = test["name"]
+    selector_cache = options.get("selector_cache")
+    race = options.get("selector_mode") == "race"
+    smart_wait = options.get("wait_mode") == "smart"
+    session = options.get("session")
+    login_count = login_step_count(test) if session else 0
+    if login_count:
+        session.bind([test])
+    steps_executed = 0
+    test_result["steps"] = []
+    test_result["session_reused"] = False
+    
+    if login_count and session.has_session(page.context) and resume_session(page, test["steps"][:login_count], session):
+        steps_executed = login_count
+        test_result["steps_executed"] = steps_executed
+        test_result["session_reused"] = True
+    
+    prefix_plan = options.get("prefix_plan")
+    prefixes = prefix_plan.prefixes_for(test) if prefix_plan else []
+    test_result["prefix_reused"] = 0
+    snapshot = prefix_plan.best_snapshot(page.context, prefixes, steps_executed) if prefixes else None
+    if snapshot:
+        snapshot_url, prefix_length = snapshot
+        page.goto(snapshot_url)
+        print(f"    ♻️ Reusing shared {prefix_length}-step prefix at {snapshot_url}")
+        steps_executed = prefix_length
+        test_result["steps_executed"] = steps_executed
+        test_result["prefix_reused"] = prefix_length
+    
+    for step in test["steps"][steps_executed:]:
+        action = step["action"]
+        selector = step.get("selector", "")
+        value = step.get("value", "")
+        
+        step_desc = f"  Step {steps_executed + 1}: {action}"
+        if selector:
+            if isinstance(selector, list):
+                step_desc += f" with {len(selector)} selectors"
+            else:
+                step_desc += f" on '{selector}'"
+        if value:
+            step_desc += f" with value '{value}'"
+        print(step_desc)
+        step_start = time.perf_counter()
+        
+        cache_key = SelectorCache.make_key(page.url, step) if selector_cache and selector else None
+        
+        step_record = {"index": steps_executed + 1, "action": action, "selector": None, "attempts": []}
+        
+        def resolve(action_fn):
+            if race:
+                winner = race_selectors(
+                    page, action_fn, selector, options["timeout"], selector_cache, cache_key, step_record["attempts"]
+                )
+            else:
+                winner = try_selectors(page, action_fn, selector, selector_cache, cache_key, step_record["attempts"])
+            step_record["selector"] = winner
+            emit_event(options, "selector_chosen", test=test_name, step=step_record["index"], selector=winner)
+            return winner
+        
+        try:
+            if action == "navigate":
+                page.goto(value)
+                step_record["navigation"] = collect_navigation_timing(page)
+            elif action == "click":
+                is_form_submit = is_form_submit_selector(selector)
+                response_url = step.get("wait_for_response")
                 
-                for retry in range(retries + 1):
-                    if retry > 0:
-                        print(f"🔄 Retry {retry}/{retries} for test: {test_name}")
-                        test_result["retry_count"] = retry
-                    
+                if smart_wait and is_form_submit:
+                    url_before = watch_dom(page)
+                if response_url:
+                    resolve(lambda s: click_expecting_response(page, s, response_url))
+                else:
+                    resolve(lambda s: page.click(s))
+                
+                if smart_wait and is_form_submit:
+                    if wait_until_settled(page, url_before):
+                        print(f"    ✓ Navigation completed. Current URL: {page.url}")
+                        step_record["navigation"] = collect_navigation_timing(page)
+                    elif "auth" in page.url:
+                        debug_auth_failure(page, test_name)
+                elif is_form_submit:
+                    print("    🔄 Waiting for navigation after form submission...")
                     try:
-                        page = browser_context.new_page()
-                        page.set_default_timeout(timeout)
-                        
-                        print(f"⏱️ Running: {test_name}")
-                        steps_executed = 0
-                        
-                        for step in test["steps"]:
-                            action = step["action"]
-                            selector = step.get("selector", "")
-                            value = step.get("value", "")
-                            
-                            step_desc = f"  Step {steps_executed + 1}: {action}"
-                            if selector:
-                                if isinstance(selector, list):
-                                    step_desc += f" with {len(selector)} selectors"
-                                else:
-                                    step_desc += f" on '{selector}'"
-                            if value:
-                                step_desc += f" with value '{value}'"
-                            print(step_desc)
-                            
-                            if action == "navigate":
-                                page.goto(value)
-                            elif action == "click":
-                                is_form_submit = False
-                                if isinstance(selector, list):
-                                    for s in selector:
-                                        if any(keyword in str(s).lower() for keyword in ["sign in", "login", "submit", "button"]):
-                                            is_form_submit = True
-                                            break
-                                else:
-                                    is_form_submit = any(keyword in str(selector).lower() for keyword in ["sign in", "login", "submit", "button"])
-                                
-                                try_selectors(page, lambda s: page.click(s), selector)
-                                
-                                if is_form_submit:
-                                    print("    🔄 Waiting for navigation after form submission...")
-                                    try:
-                                        with page.expect_navigation(timeout=5000, wait_until='networkidle'):
-                                            pass
-                                        print(f"    ✓ Navigation completed. Current URL: {page.url}")
-                                    except PlaywrightTimeoutError:
-                                        print(f"    ⚠️ No navigation occurred after form submission. URL: {page.url}")
-                                        
-                                        if "auth" in page.url:
-                                            print("    🔍 Debugging authentication failure:")
-                                            try:
-                                                debug_path = f"auth_debug_{test_name.replace(' ', '_')}.png" 
-                                                page.screenshot(path=debug_path)
-                                                print(f"    📸 Auth debug screenshot: {debug_path}")
-                                                
-                                                error_selectors = [".error", ".alert", "[role='alert']", ".form-error", ".message"]
-                                                for selector in error_selectors:
-                                                    if page.is_visible(selector):
-                                                        print(f"    ❌ Found error element: {selector}: {page.text_content(selector)}")
-                                            except Exception as debug_err:
-                                                print(f"    ⚠️ Error during debugging: {debug_err}")
-                                    
-                                    page.wait_for_timeout(2000)
-                            elif action == "type":
-                                try_selectors(page, lambda s: page.fill(s, value), selector)
-                            elif action == "wait":
-                                if value == "visible" and selector:
-                                    try_selectors(
-                                        page, 
-                                        lambda s: page.wait_for_selector(s, state="visible"), 
-                                        selector
-                                    )
-                                else:
-                                    wait_time = int(value) if value.isdigit() else 1000
-                                    page.wait_for_timeout(wait_time)
-                            elif action == "assert":
-                                try_selectors(
-                                    page, 
-                                    lambda s: check_text_content(page, s, value), 
-                                    selector
-                                )
-                            elif action == "assert_visible":
-                                try_selectors(
-                                    page, 
-                                    lambda s: check_visibility(page, s), 
-                                    selector
-                                )
-                            elif action == "expect" and selector == "url":
-                                assert value in page.url, f"Expected URL to contain '{value}', but got '{page.url}'"
-                            
-                            steps_executed += 1
-                            test_result["steps_executed"] = steps_executed
-                        
-                        print(f"✅ {test_name} passed!")
-                        test_result["status"] = "passed"
-                        results["passed"] += 1
-                        page.close()
-                        break 
-                        
-                    except PlaywrightTimeoutError as e:
-                        error_msg = f"Timeout: {str(e)}"
-                        print(f"⚠️ {error_msg}")
-                        
-                        try:
-                            screenshot_path = f"error_{test_name.replace(' ', '_')}_{retry}.png"
-                            page.screenshot(path=screenshot_path)
-                            print(f"📸 Screenshot saved: {screenshot_path}")
-                        except:
+                        with page.expect_navigation(timeout=5000, wait_until='networkidle'):
                             pass
-                            
-                        test_result["error"] = error_msg
-                        if retry == retries:  
-                            test_result["status"] = "failed"
-                            results["failed"] += 1
-                        page.close()
-                    
-                    except Exception as e:
-                        error_msg = f"Error: {str(e)}"
-                        print(f"❌ {error_msg}")
+                        print(f"    ✓ Navigation completed. Current URL: {page.url}")
+                        step_record["navigation"] = collect_navigation_timing(page)
+                    except PlaywrightTimeoutError:
+                        print(f"    ⚠️ No navigation occurred after form submission. URL: {page.url}")
                         
-                        try:
-                            screenshot_path = f"error_{test_name.replace(' ', '_')}_{retry}.png"
-                            page.screenshot(path=screenshot_path)
-                            print(f"📸 Screenshot saved: {screenshot_path}")
-                        except:
-                            pass
-                            
-                        test_result["error"] = error_msg
-                        if retry == retries:  
-                            test_result["status"] = "failed"
-                            results["failed"] += 1
-                        page.close()
-                
-                results["details"].append(test_result)
+                        if "auth" in page.url:
+                            debug_auth_failure(page, test_name)
+                    
+                    page.wait_for_timeout(2000)
+            elif action == "type":
+                resolve(lambda s: page.fill(s, value))
+            elif action == "wait":
+                if value == "visible" and selector:
+                    resolve(lambda s: page.wait_for_selector(s, state="visible"))
+                elif value in LOAD_STATES:
+                    page.wait_for_load_state(value)
+                else:
+                    wait_time = int(value) if value.isdigit() else 1000
+                    if smart_wait:
+                        wait_until_settled(page, watch_dom(page), timeout=wait_time)
+                    else:
+                        page.wait_for_timeout(wait_time)
+            elif action == "assert":
+                resolve(lambda s: check_text_content(page, s, value))
+            elif action == "assert_visible":
+                resolve(lambda s: check_visibility(page, s))
+            elif action == "expect" and selector == "url":
+                if smart_wait:
+                    try:
+                        page.wait_for_url(lambda url: value in url)
+                    except PlaywrightTimeoutError:
+                        pass
+                assert value in page.url, f"Expected URL to contain '{value}', but got '{page.url}'"
+        except Exception:
+            finish_step(test_result, step_record, step_start, "failed")
+            raise
+        
+        steps_executed += 1
+        test_result["steps_executed"] = steps_executed
+        finish_step(test_result, step_record, step_start, "passed")
+        if login_count and steps_executed == login_count:
+            save_session(page, session)
+        for key, prefix_length in prefixes:
+            if prefix_length == steps_executed:
+                prefix_plan.remember(page.context, key, page.url)
+        emit_event(
+            options,
+            "step_executed",
+            test=test_name,
+            step=step_record["index"],
+            action=action,
+            selector=step_record["selector"],
+            duration=step_record["duration"]
+        )
+
+def finish_step(test_result, step_record, step_start, status):
+    """Stamp a step record with its outcome and duration and add it to the test result."""
+    step_record["status"] = status
+    step_record["duration"] = round(time.perf_counter() - step_start, 4)
+    test_result["steps"].append(step_record)
+
+def new_test_result(test):
+    """Create the report entry for a test before it runs."""
+    return {
+        "name": test["name"],
+        "status": "pending",
+        "steps_executed": 0,
+        "total_steps": len(test["steps"]),
+        "error": None,
+        "retry_count": 0,
+        "duration": 0.0,
+        "attempt_durations": [],
+        "steps": []
+    }
+
+def skipped_test_result(test, reason):
+    """Create the report entry for a test that was not run."""
+    test_result = new_test_result(test)
+    test_result["status"] = "skipped"
+    test_result["error"] = reason
+    return test_result
+
+def record_attempt_duration(test_result, attempt_start):
+    """Add the duration of one attempt to the test's timing totals."""
+    duration = round(time.perf_counter() - attempt_start, 4)
+    test_result["attempt_durations"].append(duration)
+    test_result["duration"] = round(test_result["duration"] + duration, 4)
+
+def is_cancelled(options):
+    cancel_event = options.get("cancel_event")
+    return bool(cancel_event and cancel_event.is_set())
+
+def run_test(browser_context, test, options):
+    """Run a single test with retries and return its report entry."""
+    test_name = test["name"]
+    timeout = options["timeout"]
+    retries = options["retries"]
+    if is_cancelled(options):
+        print(f"⏭️ Skipping {test_name}: run cancelled")
+        return skipped_test_result(test, "Run was cancelled")
+    test_result = new_test_result(test)
+    
+    for retry in range(retries + 1):
+        context = browser_context
+        if retry > 0:
+            print(f"🔄 Retry {retry}/{retries} for test: {test_name} in a fresh browser context")
+            test_result["retry_count"] = retry
+        
+        page = None
+        attempt_start = time.perf_counter()
+        try:
+            if retry > 0:
+                context = new_test_context(
+                    browser_context.browser, options.get("session"), options.get("network"), options.get("har")
+                )
+            page = context.new_page()
+            page.set_default_timeout(timeout)
+            
+            print(f"⏱️ Running: {test_name}")
+            emit_event(options, "test_started", test=test_name, attempt=retry + 1, total_steps=test_result["total_steps"])
+            execute_steps(page, test, test_result, options)
+            
+            print(f"✅ {test_name} passed!")
+            test_result["status"] = "passed"
+            emit_event(options, "test_passed", test=test_name, attempt=retry + 1)
+            page.close()
+            record_attempt_duration(test_result, attempt_start)
+            break 
+            
+        except PlaywrightTimeoutError as e:
+            error_msg = f"Timeout: {str(e)}"
+            print(f"⚠️ {error_msg}")
+            save_error_screenshot(page, test_name, retry)
+            
+            final = fail_attempt(test_result, e, error_msg, retry, options)
+            close_page(page)
+            record_attempt_duration(test_result, attempt_start)
+            if final:
+                break
+        
+        except Exception as e:
+            error_msg = f"Error: {str(e)}"
+            print(f"❌ {error_msg}")
+            save_error_screenshot(page, test_name, retry)
             
+            final = fail_attempt(test_result, e, error_msg, retry, options)
+            close_page(page)
+            record_attempt_duration(test_result, attempt_start)
+            if final:
+                break
+        
+        finally:
+            if context is not browser_context:
+                close_context(context)
+    
+    if options.get("history"):
+        options["history"].record(test_result)
+    return test_result
+
+def classify_failure(error):
+    """Label a failure deterministic when retrying cannot help, otherwise transient."""
+    if isinstance(error, SelectorResolutionError) and error.missing:
+        return "deterministic"
+    if isinstance(error, ValueError):
+        return "deterministic"
+    return "transient"
+
+def fail_attempt(test_result, error, error_msg, retry, options):
+    """Record a failed attempt and return True if the test should not be retried."""
+    test_name = test_result["name"]
+    history = options.get("history")
+    test_result["error"] = error_msg
+    test_result["failure_kind"] = classify_failure(error)
+    
+    final = retry == options["retries"]
+    if not final and history and not history.should_retry(test_name, test_result["failure_kind"]):
+        print(f"⏭️ Not retrying {test_name}: deterministic failure and no history of flakiness")
+        final = True
+    if final:
+        test_result["status"] = "failed"
+    emit_event(options, "test_failed", test=test_name, attempt=retry + 1, error=error_msg, final=final)
+    return final
+
+def save_error_screenshot(page, test_name, retry):
+    """Save a screenshot of the page after a failed attempt."""
+    try:
+        screenshot_path = f"error_{test_name.replace(' ', '_')}_{retry}.png"
+        page.screenshot(path=screenshot_path)
+        print(f"📸 Screenshot saved: {screenshot_path}")
+    except:
+        pass
+
+def close_page(page):
+    """Close a page, ignoring errors from pages that are already gone."""
+    try:
+        if page:
+            page.close()
+    except:
+        pass
+
+def close_context(context):
+    """Close a browser context, ignoring errors from contexts that are already gone."""
+    try:
+        if context:
+            context.close()
+    except:
+        pass
+
+def launch_browser(p, headless=False, session=None, network=None, har=None):
+    """Launch a Chromium browser and a context configured for test runs.
+    
+    When a session manager holds a recent storage state, the context starts
+    from it so protected tests can skip their login steps.
+    """
+    browser = p.chromium.launch(headless=headless)
+    return browser, new_test_context(browser, session, network, har)
+
+def install_network_filter(browser_context, network):
+    """Route every request of a context through a NetworkFilter."""
+    def handle(route):
+        request = route.request
+        try:
+            action = network.decide(request.url, request.resource_type, request.method)
+            if action == "block":
+                network.count("blocked")
+                if request.resource_type == "image":
+                    route.fulfill(status=200, content_type="image/png", body=PLACEHOLDER_IMAGE)
+                else:
+                    route.abort("blockedbyclient")
+            elif action == "cache":
+                cached = network.cached(request.url)
+                if cached:
+                    status, headers, body = cached
+                    route.fulfill(status=status, headers=headers, body=body)
+                    return
+                response = route.fetch()
+                body = response.body()
+                network.store(request.url, response.status, response.headers, body)
+                route.fulfill(status=response.status, headers=response_headers(response.headers), body=body)
+            else:
+                route.continue_()
+        except Exception:
+            # Let the request through unfiltered rather than leave it hanging
+            try:
+                route.continue_()
+            except Exception:
+                pass
+
+    browser_context.route("**/*", handle)
+
+def new_test_context(browser, session=None, network=None, har=None):
+    """Create a clean browser context, starting from the saved session if there is one."""
+    storage_state = session.storage_state() if session else None
+    browser_context = browser.new_context(
+        viewport={"width": 1280, "height": 720},
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/90.0.4430.212 Safari/537.36",
+        storage_state=storage_state
+    )
+    if storage_state:
+        print(f"🔐 Starting browser context from saved session: {storage_state}")
+        session.mark(browser_context)
+    if network:
+        install_network_filter(browser_context, network)
+    if har and har.mode:
+        browser_context.route_from_har(har.context_path(), **har.route_options())
+    return browser_context
+
+def drain_test_queue(browser_context, test_queue, details, options):
+    """Run tests from the queue until a stop marker arrives, storing results by index."""
+    while True:
+        item = test_queue.get()
+        if item is None:
+            return
+        index, test = item
+        details[index] = run_test(browser_context, test, options)
+
+def run_worker(worker_id, test_queue, details, options):
+    """Run a worker with its own browser process pulling tests from the shared queue."""
+    print(f"👷 Worker {worker_id} starting")
+    if options.get("pool"):
+        options["pool"].run(
+            lambda browser_context: drain_test_queue(browser_context, test_queue, details, options), options
+        )
+        print(f"👷 Worker {worker_id} finished")
+        return
+    with sync_playwright() as p:
+        browser, browser_context = launch_browser(
+            p, options["headless"], options.get("session"), options.get("network"), options.get("har")
+        )
+        try:
+            drain_test_queue(browser_context, test_queue, details, options)
+        finally:
+            close_context(browser_context)
             browser.close()
+    print(f"👷 Worker {worker_id} finished")
+
+def put_while_workers_alive(test_queue, item, futures):
+    """Put an item on a bounded queue unless every worker has already exited."""
+    while True:
+        try:
+            test_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            if all(future.done() for future in futures):
+                return False
+
+def run_tests_streaming(test_iter, options, workers=2, queue_size=0):
+    """Run tests on worker threads as soon as the iterator produces them.
     
-    except Exception as e:
-        print(f"❌ Fatal error: {str(e)}")
-        return False
+    Tests flow through a queue bounded by queue_size (0 means unbounded), so
+    a slow producer such as a streaming generator overlaps with execution.
+    """
+    test_queue = queue.Queue(maxsize=queue_size)
+    details = {}
+    tests = []
+    workers = max(1, workers)
     
-    execution_time = time.time() - start_time
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_worker, worker_id + 1, test_queue, details, options)
+            for worker_id in range(workers)
+        ]
+        try:
+            for test in test_iter:
+                if is_cancelled(options):
+                    print("⏹️ Run cancelled, no more tests will be queued")
+                    break
+                if not put_while_workers_alive(test_queue, (len(tests), test), futures):
+                    print("⚠️ All workers exited, no more tests will be run")
+                    break
+                tests.append(test)
+        finally:
+            for _ in futures:
+                put_while_workers_alive(test_queue, None, futures)
+        for future in futures:
+            future.result()
     
+    results = []
+    for index, test in enumerate(tests):
+        test_result = details.get(index)
+        if test_result is None:
+            test_result = skipped_test_result(test, "Test was not executed")
+        results.append(test_result)
+    
+    return results
+
+def run_tests_parallel(tests, options, workers=2):
+    """Run tests across several workers, each with an isolated browser."""
+    workers = max(1, min(workers, len(tests)))
+    print(f"⚡ Running {len(tests)} tests across {workers} workers")
+    return run_tests_streaming(iter(tests), options, workers)
+
+def summarize_results(details):
+    """Count test outcomes from the report entries."""
+    return {
+        "total": len(details),
+        "passed": sum(1 for d in details if d["status"] == "passed"),
+        "failed": sum(1 for d in details if d["status"] == "failed"),
+        "skipped": sum(1 for d in details if d["status"] == "skipped"),
+        "details": details
+    }
+
+def write_report(results, execution_time, report_file=None):
+    """Print the execution summary and save the JSON report."""
     print("\n" + "=" * 50)
     print(f"TEST EXECUTION SUMMARY")
     print("=" * 50)
@@ -254,10 +812,18 @@ def execute_test_cases(test_cases, headless=False, timeout=5000, retries=2):
     print(f"Failed: {results['failed']}")
     print(f"Skipped: {results['skipped']}")
     print(f"Execution Time: {execution_time:.2f} seconds")
+    timing = summarize_timing(results["details"])
+    for slow_test in timing["slowest_tests"][:3]:
+        print(f"Slow test: {slow_test['name']} ({slow_test['duration']:.2f}s)")
     print("=" * 50)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_file = f"test_report_{timestamp}.json"
+    if not report_file:
+        report_file = f"test_report_{timestamp}.json"
+        suffix = 1
+        while os.path.exists(report_file):
+            report_file = f"test_report_{timestamp}_{suffix}.json"
+            suffix += 1
     with open(report_file, "w") as f:
         json.dump({
             "summary": {
@@ -268,12 +834,226 @@ def execute_test_cases(test_cases, headless=False, timeout=5000, retries=2):
                 "failed": results["failed"],
                 "skipped": results["skipped"]
             },
+            "timing": timing,
             "tests": results["details"]
         }, f, indent=2)
     
     print(f"📝 Report saved: {report_file}")
     return report_file
 
+def make_options(headless=False, timeout=5000, retries=2, selector_cache=SELECTOR_CACHE_FILE,
+                 selector_mode="sequential", cancel_event=None, on_event=None, suite=None, report_db=REPORT_DB,
+                 wait_mode="fixed", session_state=SESSION_STATE_FILE, history=FLAKINESS_HISTORY_FILE, network=None,
+                 har=None):
+    """Build the options dict shared by the executor helpers.
+    
+    cancel_event (a threading.Event) skips the remaining tests once set.
+    on_event(event_type, data) receives progress events, possibly from
+    worker threads. wait_mode "smart" waits for a URL change, DOM stability
+    and the load state instead of fixed sleeps. report_db, session_state,
+    history, network and har enable report indexing, login session reuse,
+    the flakiness history, resource filtering and HAR record/replay; None
+    turns each one off.
+    """
+    return {
+        "headless": headless,
+        "timeout": timeout,
+        "retries": retries,
+        "selector_cache": SelectorCache(selector_cache) if selector_cache else None,
+        "selector_mode": selector_mode,
+        "cancel_event": cancel_event,
+        "on_event": on_event,
+        "suite": suite,
+        "report_db": report_db,
+        "wait_mode": wait_mode,
+        "session": SessionManager(session_state) if session_state else None,
+        "history": FlakinessHistory(history, suite) if history else None,
+        "network": network,
+        "har": har
+    }
+
+def save_run_state(options):
+    """Persist the selector cache and flakiness history collected during a run."""
+    if options["selector_cache"]:
+        options["selector_cache"].save()
+    if options["history"]:
+        options["history"].save()
+    if options["network"]:
+        options["network"].report()
+    if options["har"]:
+        options["har"].finish()
+
+def execution_order(tests, options):
+    """Return the order to run tests in.
+
+    Tests are grouped by shared prefix; with a duration scheduler they then
+    run longest-first, otherwise flaky and slow tests are started first.
+    """
+    plan = options.get("prefix_plan")
+    order = plan.execution_order() if plan else list(range(len(tests)))
+    if options.get("scheduler"):
+        order = options["scheduler"].order(tests, order, options["retries"])
+    elif options.get("history"):
+        order = options["history"].prioritize(tests, order)
+    return order
+
+def run_in_order(tests, order, run_fn):
+    """Run tests in the given order and return their results in the original order."""
+    results = list(run_fn([tests[index] for index in order]))
+    details = [None] * len(tests)
+    for position, index in enumerate(order):
+        details[index] = results[position]
+    return details
+
+def plan_prefixes(tests):
+    """Find shared setup prefixes in a suite and report how much repeated work they cover."""
+    plan = PrefixPlan(tests)
+    summary = plan.summary()
+    if summary["shared_prefixes"]:
+        print(f"♻️ {summary['shared_prefixes']} shared step prefixes cover {summary['redundant_steps']} repeated steps; "
+              f"{summary['reusable_tests']} tests can reuse a navigation-only prefix")
+    return plan
+
+def finish_run(details, execution_time, options):
+    """Write the report for a finished run and announce it."""
+    results = summarize_results(details)
+    report_file = write_report(results, execution_time, options.get("report_file"))
+    if options.get("report_db"):
+        record_report(report_file, options.get("suite"), options["report_db"])
+    emit_event(
+        options,
+        "run_finished",
+        report=report_file,
+        total=results["total"],
+        passed=results["passed"],
+        failed=results["failed"],
+        skipped=results["skipped"],
+        execution_time=execution_time
+    )
+    return report_file
+
+def execute_test_cases(test_cases, headless=False, timeout=5000, retries=2, workers=1,
+                       selector_cache=SELECTOR_CACHE_FILE, selector_mode="sequential", cancel_event=None,
+                       on_event=None, suite=None, report_db=REPORT_DB, wait_mode="fixed",
+                       session_state=SESSION_STATE_FILE, dedupe_prefixes=True, history=FLAKINESS_HISTORY_FILE,
+                       report_file=None, schedule=True, network=None, har=None, pool=None):
+    """Execute Playwright test cases with proper error handling and retries.
+    
+    selector_cache is the path of the persistent selector cache, or None to
+    try candidate selectors in their generated order. selector_mode is
+    "sequential" to try candidates one after another or "race" to wait for
+    all of them at once. dedupe_prefixes runs tests that share setup steps
+    back to back and lets them skip a shared navigation-only prefix that
+    their browser context already ran. report_file overrides the
+    timestamped report path. schedule orders parallel runs longest-first
+    using test durations from earlier reports. pool is a BrowserPool whose
+    warm browsers are used instead of launching new ones.
+    """
+    if not test_cases:
+        print("❌ No test cases to execute.")
+        return False
+    
+    tests = test_cases["tests"]
+    options = make_options(
+        headless=headless, timeout=timeout, retries=retries, selector_cache=selector_cache,
+        selector_mode=selector_mode, cancel_event=cancel_event, on_event=on_event, suite=suite, report_db=report_db,
+        wait_mode=wait_mode, session_state=session_state, history=history, network=network, har=har
+    )
+    if options["session"]:
+        options["session"].bind(tests)
+    options["prefix_plan"] = plan_prefixes(tests) if dedupe_prefixes else None
+    options["scheduler"] = (
+        DurationScheduler(report_db, options["history"], workers, suite=options["suite"])
+        if schedule and workers > 1 else None
+    )
+    options["report_file"] = report_file
+    options["pool"] = pool
+    emit_event(options, "run_started", total=len(tests))
+    start_time = time.time()
+    
+    order = execution_order(tests, options)
+    
+    try:
+        if workers > 1:
+            details = run_in_order(tests, order, lambda ordered: run_tests_parallel(ordered, options, workers))
+        elif pool:
+            details = run_in_order(tests, order, lambda ordered: pool.run(
+                lambda browser_context: [run_test(browser_context, test, options) for test in ordered], options
+            ))
+        else:
+            with sync_playwright() as p:
+                browser, browser_context = launch_browser(
+                    p, headless, options["session"], options["network"], options["har"]
+                )
+                details = run_in_order(
+                    tests, order, lambda ordered: [run_test(browser_context, test, options) for test in ordered]
+                )
+                close_context(browser_context)
+                browser.close()
+    
+    except Exception as e:
+        print(f"❌ Fatal error: {str(e)}")
+        return False
+    finally:
+        save_run_state(options)
+    
+    execution_time = time.time() - start_time
+    return finish_run(details, execution_time, options)
+
+def execute_test_stream(test_iter, headless=False, timeout=5000, retries=2, workers=1,
+                        selector_cache=SELECTOR_CACHE_FILE, selector_mode="sequential", queue_size=None,
+                        cancel_event=None, on_event=None, suite=None, report_db=REPORT_DB, wait_mode="fixed",
+                        session_state=SESSION_STATE_FILE, history=FLAKINESS_HISTORY_FILE, network=None, har=None,
+                        pool=None):
+    """Execute tests from an iterator while it is still producing them.
+    
+    Used to overlap test generation with execution. queue_size bounds how
+    many produced tests may wait for a worker (defaults to twice the
+    worker count).
+    """
+    options = make_options(
+        headless=headless, timeout=timeout, retries=retries, selector_cache=selector_cache,
+        selector_mode=selector_mode, cancel_event=cancel_event, on_event=on_event, suite=suite, report_db=report_db,
+        wait_mode=wait_mode, session_state=session_state, history=history, network=network, har=har
+    )
+    options["pool"] = pool
+    if queue_size is None:
+        queue_size = max(1, workers) * 2
+    emit_event(options, "run_started", total=None)
+    start_time = time.time()
+    
+    try:
+        details = run_tests_streaming(test_iter, options, workers, queue_size)
+    except Exception as e:
+        print(f"❌ Fatal error: {str(e)}")
+        return False
+    finally:
+        save_run_state(options)
+    
+    if not details:
+        print("❌ No test cases to execute.")
+        return False
+    
+    execution_time = time.time() - start_time
+    return finish_run(details, execution_time, options)
+
+def apply_base_url(test, base_url):
+    """Make the first navigation of a test absolute against base_url, adding one if missing."""
+    if not test["steps"] or test["steps"][0]["action"] != "navigate":
+        test["steps"].insert(0, {
+            "action": "navigate",
+            "value": base_url
+        })
+    elif test["steps"][0]["action"] == "navigate":
+        if not test["steps"][0].get("value") or not test["steps"][0]["value"].startswith(("http://", "https://")):
+            if not test["steps"][0].get("value"):
+                test["steps"][0]["value"] = base_url
+            else:
+                relative_path = test["steps"][0]["value"]
+                base = base_url.rstrip('/')
+                test["steps"][0]["value"] = f"{base}/{relative_path.lstrip('/')}"
+    return test
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Run automated Playwright tests")
@@ -281,6 +1061,29 @@ if __name__ == "__main__":
     parser.add_argument("--headless", action="store_true", default=False, help="Run in headless mode")
     parser.add_argument("--timeout", type=int, default=5000, help="Timeout in milliseconds")
     parser.add_argument("--retries", type=int, default=2, help="Number of retries for failed tests")
+    parser.add_argument("--workers", type=int, default=1, help="Number of parallel browser workers")
+    parser.add_argument("--engine", choices=["sync", "async"], default="sync", help="Executor engine to use")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent pages for the async engine")
+    parser.add_argument("--selector-cache", default=SELECTOR_CACHE_FILE, help="Path of the persistent selector cache")
+    parser.add_argument("--no-selector-cache", action="store_true", default=False, help="Disable the selector cache")
+    parser.add_argument("--selector-mode", choices=["sequential", "race"], default="sequential", help="How candidate selectors are resolved")
+    parser.add_argument("--wait-mode", choices=["fixed", "smart"], default="fixed", help="Fixed sleeps or event-driven waits after submissions")
+    parser.add_argument("--session-state", default=SESSION_STATE_FILE, help="Base path of the saved login sessions (one file per site and login)")
+    parser.add_argument("--no-session-reuse", action="store_true", default=False, help="Run the login steps in every test")
+    parser.add_argument("--no-prefix-dedup", action="store_true", default=False, help="Run tests in file order without reusing shared prefixes (sync engine)")
+    parser.add_argument("--history", default=FLAKINESS_HISTORY_FILE, help="Path of the per-test flakiness history")
+    parser.add_argument("--no-history", action="store_true", default=False, help="Always retry and keep the file order")
+    parser.add_argument("--no-schedule", action="store_true", default=False, help="Do not run parallel tests longest-first")
+    parser.add_argument("--lightweight", action="store_true", default=False, help="Block heavy resources and cache static assets")
+    parser.add_argument("--block-types", default=",".join(BLOCKED_RESOURCE_TYPES), help="Resource types blocked in lightweight mode")
+    parser.add_argument("--block-domains", default=",".join(BLOCKED_DOMAINS), help="Domains blocked in lightweight mode")
+    parser.add_argument("--allow-types", default="", help="Only load these resource types in lightweight mode")
+    parser.add_argument("--allow-domains", default="", help="Domains never blocked in lightweight mode")
+    parser.add_argument("--asset-cache", default=ASSET_CACHE_DIR, help="Directory of cached static assets")
+    parser.add_argument("--no-asset-cache", action="store_true", default=False, help="Fetch static assets every time")
+    parser.add_argument("--har", choices=HAR_MODES, default=None, help="Record responses into the suite's HAR archive or replay them")
+    parser.add_argument("--har-dir", default=HAR_DIR, help="Directory of per-suite HAR archives")
+    parser.add_argument("--allow-live", action="store_true", default=False, help="In replay mode, send unrecorded requests to the live site")
     parser.add_argument("--base-url", default="https://krishi-mitra-front.vercel.app/", help="Base URL for tests")
     args = parser.parse_args()
     
@@ -291,27 +1094,58 @@ if __name__ == "__main__":
     if test_cases and args.base_url:
         print(f"🌐 Base URL: {args.base_url}")
         for test in test_cases.get("tests", []):
-            if not test["steps"] or test["steps"][0]["action"] != "navigate":
-                test["steps"].insert(0, {
-                    "action": "navigate",
-                    "value": args.base_url
-                })
-            elif test["steps"][0]["action"] == "navigate":
-                if not test["steps"][0].get("value") or not test["steps"][0]["value"].startswith(("http://", "https://")):
-                    if not test["steps"][0].get("value"):
-                        test["steps"][0]["value"] = args.base_url
-                    else:
-                        relative_path = test["steps"][0]["value"]
-                        base = args.base_url.rstrip('/')
-                        test["steps"][0]["value"] = f"{base}/{relative_path.lstrip('/')}"
+            apply_base_url(test, args.base_url)
     
-    if test_cases:
-        success = execute_test_cases(
-            test_cases, 
-            headless=args.headless, 
-            timeout=args.timeout,
-            retries=args.retries
+    network = None
+    if args.lightweight:
+        network = NetworkFilter(
+            block_types=split_list(args.block_types),
+            block_domains=split_list(args.block_domains),
+            allow_types=split_list(args.allow_types),
+            allow_domains=split_list(args.allow_domains),
+            cache_dir=None if args.no_asset_cache else args.asset_cache
         )
+        print(f"🚦 Lightweight mode: blocking {', '.join(network.block_types) or 'no resource types'}")
+    
+    har = HarArchive(args.test_file, args.har, args.har_dir, offline=not args.allow_live) if args.har else None
+    
+    if test_cases:
+        if args.engine == "async":
+            from async_testing import execute_test_cases_async
+            success = execute_test_cases_async(
+                test_cases,
+                headless=args.headless,
+                timeout=args.timeout,
+                retries=args.retries,
+                concurrency=args.concurrency,
+                selector_cache=None if args.no_selector_cache else args.selector_cache,
+                selector_mode=args.selector_mode,
+                suite=args.test_file,
+                wait_mode=args.wait_mode,
+                session_state=None if args.no_session_reuse else args.session_state,
+                history=None if args.no_history else args.history,
+                schedule=not args.no_schedule,
+                network=network,
+                har=har
+            )
+        else:
+            success = execute_test_cases(
+                test_cases, 
+                headless=args.headless, 
+                timeout=args.timeout,
+                retries=args.retries,
+                workers=args.workers,
+                selector_cache=None if args.no_selector_cache else args.selector_cache,
+                selector_mode=args.selector_mode,
+                suite=args.test_file,
+                wait_mode=args.wait_mode,
+                session_state=None if args.no_session_reuse else args.session_state,
+                dedupe_prefixes=not args.no_prefix_dedup,
+                history=None if args.no_history else args.history,
+                schedule=not args.no_schedule,
+                network=network,
+                har=har
+            )
         sys.exit(0 if success else 1)
     else:
         sys.exit(1)
\ No newline at end of file
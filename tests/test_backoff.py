@@ -0,0 +1,37 @@
+import pytest
+from backoff import BackoffPolicy
+
+class RateLimited(Exception):
+    pass
+
+class Policy(BackoffPolicy):
+    rate_limit_errors = (RateLimited,)
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    monkeypatch.setattr("backoff.random.uniform", lambda low, high: high)
+
+def test_delay_doubles_per_attempt(no_jitter):
+    policy = BackoffPolicy(base_delay=1.0, max_delay=30.0)
+    assert [policy.delay(attempt, ValueError()) for attempt in range(4)] == [1.0, 2.0, 4.0, 8.0]
+
+def test_delay_is_capped(no_jitter):
+    assert BackoffPolicy(base_delay=1.0, max_delay=5.0).delay(10, ValueError()) == 5.0
+
+def test_delay_is_jittered_below_the_exponential_bound():
+    policy = BackoffPolicy(base_delay=1.0, max_delay=30.0)
+    assert all(0 <= policy.delay(2, ValueError()) <= 4.0 for _ in range(50))
+
+def test_rate_limits_wait_at_least_the_floor(monkeypatch):
+    monkeypatch.setattr("backoff.random.uniform", lambda low, high: 0.0)
+    policy = Policy(rate_limit_delay=10.0, max_delay=30.0)
+    assert policy.delay(0, RateLimited()) == 10.0
+    assert policy.delay(1, Exception("HTTP 429 Too Many Requests")) == 20.0
+    assert policy.delay(5, RateLimited()) == 30.0
+
+def test_retryable_errors():
+    policy = Policy()
+    assert policy.is_retryable(RateLimited())
+    assert policy.is_retryable(ConnectionError())
+    assert policy.is_retryable(TimeoutError())
+    assert not policy.is_retryable(ValueError("bad prompt"))
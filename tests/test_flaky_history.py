@@ -0,0 +1,69 @@
+from flaky_history import FLAKY_RATE, FlakinessHistory
+
+def outcome(name, status, retry_count=0, failure_kind=None, duration=None):
+    return {"name": name, "status": status, "retry_count": retry_count, "failure_kind": failure_kind, "duration": duration}
+
+def make_history(tmp_path, suite="shop.json"):
+    return FlakinessHistory(str(tmp_path / "history.json"), suite)
+
+def test_transient_failures_are_always_retried(tmp_path):
+    assert make_history(tmp_path).should_retry("Login", "transient")
+
+def test_deterministic_failures_of_stable_tests_are_not_retried(tmp_path):
+    history = make_history(tmp_path)
+    for _ in range(5):
+        history.record(outcome("Login", "passed"))
+    assert not history.should_retry("Login", "deterministic")
+    assert not history.should_retry("Unknown", "deterministic")
+
+def test_deterministic_failures_of_flaky_tests_are_retried(tmp_path):
+    history = make_history(tmp_path)
+    history.record(outcome("Login", "passed", retry_count=1))
+    history.record(outcome("Login", "passed"))
+    assert history.flaky_rate("Login") >= FLAKY_RATE
+    assert history.should_retry("Login", "deterministic")
+
+def test_flips_count_as_flaky(tmp_path):
+    history = make_history(tmp_path)
+    for status in ("passed", "failed", "passed", "passed"):
+        history.record(outcome("Search", status, failure_kind="deterministic"))
+    assert history.flaky_rate("Search") == 0.5
+
+def test_skipped_results_are_ignored(tmp_path):
+    history = make_history(tmp_path)
+    history.record(outcome("Login", "skipped"))
+    assert history.entry("Login") is None
+
+def test_suites_do_not_share_entries(tmp_path):
+    shop = make_history(tmp_path, "shop.json")
+    shop.record(outcome("Login Test", "passed", retry_count=2, duration=4.0))
+    shop.save()
+    admin = make_history(tmp_path, "admin.json")
+    assert admin.flaky_rate("Login Test") == 0.0
+    assert admin.avg_duration("Login Test") is None
+    assert not admin.should_retry("Login Test", "deterministic")
+    assert make_history(tmp_path, "shop.json").avg_duration("Login Test") == 4.0
+
+def test_avg_duration_is_smoothed(tmp_path):
+    history = make_history(tmp_path)
+    history.record(outcome("Login", "passed", duration=10.0))
+    history.record(outcome("Login", "passed", duration=20.0))
+    assert history.avg_duration("Login") == 13.0
+
+def test_prioritize_starts_flaky_then_slow_tests(tmp_path):
+    history = make_history(tmp_path)
+    tests = [{"name": name} for name in ("fast", "slow", "flaky", "other")]
+    for name, duration in (("fast", 1.0), ("other", 1.0), ("flaky", 1.0), ("slow", 10.0)):
+        history.record(outcome(name, "passed", duration=duration))
+    history.record(outcome("flaky", "passed", retry_count=1))
+    assert history.prioritize(tests, [0, 1, 2, 3]) == [2, 1, 0, 3]
+
+def test_saves_from_two_runs_merge(tmp_path):
+    first, second = make_history(tmp_path), make_history(tmp_path)
+    first.record(outcome("Login", "passed"))
+    second.record(outcome("Login", "failed", failure_kind="deterministic"))
+    first.save()
+    second.save()
+    entry = make_history(tmp_path).entry("Login")
+    assert entry["runs"] == 2
+    assert entry["flips"] == 1
@@ -0,0 +1,36 @@
+from generation_manifest import GenerationManifest, fingerprint_requirement, group_id
+
+def hashes(*texts):
+    return [fingerprint_requirement(text) for text in texts]
+
+def test_fingerprint_ignores_whitespace_changes():
+    assert fingerprint_requirement("Users can  log in.\n") == fingerprint_requirement(" Users can log in.")
+    assert fingerprint_requirement("Users can log in.") != fingerprint_requirement("Users can log out.")
+
+def test_group_id_depends_on_order():
+    assert group_id(["a", "b"]) != group_id(["b", "a"])
+
+def test_reusable_groups_need_every_requirement_unchanged(tmp_path):
+    manifest = GenerationManifest(str(tmp_path / "manifest.json"))
+    login = manifest.add_group(hashes("login", "logout"), {}, [])
+    search = manifest.add_group(hashes("search"), {}, [])
+    manifest.add_group([], {}, [])
+    assert manifest.reusable_groups(hashes("login", "logout", "search")) == [login, search]
+    assert manifest.reusable_groups(hashes("login", "logout v2", "search")) == [search]
+    assert manifest.reusable_groups([]) == []
+
+def test_save_load_and_retain(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = GenerationManifest(path)
+    keep = manifest.add_group(hashes("login"), {"core_tests": []}, [{"name": "Login"}])
+    manifest.add_group(hashes("search"), {}, [])
+    manifest.retain([keep])
+    manifest.save()
+    reloaded = GenerationManifest(path)
+    assert list(reloaded.groups) == [keep]
+    assert reloaded.groups[keep]["tests"] == [{"name": "Login"}]
+
+def test_unreadable_manifest_starts_empty(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{not json")
+    assert GenerationManifest(str(path)).groups == {}
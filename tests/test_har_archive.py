@@ -0,0 +1,74 @@
+import json
+import os
+import time
+from har_archive import STALE_PART_SECONDS, HarArchive, archive_name
+
+def har(*entries):
+    return {"log": {"version": "1.2", "entries": list(entries)}}
+
+def entry(url, started, body, method="GET"):
+    return {
+        "startedDateTime": started,
+        "request": {"method": method, "url": url},
+        "response": {"content": {"text": body}},
+    }
+
+def write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def test_archive_name():
+    assert archive_name("suites/checkout flow.json") == "checkout_flow"
+    assert archive_name(None) == "default"
+
+def test_route_options(tmp_path):
+    recorder = HarArchive("suite", mode="record", har_dir=str(tmp_path))
+    assert recorder.route_options()["update"] is True
+    write(recorder.path, har())
+    assert HarArchive("suite", har_dir=str(tmp_path)).route_options()["not_found"] == "abort"
+    assert HarArchive("suite", har_dir=str(tmp_path), offline=False).route_options()["not_found"] == "fallback"
+
+def test_replay_without_archive_runs_live(tmp_path):
+    archive = HarArchive("suite", har_dir=str(tmp_path))
+    assert archive.mode is None
+    assert archive.context_path() == archive.path
+
+def test_finish_merges_own_parts_keeping_latest(tmp_path):
+    archive = HarArchive("suite", mode="record", har_dir=str(tmp_path))
+    first, second = archive.context_path(), archive.context_path()
+    assert first != second and f"part_{os.getpid()}_" in first
+    write(first, har(entry("https://a/", "2026-01-01T00:00:00", "old"), entry("https://b/", "2026-01-01T00:00:01", "b")))
+    write(second, har(entry("https://a/", "2026-01-01T00:00:02", "new")))
+    os.utime(first, (time.time() - 10, time.time() - 10))
+    archive.finish()
+
+    with open(archive.path, encoding="utf-8") as f:
+        entries = json.load(f)["log"]["entries"]
+    assert [e["request"]["url"] for e in entries] == ["https://b/", "https://a/"]
+    assert entries[1]["response"]["content"]["text"] == "new"
+    assert not os.path.exists(first) and not os.path.exists(second)
+
+def test_finish_ignores_other_processes_parts(tmp_path):
+    foreign = tmp_path / "suite.part_999999_1.har"
+    write(foreign, har(entry("https://other/", "2026-01-01T00:00:00", "x")))
+    archive = HarArchive("suite", mode="record", har_dir=str(tmp_path))
+    write(archive.context_path(), har(entry("https://a/", "2026-01-01T00:00:00", "a")))
+    archive.finish()
+
+    with open(archive.path, encoding="utf-8") as f:
+        urls = [e["request"]["url"] for e in json.load(f)["log"]["entries"]]
+    assert urls == ["https://a/"]
+    assert foreign.exists()
+
+def test_record_removes_only_own_and_stale_parts(tmp_path):
+    own = tmp_path / f"suite.part_{os.getpid()}_1.har"
+    fresh = tmp_path / "suite.part_999999_1.har"
+    stale = tmp_path / "suite.part_999998_1.har"
+    for path in (own, fresh, stale):
+        write(path, har())
+    old = time.time() - STALE_PART_SECONDS - 60
+    os.utime(stale, (old, old))
+
+    HarArchive("suite", mode="record", har_dir=str(tmp_path))
+    assert not own.exists() and not stale.exists()
+    assert fresh.exists()
@@ -0,0 +1,77 @@
+import threading
+import pytest
+from jobs import JobManager
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1)
+    yield manager
+    manager.executor.shutdown(wait=True)
+
+def wait_for(manager):
+    manager.executor.submit(lambda: None).result(timeout=5)
+
+def test_completed_and_failed_jobs(manager):
+    done = manager.submit("ok", lambda job: "report.json")
+    failed = manager.submit("no report", lambda job: None)
+    broken = manager.submit("broken", lambda job: 1 / 0)
+    wait_for(manager)
+    assert done.status == "completed" and done.result == "report.json"
+    assert failed.status == "failed" and failed.error == "Pipeline did not produce a report"
+    assert broken.status == "failed" and "division by zero" in broken.error
+
+def test_cancel_queued_job_never_runs(manager):
+    release = threading.Event()
+    ran = []
+    manager.submit("blocker", lambda job: release.wait(5))
+    queued = manager.submit("queued", lambda job: ran.append(job.id))
+    assert manager.cancel(queued.id) is queued
+    assert queued.status == "cancelled"
+    release.set()
+    wait_for(manager)
+    assert ran == []
+    assert queued.status == "cancelled"
+
+def test_cancel_running_job_stops_at_next_checkpoint(manager):
+    started = threading.Event()
+    reached = []
+
+    def pipeline(job):
+        job.update_progress("plan", "Generating test plan")
+        started.set()
+        job.cancel_event.wait(5)
+        job.update_progress("execute", "Running tests")
+        reached.append("execute")
+        return "report.json"
+
+    job = manager.submit("running", pipeline)
+    assert started.wait(5)
+    manager.cancel(job.id)
+    wait_for(manager)
+    assert job.status == "cancelled"
+    assert reached == []
+    assert job.finished_at is not None
+
+def test_cancel_unknown_job(manager):
+    assert manager.cancel("missing") is None
+
+def test_on_complete_only_after_success(manager):
+    completed = []
+    manager.submit("ok", lambda job: "report.json", on_complete=lambda job: completed.append(job.name))
+    manager.submit("no report", lambda job: None, on_complete=lambda job: completed.append(job.name))
+    wait_for(manager)
+    assert completed == ["ok"]
+
+def test_prune_keeps_recent_and_unfinished_jobs():
+    manager = JobManager(max_workers=1, max_history=2)
+    try:
+        first = manager.submit("first", lambda job: "a")
+        wait_for(manager)
+        manager.submit("second", lambda job: "b")
+        wait_for(manager)
+        manager.submit("third", lambda job: "c")
+        wait_for(manager)
+        assert manager.get(first.id) is None
+        assert [job.name for job in manager.list()] == ["third", "second"]
+    finally:
+        manager.executor.shutdown(wait=True)
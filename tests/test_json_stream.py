@@ -0,0 +1,52 @@
+import json
+import pytest
+from json_stream import StreamingJsonArrayParser
+
+RESPONSE = json.dumps({
+    "tests": [
+        {"name": "braces {in} [strings]", "steps": [{"action": "fill", "value": "}]"}]},
+        {"name": "escaped \"quote\" and \\", "steps": []},
+    ]
+})
+
+def feed_in_pieces(parser, text, size):
+    objects = []
+    for start in range(0, len(text), size):
+        objects.extend(parser.feed(text[start:start + size]))
+    return objects
+
+def test_objects_are_returned_as_they_complete():
+    parser = StreamingJsonArrayParser("tests")
+    assert parser.feed('{"tests": [{"name": "a"}, {"na') == [{"name": "a"}]
+    assert parser.feed('me": "b"}]}') == [{"name": "b"}]
+    assert parser.closed
+
+@pytest.mark.parametrize("size", [1, 2, 7, len(RESPONSE)])
+def test_braces_and_quotes_inside_strings_are_ignored(size):
+    parser = StreamingJsonArrayParser("tests")
+    assert feed_in_pieces(parser, RESPONSE, size) == json.loads(RESPONSE)["tests"]
+    assert parser.closed
+
+def test_array_key_split_across_pieces():
+    parser = StreamingJsonArrayParser("tests")
+    assert parser.feed('```json\n{"te') == []
+    assert parser.feed('sts": [{"name": "a"}') == [{"name": "a"}]
+    assert not parser.closed
+
+def test_arrays_under_other_keys_are_skipped():
+    parser = StreamingJsonArrayParser("tests")
+    assert parser.feed('{"meta": [{"name": "x"}], "tests": [{"name": "a"}]}') == [{"name": "a"}]
+
+def test_truncated_stream_stays_open():
+    parser = StreamingJsonArrayParser("tests")
+    assert parser.feed('{"tests": [{"name": "a"}, {"name": "b"') == [{"name": "a"}]
+    assert not parser.closed
+
+def test_text_after_the_array_is_ignored():
+    parser = StreamingJsonArrayParser("tests")
+    assert parser.feed('{"tests": [{"name": "a"}], "extra": [{"name": "x"}]}') == [{"name": "a"}]
+    assert parser.feed('{"name": "late"}') == []
+
+def test_malformed_object_is_skipped():
+    parser = StreamingJsonArrayParser("tests")
+    assert parser.feed('{"tests": [{"name": }, {"name": "b"}]}') == [{"name": "b"}]
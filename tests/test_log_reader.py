@@ -0,0 +1,75 @@
+import pytest
+from log_reader import read_lines, read_range, tail_lines
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "run.log"
+    path.write_bytes(b"first\nsecond\nthird\n")
+    return str(path)
+
+def test_read_range_cuts_back_to_last_newline(log_file):
+    chunk = read_range(log_file, 0, 9)
+    assert chunk["content"] == "first\n"
+    assert chunk["nextOffset"] == 6
+    assert not chunk["eof"]
+
+def test_read_range_keeps_partial_line_without_whole_lines(log_file):
+    chunk = read_range(log_file, 0, 9, whole_lines=False)
+    assert chunk["content"] == "first\nsec"
+    assert chunk["nextOffset"] == 9
+
+def test_read_range_resumes_from_next_offset(log_file):
+    first = read_range(log_file, 0, 9)
+    rest = read_range(log_file, first["nextOffset"])
+    assert first["content"] + rest["content"] == "first\nsecond\nthird\n"
+    assert rest["eof"]
+
+def test_read_range_at_eof_returns_nothing(log_file):
+    size = read_range(log_file)["size"]
+    chunk = read_range(log_file, size)
+    assert chunk["content"] == ""
+    assert chunk["nextOffset"] == size
+    assert chunk["eof"]
+    assert not chunk["reset"]
+
+def test_read_range_past_eof_restarts_after_truncation(log_file):
+    chunk = read_range(log_file, 1000)
+    assert chunk["reset"]
+    assert chunk["offset"] == 0
+    assert chunk["content"] == "first\nsecond\nthird\n"
+
+def test_read_range_missing_file(tmp_path):
+    chunk = read_range(str(tmp_path / "missing.log"))
+    assert chunk["size"] == 0
+    assert chunk["content"] == ""
+    assert chunk["eof"]
+
+def test_tail_lines_returns_last_lines(log_file):
+    tail = tail_lines(log_file, 2)
+    assert tail["content"] == "second\nthird\n"
+    assert tail["offset"] == len(b"first\n")
+    assert tail["nextOffset"] == tail["size"]
+
+def test_tail_lines_without_trailing_newline(tmp_path):
+    path = tmp_path / "run.log"
+    path.write_bytes(b"a\nb\nc")
+    assert tail_lines(str(path), 2)["content"] == "b\nc"
+
+def test_tail_lines_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr("log_reader.TAIL_BLOCK_BYTES", 4)
+    path = tmp_path / "run.log"
+    path.write_bytes(b"".join(f"line {i}\n".encode() for i in range(20)))
+    assert tail_lines(str(path), 3)["content"] == "line 17\nline 18\nline 19\n"
+
+def test_read_lines_by_line_number(log_file):
+    page = read_lines(log_file, 1, 1)
+    assert page["content"] == "second\n"
+    assert page["nextLine"] == 2
+    assert page["offset"] == 6
+    assert not page["eof"]
+
+def test_read_lines_past_last_line(log_file):
+    page = read_lines(log_file, 10, 5)
+    assert page["content"] == ""
+    assert page["nextLine"] == 10
+    assert page["eof"]
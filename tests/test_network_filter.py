@@ -0,0 +1,79 @@
+import time
+import pytest
+from network_filter import NetworkFilter, cache_lifetime, response_headers, split_list
+
+@pytest.fixture
+def network(tmp_path):
+    return NetworkFilter(cache_dir=str(tmp_path / "assets"))
+
+def test_decide_blocks_heavy_types_and_trackers(network):
+    assert network.decide("https://shop.example.com/logo.png", "image") == "block"
+    assert network.decide("https://shop.example.com/font.woff2", "font") == "block"
+    assert network.decide("https://www.google-analytics.com/collect", "xhr") == "block"
+    assert network.decide("https://cdn.segment.com/analytics.js", "script") == "block"
+
+def test_decide_never_blocks_documents_by_type(tmp_path):
+    network = NetworkFilter(allow_types=("script",), cache_dir=None)
+    assert network.decide("https://shop.example.com/", "document") == "continue"
+    assert network.decide("https://shop.example.com/api", "xhr") == "block"
+
+def test_decide_caches_static_gets(network):
+    assert network.decide("https://shop.example.com/app.js", "script") == "cache"
+    assert network.decide("https://shop.example.com/app.css", "stylesheet") == "cache"
+    assert network.decide("https://shop.example.com/app.js", "script", "POST") == "continue"
+    assert network.decide("https://shop.example.com/api", "fetch") == "continue"
+
+def test_decide_allow_domains_win(tmp_path):
+    network = NetworkFilter(allow_domains=("cdn.example.com",), cache_dir=None)
+    assert network.decide("https://img.cdn.example.com/logo.png", "image") == "continue"
+    assert network.decide("https://other.example.com/logo.png", "image") == "block"
+
+def test_decide_ignores_non_http_urls(network):
+    assert network.decide("data:image/png;base64,AAAA", "image") == "continue"
+
+@pytest.mark.parametrize("headers, lifetime", [
+    ({"cache-control": "public, max-age=600"}, 600),
+    ({"Cache-Control": "max-age=31536000, immutable"}, 3600),
+    ({"cache-control": "public, immutable"}, 3600),
+    ({"cache-control": "no-cache"}, 0),
+    ({"cache-control": "no-store, max-age=600"}, 0),
+    ({"cache-control": "max-age=600", "vary": "Cookie"}, 0),
+    ({"cache-control": "max-age=600", "vary": "Accept-Encoding"}, 600),
+    ({"etag": "\"abc\""}, 0),
+    ({}, 0),
+    ({"date": "Sun, 18 Oct 2026 10:00:00 GMT", "expires": "Sun, 18 Oct 2026 10:05:00 GMT"}, 300),
+    ({"expires": "0"}, 0),
+])
+def test_cache_lifetime(headers, lifetime):
+    assert cache_lifetime(headers, max_age=3600) == lifetime
+
+def test_store_and_serve_fresh_asset(network):
+    url = "https://shop.example.com/app.js"
+    network.store(url, 200, {"cache-control": "max-age=600", "content-encoding": "gzip"}, b"code")
+    status, headers, body = network.cached(url)
+    assert (status, body) == (200, b"code")
+    assert headers == {"cache-control": "max-age=600"}
+    assert network.stats["cache_hits"] == 1
+
+def test_uncacheable_responses_are_not_stored(network):
+    network.store("https://shop.example.com/a.js", 200, {"cache-control": "no-store"}, b"code")
+    network.store("https://shop.example.com/b.js", 200, {}, b"code")
+    network.store("https://shop.example.com/c.js", 404, {"cache-control": "max-age=600"}, b"missing")
+    assert network.cached("https://shop.example.com/a.js") is None
+    assert network.cached("https://shop.example.com/b.js") is None
+    assert network.cached("https://shop.example.com/c.js") is None
+    assert network.stats["cache_stores"] == 0
+
+def test_expired_asset_is_refetched(network, monkeypatch):
+    url = "https://shop.example.com/app.js"
+    network.store(url, 200, {"cache-control": "max-age=60"}, b"v1")
+    now = time.time()
+    monkeypatch.setattr("network_filter.time.time", lambda: now + 120)
+    assert network.cached(url) is None
+
+def test_response_headers_drop_encoding():
+    assert response_headers({"Content-Length": "10", "Content-Type": "text/css"}) == {"Content-Type": "text/css"}
+
+def test_split_list():
+    assert split_list(" image, ,font ") == ("image", "font")
+    assert split_list(None) == ()
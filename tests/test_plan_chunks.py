@@ -0,0 +1,34 @@
+from plan_chunks import merge_test_plans, normalize_description, split_requirements
+
+def test_split_requirements_at_headings():
+    chunks = split_requirements(["Login", "a", "Search", "b"], headings=[0, 2])
+    assert chunks == [["Login", "a"], ["Search", "b"]]
+
+def test_split_requirements_at_char_budget():
+    chunks = split_requirements(["aaaa", "bbbb", "cccc"], max_chars=10)
+    assert chunks == [["aaaa", "bbbb"], ["cccc"]]
+
+def test_split_requirements_keeps_oversized_paragraph():
+    assert split_requirements(["x" * 50, "y"], max_chars=10) == [["x" * 50], ["y"]]
+
+def test_split_requirements_empty():
+    assert split_requirements([]) == []
+
+def test_normalize_description():
+    assert normalize_description("  Log\tIN\n now ") == "log in now"
+
+def test_merge_test_plans_drops_duplicates_per_section():
+    merged = merge_test_plans([
+        {"core_tests": [{"description": "Log in"}], "edge_cases": [{"description": "Empty form"}]},
+        {"core_tests": [{"description": "  log   IN "}, {"description": "Log out"}], "edge_cases": None},
+        {"security_tests": ["SQL injection", "sql injection"]},
+    ])
+    assert merged["core_tests"] == [{"description": "Log in"}, {"description": "Log out"}]
+    assert merged["edge_cases"] == [{"description": "Empty form"}]
+    assert merged["security_tests"] == ["SQL injection"]
+    assert merged["performance_tests"] == []
+
+def test_merge_test_plans_same_description_in_other_sections():
+    merged = merge_test_plans([{"core_tests": ["Checkout"], "edge_cases": ["Checkout"]}])
+    assert merged["core_tests"] == ["Checkout"]
+    assert merged["edge_cases"] == ["Checkout"]
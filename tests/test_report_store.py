@@ -0,0 +1,72 @@
+import json
+import os
+import pytest
+from report_store import ReportStore, parse_report_timestamp
+
+def report(timestamp, tests):
+    failed = sum(1 for test in tests if test["status"] == "failed")
+    return {
+        "summary": {"timestamp": timestamp, "total": len(tests), "passed": len(tests) - failed, "failed": failed},
+        "tests": tests
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.db"))
+    store.add_report(str(tmp_path / "r1.json"), report("20260101_100000", [
+        {"name": "Login", "status": "passed"},
+        {"name": "Search", "status": "failed", "error": "timeout"},
+    ]), "shop.json")
+    store.add_report(str(tmp_path / "r2.json"), report("20260102_100000", [
+        {"name": "Login", "status": "passed"},
+    ]), "admin.json")
+    store.add_report(str(tmp_path / "r3.json"), report("20260103_100000", [
+        {"name": "Checkout", "status": "failed"},
+    ]), "shop.json")
+    return store
+
+def names(reports):
+    return [os.path.basename(row["path"]) for row in reports]
+
+def test_list_reports_newest_first(store):
+    reports, total = store.list_reports()
+    assert total == 3
+    assert names(reports) == ["r3.json", "r2.json", "r1.json"]
+
+def test_list_reports_filters(store):
+    assert names(store.list_reports(suite="shop.json")[0]) == ["r3.json", "r1.json"]
+    assert names(store.list_reports(status="passed")[0]) == ["r2.json"]
+    since = parse_report_timestamp("20260102_000000")
+    until = parse_report_timestamp("20260103_000000")
+    assert names(store.list_reports(since=since, until=until)[0]) == ["r2.json"]
+
+def test_list_reports_pages(store):
+    reports, total = store.list_reports(page=2, per_page=2)
+    assert total == 3
+    assert names(reports) == ["r1.json"]
+
+def test_query_tests_filters(store):
+    tests, total = store.query_tests(status="failed")
+    assert total == 2
+    assert [test["name"] for test in tests] == ["Checkout", "Search"]
+    tests, _ = store.query_tests(name="log")
+    assert [(test["name"], test["suite"]) for test in tests] == [("Login", "admin.json"), ("Login", "shop.json")]
+
+def test_latest_report_per_suite(store):
+    assert store.latest_report("admin.json")["tests"] == [{"name": "Login", "status": "passed"}]
+    assert store.latest_report()["summary"]["timestamp"] == "20260103_100000"
+    assert store.latest_report("missing.json") is None
+
+def test_re_adding_a_path_replaces_it(store, tmp_path):
+    store.add_report(str(tmp_path / "r3.json"), report("20260103_100000", [{"name": "Checkout", "status": "passed"}]))
+    assert store.count_reports() == 3
+    assert store.query_tests(status="failed")[1] == 1
+
+def test_import_json_reports_skips_known_files(store, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("test_report_1.json", "test_report_2.json"):
+        with open(name, "w") as f:
+            json.dump(report("20251231_100000", [{"name": "Old", "status": "passed"}]), f)
+    assert store.import_json_reports() == 2
+    assert store.import_json_reports() == 0
+    assert store.count_reports() == 5
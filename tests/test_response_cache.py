@@ -0,0 +1,74 @@
+import os
+import time
+from response_cache import ResponseCache
+
+def make_cache(tmp_path, **kwargs):
+    return ResponseCache(str(tmp_path / "cache"), **kwargs)
+
+def entry_path(cache, prompt):
+    return os.path.join(cache.cache_dir, f"{cache.make_key('model', prompt)}.json")
+
+def age(path, seconds):
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+def test_round_trip_and_counters(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get("model", "prompt") is None
+    cache.put("model", "prompt", "answer")
+    assert cache.get("model", "prompt") == "answer"
+    assert cache.stats() == {"hits": 1, "misses": 1, "enabled": True}
+
+def test_key_depends_on_model_and_prompt():
+    assert ResponseCache.make_key("a", "prompt") != ResponseCache.make_key("b", "prompt")
+    assert ResponseCache.make_key("a", "prompt") == ResponseCache.make_key("a", "prompt")
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = make_cache(tmp_path, max_age=60)
+    cache.put("model", "prompt", "answer")
+    age(entry_path(cache, "prompt"), 120)
+    assert cache.get("model", "prompt") is None
+    assert not os.path.exists(entry_path(cache, "prompt"))
+
+def test_put_evicts_oldest_entries_over_budget(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=250)
+    for index, prompt in enumerate(["old", "middle", "new"]):
+        cache.put("model", prompt, "x" * 60)
+        age(entry_path(cache, prompt), 30 - index * 10)
+    cache.put("model", "newest", "x" * 60)
+    assert cache.get("model", "old") is None
+    assert cache.get("model", "newest") == "x" * 60
+
+def test_eviction_tolerates_files_removed_by_another_process(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, max_age=60)
+    cache.put("model", "stale", "answer")
+    stale = entry_path(cache, "stale")
+    age(stale, 120)
+    real_stat = os.stat
+
+    def stat_then_vanish(path, *args, **kwargs):
+        result = real_stat(path, *args, **kwargs)
+        if path == stale:
+            # Another process evicts the file between our stat and remove
+            os.remove(path)
+        return result
+
+    monkeypatch.setattr("response_cache.os.stat", stat_then_vanish)
+    cache.put("model", "fresh", "answer")
+    assert cache.get("model", "fresh") == "answer"
+
+def test_delete_and_clear(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("model", "a", "1")
+    cache.put("model", "b", "2")
+    cache.delete("model", "a")
+    cache.delete("model", "missing")
+    assert cache.get("model", "a") is None
+    cache.clear()
+    assert cache.get("model", "b") is None
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = make_cache(tmp_path, enabled=False)
+    cache.put("model", "prompt", "answer")
+    assert cache.get("model", "prompt") is None
+    assert not os.path.exists(cache.cache_dir)
@@ -0,0 +1,99 @@
+import pytest
+from flaky_history import FlakinessHistory
+from report_store import ReportStore
+from scheduler import DEFAULT_TEST_DURATION, DurationScheduler, makespan, shard_by_count, shard_by_duration
+
+def test_shard_by_count_spreads_remainder():
+    assert shard_by_count(list(range(5)), 2) == [[0, 1, 2], [3, 4]]
+
+def test_shard_by_count_keeps_file_order():
+    shards = shard_by_count(list(range(7)), 3)
+    assert [position for shard in shards for position in shard] == list(range(7))
+    assert [len(shard) for shard in shards] == [3, 2, 2]
+
+def test_shard_by_count_more_shards_than_tests():
+    assert shard_by_count([{}], 3) == [[0], [], []]
+
+def test_shard_by_duration_balances_load():
+    durations = [8, 3, 3, 2, 2]
+    shards = shard_by_duration([{}] * 5, 2, durations)
+    assert sorted(sum(durations[position] for position in shard) for shard in shards) == [8, 10]
+    assert sorted(position for shard in shards for position in shard) == list(range(5))
+
+def test_shard_by_duration_keeps_positions_sorted():
+    # Longest first: 4 and 3 open the shards, 2 joins the lighter one, then 1
+    assert shard_by_duration([{}] * 4, 2, [1, 4, 2, 3]) == [[0, 1], [2, 3]]
+
+def test_makespan_single_worker_is_total():
+    assert makespan([3, 1, 2], [0, 1, 2], 1) == 6
+
+def test_makespan_depends_on_order():
+    durations = [1, 1, 2]
+    assert makespan(durations, [0, 1, 2], 2) == 3
+    assert makespan(durations, [2, 0, 1], 2) == 2
+
+def test_makespan_more_workers_than_tests():
+    assert makespan([4, 2], [0, 1], 5) == 4
+
+def test_makespan_zero_workers_uses_one():
+    assert makespan([1, 2], [0, 1], 0) == 3
+
+def report(timestamp, tests):
+    return {"summary": {"timestamp": timestamp, "failed": 0}, "tests": tests}
+
+@pytest.fixture
+def report_db(tmp_path):
+    path = str(tmp_path / "reports.db")
+    store = ReportStore(path)
+    store.add_report(str(tmp_path / "a1.json"), report("20260101_000000", [
+        {"name": "checkout", "status": "passed", "duration": 30},
+        {"name": "search", "status": "skipped", "duration": 99},
+    ]), "a.json")
+    store.add_report(str(tmp_path / "a2.json"), report("20260102_000000", [
+        {"name": "checkout", "status": "failed", "duration": 20},
+    ]), "a.json")
+    store.add_report(str(tmp_path / "b1.json"), report("20260103_000000", [
+        {"name": "checkout", "status": "passed", "duration": 1},
+    ]), "b.json")
+    return path
+
+def test_report_durations_by_suite(report_db):
+    store = ReportStore(report_db)
+    assert store.test_durations() == {"checkout": [1, 20, 30]}
+    assert store.test_durations(suite="a.json") == {"checkout": [20, 30]}
+    assert store.test_durations(reports=1) == {"checkout": [1]}
+
+def test_past_durations_only_use_runs_of_the_suite(report_db):
+    tests = [{"name": "checkout"}, {"name": "search"}]
+    assert DurationScheduler(report_db, suite="a.json").past_durations(tests) == {"checkout": [20, 30]}
+    assert DurationScheduler(report_db, suite="b.json").past_durations(tests) == {"checkout": [1]}
+
+def test_estimates_fall_back_to_per_step_average(report_db):
+    tests = [
+        {"name": "checkout", "steps": [{}] * 5},
+        {"name": "new test", "steps": [{}] * 2},
+        {"name": "empty", "steps": []},
+    ]
+    estimates = DurationScheduler(report_db, suite="a.json").estimates(tests)
+    assert estimates == [25, 10, DEFAULT_TEST_DURATION]
+
+def test_history_fallback_is_scoped_to_the_suite(report_db, tmp_path):
+    path = str(tmp_path / "history.json")
+    other = FlakinessHistory(path, "b.json")
+    other.record({"name": "login", "status": "passed", "duration": 40.0})
+    other.save()
+    tests = [{"name": "login", "steps": []}]
+    history = FlakinessHistory(path, "a.json")
+    assert DurationScheduler(report_db, history, suite="a.json").estimates(tests) == [DEFAULT_TEST_DURATION]
+    history = FlakinessHistory(path, "b.json")
+    assert DurationScheduler(report_db, history, suite="b.json").estimates(tests) == [40.0]
+
+def test_flaky_tests_are_stretched_by_likely_retries(report_db, tmp_path):
+    history = FlakinessHistory(str(tmp_path / "history.json"), "a.json")
+    history.record({"name": "checkout", "status": "passed", "retry_count": 1})
+    estimates = DurationScheduler(report_db, history, suite="a.json").estimates([{"name": "checkout"}], retries=2)
+    assert estimates == [25 * 3]
+
+def test_order_runs_longest_first(report_db):
+    tests = [{"name": "unknown", "steps": []}, {"name": "checkout", "steps": [{}]}]
+    assert DurationScheduler(report_db, workers=2, suite="a.json").order(tests, [0, 1]) == [1, 0]
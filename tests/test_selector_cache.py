@@ -0,0 +1,61 @@
+from selector_cache import SelectorCache
+
+KEY = "example.com|/login|click:abc"
+
+def make_cache(tmp_path, demote_after=2):
+    return SelectorCache(str(tmp_path / "selector_cache.json"), demote_after)
+
+def test_order_without_entry_keeps_candidates(tmp_path):
+    assert make_cache(tmp_path).order(KEY, ["#a", "#b"]) == ["#a", "#b"]
+
+def test_order_puts_last_winner_first(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.record(KEY, "#c", True)
+    assert cache.order(KEY, ["#a", "#b", "#c"]) == ["#c", "#a", "#b"]
+
+def test_order_prefers_more_successes_then_position(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.record(KEY, "#b", True)
+    cache.record(KEY, "#b", True)
+    cache.record(KEY, "#c", True)
+    assert cache.order(KEY, ["#a", "#b", "#c"]) == ["#c", "#b", "#a"]
+
+def test_repeat_failures_are_demoted_last(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.record(KEY, "#a", False)
+    cache.record(KEY, "#a", False)
+    assert cache.order(KEY, ["#a", "#b"]) == ["#b", "#a"]
+
+def test_failing_winner_loses_its_place(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.record(KEY, "#b", True)
+    cache.record(KEY, "#b", False)
+    assert cache.order(KEY, ["#a", "#b"]) == ["#b", "#a"]
+    cache.record(KEY, "#b", False)
+    assert cache.entries[KEY]["last_success"] is None
+    assert cache.order(KEY, ["#a", "#b"]) == ["#a", "#b"]
+
+def test_success_resets_consecutive_failures(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.record(KEY, "#a", False)
+    cache.record(KEY, "#a", True)
+    cache.record(KEY, "#a", False)
+    assert cache.order(KEY, ["#b", "#a"]) == ["#a", "#b"]
+
+def test_make_key_ignores_candidate_order_and_query():
+    step = {"action": "click", "selector": ["#b", "#a"]}
+    same = {"action": "click", "selector": ["#a", "#b"]}
+    assert SelectorCache.make_key("https://example.com/login?x=1", step) == \
+        SelectorCache.make_key("https://example.com/login", same)
+    assert SelectorCache.make_key("https://example.com/other", step) != \
+        SelectorCache.make_key("https://example.com/login", step)
+
+def test_saves_from_two_instances_merge(tmp_path):
+    first, second = make_cache(tmp_path), make_cache(tmp_path)
+    first.record(KEY, "#a", True)
+    second.record(KEY, "#b", True)
+    first.save()
+    second.save()
+    stats = make_cache(tmp_path).entries[KEY]["selectors"]
+    assert stats["#a"]["successes"] == 1
+    assert stats["#b"]["successes"] == 1
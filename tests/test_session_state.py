@@ -0,0 +1,64 @@
+import os
+import stat
+import time
+from session_state import SessionManager, is_login_page, login_landing_url, login_step_count, session_key
+
+def login_steps(url="https://shop.example.com/login", user="alice"):
+    return [
+        {"action": "navigate", "value": url, "fixture": "login"},
+        {"action": "fill", "selector": "#user", "value": user, "fixture": "login"},
+        {"action": "click", "selector": "#submit", "fixture": "login"},
+        {"action": "expect", "selector": "url", "value": "/dashboard", "fixture": "login"},
+    ]
+
+def protected_test(**kwargs):
+    return {"name": "Orders", "steps": login_steps(**kwargs) + [{"action": "click", "selector": "#orders"}]}
+
+def test_session_key_names_the_host():
+    assert session_key(login_steps("https://shop.example.com:8443/login")).startswith("shop.example.com_8443.")
+
+def test_session_key_differs_by_site_and_account():
+    base = session_key(login_steps())
+    assert session_key(login_steps()) == base
+    assert session_key(login_steps(user="bob")) != base
+    assert session_key(login_steps("https://shop.example.com/app2/login")) != base
+    assert session_key(login_steps("https://staging.example.com/login")) != base
+
+def test_session_key_without_navigate_step():
+    assert session_key([{"action": "fill", "selector": "#user", "value": "alice"}]).startswith("local.")
+
+def test_login_helpers():
+    test = protected_test()
+    assert login_step_count(test) == 4
+    assert login_landing_url(test["steps"][:4]) == "https://shop.example.com/dashboard"
+    assert is_login_page("https://shop.example.com/login/?next=/orders", test["steps"][:4])
+    assert not is_login_page("https://shop.example.com/dashboard", test["steps"][:4])
+
+def test_unbound_manager_loads_nothing(tmp_path):
+    assert SessionManager(str(tmp_path / "session_state.json")).storage_state() is None
+
+def test_bind_uses_first_protected_test(tmp_path):
+    manager = SessionManager(str(tmp_path / "session_state.json"))
+    manager.bind([{"name": "Home", "steps": []}, protected_test()])
+    assert manager.path == str(tmp_path / f"session_state.{session_key(login_steps())}.json")
+    manager.bind([protected_test(user="bob")])
+    assert manager.path.endswith(f"{session_key(login_steps())}.json")
+
+def test_saved_state_is_private_and_not_shared_with_other_accounts(tmp_path):
+    alice = SessionManager(str(tmp_path / "session_state.json"))
+    alice.bind([protected_test()])
+    alice.save({"cookies": [], "origins": []})
+    assert stat.S_IMODE(os.stat(alice.path).st_mode) == 0o600
+    assert alice.storage_state() == alice.path
+
+    bob = SessionManager(str(tmp_path / "session_state.json"))
+    bob.bind([protected_test(user="bob")])
+    assert bob.storage_state() is None
+
+def test_expired_state_is_not_reused(tmp_path):
+    manager = SessionManager(str(tmp_path / "session_state.json"), max_age=60)
+    manager.bind([protected_test()])
+    manager.save({"cookies": []})
+    stamp = time.time() - 120
+    os.utime(manager.path, (stamp, stamp))
+    assert manager.storage_state() is None
@@ -0,0 +1,76 @@
+from step_prefix import PrefixPlan, PrefixTrie, step_signature
+
+def navigate(url):
+    return {"action": "navigate", "value": url}
+
+def click(selector):
+    return {"action": "click", "selector": selector}
+
+def build_trie(tests):
+    trie = PrefixTrie()
+    for index, steps in enumerate(tests):
+        trie.add(index, steps)
+    return trie
+
+def test_order_groups_tests_sharing_a_prefix():
+    trie = build_trie([
+        [navigate("/a"), click("#x")],
+        [navigate("/b"), click("#y")],
+        [navigate("/a"), click("#z")],
+    ])
+    assert trie.order() == [0, 2, 1]
+
+def test_order_keeps_insertion_order_of_siblings():
+    trie = build_trie([[navigate("/c")], [navigate("/b")], [navigate("/a")]])
+    assert trie.order() == [0, 1, 2]
+
+def test_order_puts_prefix_test_before_its_extensions():
+    trie = build_trie([
+        [navigate("/a"), click("#x"), click("#y")],
+        [navigate("/a"), click("#x")],
+    ])
+    assert trie.order() == [1, 0]
+
+def test_shared_prefixes_report_longest_common_prefix():
+    shared = build_trie([
+        [navigate("/a"), click("#x"), click("#y")],
+        [navigate("/a"), click("#x"), click("#z")],
+        [navigate("/b")],
+    ]).shared_prefixes()
+    assert len(shared) == 1
+    assert shared[0]["length"] == 2
+    assert shared[0]["tests"] == [0, 1]
+    assert shared[0]["signatures"] == [step_signature(navigate("/a")), step_signature(click("#x"))]
+
+def test_redundant_steps_count_repeated_prefix_steps():
+    trie = build_trie([
+        [navigate("/a"), click("#x"), click("#y")],
+        [navigate("/a"), click("#x"), click("#z")],
+        [navigate("/a")],
+    ])
+    # navigate("/a") repeats twice, click("#x") once
+    assert trie.redundant_steps() == 3
+
+def test_step_signature_ignores_executor_fields():
+    assert step_signature({**click("#x"), "fixture": "login"}) == step_signature(click("#x"))
+
+def test_prefix_plan_only_reuses_navigation_prefixes():
+    tests = [
+        {"steps": [navigate("/a"), {"action": "wait", "value": 1}, click("#x")]},
+        {"steps": [navigate("/a"), {"action": "wait", "value": 1}, click("#y")]},
+        {"steps": [click("#x"), click("#y")]},
+        {"steps": [click("#x"), click("#y")]},
+    ]
+    plan = PrefixPlan(tests)
+    assert [length for _, length in plan.prefixes_for(tests[0])] == [2]
+    assert plan.prefixes_for(tests[2]) == []
+    assert plan.summary()["reusable_tests"] == 2
+
+def test_prefix_plan_stops_at_assertions():
+    tests = [
+        {"steps": [navigate("/cart"), {"action": "assert", "selector": "#cart", "value": "Cart (0)"}, click("#x")]},
+        {"steps": [navigate("/cart"), {"action": "assert", "selector": "#cart", "value": "Cart (0)"}, click("#y")]},
+    ]
+    plan = PrefixPlan(tests)
+    assert plan.prefixes_for(tests[0]) == []
+    assert plan.prefixes_for(tests[1]) == []
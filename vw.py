@@ -1,14 +1,24 @@
+import copy
 import json
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor
 from docx import Document
-import google.generativeai as genai
-import time
-from testing import load_test_cases, execute_test_cases
+from testing import apply_base_url, execute_test_cases, execute_test_stream, load_test_cases
+from async_testing import execute_test_cases_async
+from response_cache import ResponseCache
+from gemini_client import BackoffPolicy, get_gemini_client
+from generation_manifest import GenerationManifest, fingerprint_requirement
+from session_state import LOGIN_FIXTURE
+from plan_chunks import CHUNK_CHAR_BUDGET, merge_test_plans, split_requirements
+from json_stream import StreamingJsonArrayParser
 
 GEMINI_MODEL = 'gemini-2.0-flash-lite'
 MAX_RETRIES = 3
-RETRY_DELAY = 2 
+BACKOFF_POLICY = BackoffPolicy(max_retries=MAX_RETRIES)
+CHUNK_CONCURRENCY = 4
+
+RESPONSE_CACHE = ResponseCache()
 
 def parse_requirements(doc_path, output_dir="."):
     """Parse requirements from a Word document and save them as JSON."""
@@ -19,11 +29,13 @@ def parse_requirements(doc_path, output_dir="."):
         os.makedirs(output_dir, exist_ok=True)
         
         doc = Document(doc_path)
-        requirements = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
+        paragraphs = [p for p in doc.paragraphs if p.text.strip()]
+        requirements = [p.text.strip() for p in paragraphs]
+        headings = [i for i, p in enumerate(paragraphs) if p.style is not None and p.style.name.startswith("Heading")]
         
         requirements_path = os.path.join(output_dir, "requirements.json")
         with open(requirements_path, "w", encoding="utf-8") as f:
-            json.dump({"requirements": requirements}, f, indent=4, ensure_ascii=False)
+            json.dump({"requirements": requirements, "headings": headings}, f, indent=4, ensure_ascii=False)
         
         print(f"✅ Requirements JSON generated: {requirements_path}")
         return requirements_path
@@ -33,26 +45,37 @@ def parse_requirements(doc_path, output_dir="."):
         return None
 
 def call_gemini_api(model, prompt, gemini_key):
-    """Call Gemini API with simple retry logic."""
+    """Call Gemini API through the shared client, retrying with backoff."""
     if not gemini_key or gemini_key == "YOUR_GEMINI_API_KEY":
         raise ValueError("❌ Invalid Gemini API key. Please provide a valid key.")
     
-    for attempt in range(MAX_RETRIES):
-        try:
-            genai.configure(api_key=gemini_key)
-            gen_model = genai.GenerativeModel(model)
-            
-            response = gen_model.generate_content(prompt)
-            return response.text.strip()
-            
-        except Exception as e:
-            print(f"⚠️ API error on attempt {attempt+1}/{MAX_RETRIES}: {e}")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY)
-            else:
-                raise
+    client = get_gemini_client(gemini_key, BACKOFF_POLICY)
+    return client.generate(model, prompt)
+
+def call_gemini_json(model, prompt, gemini_key, use_cache=True):
+    """Call Gemini and return the JSON in its response.
     
-    raise Exception("Failed all API call attempts")
+    Responses are served from RESPONSE_CACHE when the same model and prompt
+    were seen before; pass use_cache=False to force a fresh call. Only
+    responses that parse are cached, and a cached one that no longer
+    parses is dropped.
+    """
+    if use_cache:
+        cached = RESPONSE_CACHE.get(model, prompt)
+        if cached is not None:
+            try:
+                data = extract_json_from_text(cached)
+                print("💾 Using cached Gemini response")
+                return data
+            except ValueError:
+                print("⚠️ Dropping unparseable cached Gemini response")
+                RESPONSE_CACHE.delete(model, prompt)
+    
+    text = call_gemini_api(model, prompt, gemini_key)
+    data = extract_json_from_text(text)
+    if use_cache:
+        RESPONSE_CACHE.put(model, prompt, text)
+    return data
 
 def extract_json_from_text(text):
     """Extract and validate JSON from text response."""
@@ -70,17 +93,9 @@ def extract_json_from_text(text):
         print(f"🔍 Raw JSON string: {text}")
         raise ValueError("Invalid JSON in the response")
 
-def generate_functionality_testplan(requirements_path, output_dir=".", gemini_key=None):
-    """Generate a test plan based on requirements JSON file."""
-    if not gemini_key:
-        raise ValueError("Gemini API key is required")
-    
-    try:
-        with open(requirements_path, "r", encoding="utf-8") as f:
-            requirements_data = json.load(f)
-        
-        requirements_text = "\n".join(requirements_data.get("requirements", []))
-        prompt = f"""
+def build_testplan_prompt(requirements_text):
+    """Build the Gemini prompt that turns requirements text into a test plan."""
+    return f"""
         Based on these requirements:
         {requirements_text}
 
@@ -106,22 +121,73 @@ def generate_functionality_testplan(requirements_path, output_dir=".", gemini_ke
         }}
         Only return valid JSON with no additional text.
         """
+
+def generate_testplan_for_text(requirements_text, gemini_key):
+    """Generate a test plan dict for a block of requirements text."""
+    prompt = build_testplan_prompt(requirements_text)
+    return call_gemini_json(GEMINI_MODEL, prompt, gemini_key)
+
+def generate_chunked_testplan(requirements, gemini_key, headings=None, max_chars=CHUNK_CHAR_BUDGET,
+                              max_workers=CHUNK_CONCURRENCY):
+    """Generate test plans for requirement chunks concurrently and merge them."""
+    chunks = split_requirements(requirements, headings, max_chars)
+    print(f"🧩 Split requirements into {len(chunks)} chunks")
+    if len(chunks) == 1:
+        return generate_testplan_for_text("\n".join(chunks[0]), gemini_key)
+    
+    def generate_chunk(item):
+        index, chunk = item
+        print(f"📤 Generating test plan for chunk {index + 1}/{len(chunks)}...")
+        return generate_testplan_for_text("\n".join(chunk), gemini_key)
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        test_plans = list(executor.map(generate_chunk, enumerate(chunks)))
+    
+    merged = merge_test_plans(test_plans)
+    print(f"🧩 Merged {len(test_plans)} chunk test plans")
+    return merged
+
+def write_test_plan(test_plan_data, output_dir="."):
+    """Save a test plan as JSON and return the file path."""
+    test_plan_path = os.path.join(output_dir, "test_plan.json")
+    with open(test_plan_path, "w", encoding="utf-8") as f:
+        json.dump(test_plan_data, f, indent=4, ensure_ascii=False)
+    
+    print(f"✅ Test plan JSON generated: {test_plan_path}")
+    return test_plan_path
+
+def generate_functionality_testplan(requirements_path, output_dir=".", gemini_key=None, chunk_chars=None,
+                                    max_workers=CHUNK_CONCURRENCY):
+    """Generate a test plan based on requirements JSON file.
+    
+    When chunk_chars is set, requirements are split into sections of at most
+    that many characters and planned concurrently by up to max_workers calls.
+    """
+    if not gemini_key:
+        raise ValueError("Gemini API key is required")
+    
+    try:
+        with open(requirements_path, "r", encoding="utf-8") as f:
+            requirements_data = json.load(f)
         
-        # Call Gemini API
-        print("📤 Sending test plan generation request to Gemini API...")
-        response_text = call_gemini_api(GEMINI_MODEL, prompt, gemini_key)
-        
-        # Process response
-        print("📥 Processing Gemini API response...")
-        test_plan_data = extract_json_from_text(response_text)
+        requirements = requirements_data.get("requirements", [])
+        if chunk_chars:
+            test_plan_data = generate_chunked_testplan(
+                requirements,
+                gemini_key,
+                headings=requirements_data.get("headings"),
+                max_chars=chunk_chars,
+                max_workers=max_workers
+            )
+        else:
+            # Call Gemini API
+            print("📤 Sending test plan generation request to Gemini API...")
+            prompt = build_testplan_prompt("\n".join(requirements))
+            test_plan_data = call_gemini_json(GEMINI_MODEL, prompt, gemini_key)
+            print("📥 Processed Gemini API response")
         
         # Save test plan as JSON
-        test_plan_path = os.path.join(output_dir, "test_plan.json")
-        with open(test_plan_path, "w", encoding="utf-8") as f:
-            json.dump(test_plan_data, f, indent=4, ensure_ascii=False)
-        
-        print(f"✅ Test plan JSON generated: {test_plan_path}")
-        return test_plan_path
+        return write_test_plan(test_plan_data, output_dir)
     
     except Exception as e:
         print(f"❌ Error generating test plan: {e}")
@@ -270,24 +336,17 @@ def enhance_selectors_intelligently(test_steps):
                     "selector": step["selector"].copy() if isinstance(step["selector"], list) else step["selector"],
                     "value": "visible"
                 }
+                if step.get("fixture"):
+                    wait_step["fixture"] = step["fixture"]
                 enhanced_steps.append(wait_step)
         
         enhanced_steps.append(step)
     
     return enhanced_steps
 
-def generate_playwright_testcases(test_plan_path, output_dir=".", gemini_key=None):
-    """Generate Playwright test cases based on the test plan."""
-    if not gemini_key:
-        raise ValueError("Gemini API key is required")
-    
-    try:
-        # Read the test plan JSON
-        with open(test_plan_path, "r", encoding="utf-8") as f:
-            test_plan_data = json.load(f)
-        
-        # Construct prompt for Gemini with strict JSON structure requirements
-        prompt = f"""
+def build_playwright_prompt(test_plan_data):
+    """Build the Gemini prompt that turns a test plan into Playwright test cases."""
+    return f"""
         You are an AI assistant that extracts functional requirements from an SRS (Software Requirements Specification) document.
         and generates functional test cases for Playwright in JSON format. Each test case should include the URL of the related functionality.
 
@@ -333,201 +392,407 @@ def generate_playwright_testcases(test_plan_path, output_dir=".", gemini_key=Non
         Include both CSS selectors and XPath selectors for better robustness.
         """
 
-        # Call Gemini API
-        print("📤 Sending Playwright test generation request to Gemini API...")
-        response_text = call_gemini_api(GEMINI_MODEL, prompt, gemini_key)
-        
-        # Process response
-        print("📥 Processing Gemini API response...")
-        playwright_data = extract_json_from_text(response_text)
-        
-        # Replace the validation loop in generate_playwright_testcases with:
-
-        # Enhanced validation to ensure test quality
-        print("🔍 Validating and enhancing test cases...")
-
-        validated_tests = []
-        for test in playwright_data.get("tests", []):
-            # Ensure test has required fields
-            if "name" not in test:
-                test["name"] = "Unnamed test"
-            if "description" not in test:
-                test["description"] = "Auto-generated test case"
-            if "expected_result" not in test:
-                test["expected_result"] = "Test should complete successfully"
-            if "steps" not in test or not isinstance(test["steps"], list):
-                test["steps"] = []
-            
-            # Check if this is accessing a protected page
-            needs_auth = False
-            has_auth = False
-            
-            # First check if test needs auth by looking at navigation targets
-            for step in test["steps"]:
-                if step["action"] == "navigate" and step.get("value"):
-                    path = step.get("value", "").lower()
-                    if path.startswith("/shop") or path.startswith("/product") or path.startswith("/cart") or path.startswith("/checkout"):
-                        needs_auth = True
-                        break
-            
-            # Then check if it already has auth steps
-            if needs_auth:
-                auth_count = 0
-                for step in test["steps"]:
-                    if step["action"] == "type":
-                        selector = step.get("selector", "")
-                        if isinstance(selector, list):
-                            # Check any selector in the list matches email or password
-                            for s in selector:
-                                if "email" in str(s).lower():
-                                    auth_count += 1
-                                    break
-                                elif "password" in str(s).lower():
-                                    auth_count += 1
-                                    break
-                        elif "email" in str(selector).lower():
+def validate_test_case(test):
+    """Fill in missing fields, inject required auth steps and enhance selectors of a generated test."""
+    # Ensure test has required fields
+    if "name" not in test:
+        test["name"] = "Unnamed test"
+    if "description" not in test:
+        test["description"] = "Auto-generated test case"
+    if "expected_result" not in test:
+        test["expected_result"] = "Test should complete successfully"
+    if "steps" not in test or not isinstance(test["steps"], list):
+        test["steps"] = []
+
+    # Check if this is accessing a protected page
+    needs_auth = False
+    has_auth = False
+
+    # First check if test needs auth by looking at navigation targets
+    for step in test["steps"]:
+        if step["action"] == "navigate" and step.get("value"):
+            path = step.get("value", "").lower()
+            if path.startswith("/shop") or path.startswith("/product") or path.startswith("/cart") or path.startswith("/checkout"):
+                needs_auth = True
+                break
+
+    # Then check if it already has auth steps
+    if needs_auth:
+        auth_count = 0
+        for step in test["steps"]:
+            if step["action"] == "type":
+                selector = step.get("selector", "")
+                if isinstance(selector, list):
+                    # Check any selector in the list matches email or password
+                    for s in selector:
+                        if "email" in str(s).lower():
                             auth_count += 1
-                        elif "password" in str(selector).lower():
+                            break
+                        elif "password" in str(s).lower():
                             auth_count += 1
-                
-                has_auth = auth_count >= 2  # Both email and password
-            
-            # Add auth steps if needed and missing
-            if needs_auth and not has_auth:
-                print(f"⚠️ Adding missing authentication steps to test: {test['name']}")
-                
-                # Find first navigate step
-                first_step_index = 0
-                for i, step in enumerate(test["steps"]):
-                    if step["action"] == "navigate":
-                        first_step_index = i
-                        break
-                
-                # Create auth steps with multiple selectors
-                auth_steps = [
-                    {
-                        "action": "navigate",
-                        "selector": [],
-                        "value": "/auth"
-                    },
-                    {
-                        "action": "wait",
-                        "selector": [
-                            "input[type=\"email\"]",
-                            "#email",
-                            "input[name=\"email\"]",
-                            "//input[@type='email']",
-                            "//input[@id='email']"
-                        ],
-                        "value": "visible"
-                    },
-                    {
-                        "action": "type",
-                        "selector": [
-                            "#email",
-                            "input[type=\"email\"]",
-                            "input[name=\"email\"]",
-                            "//input[@id='email']",
-                            "//input[@type='email']"
-                        ],
-                        "value": "farmer@gmail.com"
-                    },
-                    {
-                        "action": "type",
-                        "selector": [
-                            "#password",
-                            "input[type=\"password\"]",
-                            "input[name=\"password\"]",
-                            "//input[@id='password']",
-                            "//input[@type='password']"
-                        ],
-                        "value": "123456"
-                    },
-                    {
-                        "action": "wait",
-                        "selector": [
-                            "text=Sign In",
-                            "button:has-text('Sign In')",
-                            "button.login-button",
-                            "//button[contains(text(), 'Sign In')]",
-                            "input[type=\"submit\"]"
-                        ],
-                        "value": "visible"
-                    },
-                    {
-                        "action": "click",
-                        "selector": [
-                            "text=Sign In",
-                            "button:has-text('Sign In')",
-                            "button.login-button",
-                            "//button[contains(text(), 'Sign In')]",
-                            "input[type=\"submit\"]"
-                        ],
-                        "value": "null"
-                    },
-                    {
-                        "action": "expect",
-                        "selector": "url",
-                        "value": "/shop"
-                    }
-                ]
-                
-                # Insert auth steps at the beginning
-                test["steps"] = auth_steps + test["steps"][first_step_index+1:]
-            
-            # Use the new helper function to intelligently enhance selectors
-            test["steps"] = enhance_selectors_intelligently(test["steps"])
-            
-            validated_tests.append(test)
+                            break
+                elif "email" in str(selector).lower():
+                    auth_count += 1
+                elif "password" in str(selector).lower():
+                    auth_count += 1
 
-        playwright_data["tests"] = validated_tests
-        
-        # Save Playwright test cases as JSON
-        playwright_path = os.path.join(output_dir, "playwright_tests.json")
-        with open(playwright_path, "w", encoding="utf-8") as f:
-            json.dump(playwright_data, f, indent=4, ensure_ascii=False)
+        has_auth = auth_count >= 2  # Both email and password
+
+    # Add auth steps if needed and missing
+    if needs_auth and not has_auth:
+        print(f"⚠️ Adding missing authentication steps to test: {test['name']}")
+
+        # Find first navigate step
+        first_step_index = 0
+        for i, step in enumerate(test["steps"]):
+            if step["action"] == "navigate":
+                first_step_index = i
+                break
+
+        # Create auth steps with multiple selectors
+        auth_steps = [
+            {
+                "action": "navigate",
+                "selector": [],
+                "value": "/auth"
+            },
+            {
+                "action": "wait",
+                "selector": [
+                    "input[type=\"email\"]",
+                    "#email",
+                    "input[name=\"email\"]",
+                    "//input[@type='email']",
+                    "//input[@id='email']"
+                ],
+                "value": "visible"
+            },
+            {
+                "action": "type",
+                "selector": [
+                    "#email",
+                    "input[type=\"email\"]",
+                    "input[name=\"email\"]",
+                    "//input[@id='email']",
+                    "//input[@type='email']"
+                ],
+                "value": "farmer@gmail.com"
+            },
+            {
+                "action": "type",
+                "selector": [
+                    "#password",
+                    "input[type=\"password\"]",
+                    "input[name=\"password\"]",
+                    "//input[@id='password']",
+                    "//input[@type='password']"
+                ],
+                "value": "123456"
+            },
+            {
+                "action": "wait",
+                "selector": [
+                    "text=Sign In",
+                    "button:has-text('Sign In')",
+                    "button.login-button",
+                    "//button[contains(text(), 'Sign In')]",
+                    "input[type=\"submit\"]"
+                ],
+                "value": "visible"
+            },
+            {
+                "action": "click",
+                "selector": [
+                    "text=Sign In",
+                    "button:has-text('Sign In')",
+                    "button.login-button",
+                    "//button[contains(text(), 'Sign In')]",
+                    "input[type=\"submit\"]"
+                ],
+                "value": "null"
+            },
+            {
+                "action": "expect",
+                "selector": "url",
+                "value": "/shop"
+            }
+        ]
+
+        # Tag auth steps so the executor can replace them with a saved session
+        for step in auth_steps:
+            step["fixture"] = LOGIN_FIXTURE
+
+        # Insert auth steps at the beginning
+        test["steps"] = auth_steps + test["steps"][first_step_index+1:]
+
+    # Use the new helper function to intelligently enhance selectors
+    test["steps"] = enhance_selectors_intelligently(test["steps"])
+    
+    return test
+
+def generate_playwright_tests_for_plan(test_plan_data, gemini_key):
+    """Generate and validate Playwright tests for a test plan dict."""
+    prompt = build_playwright_prompt(test_plan_data)
+    
+    # Call Gemini API
+    print("📤 Sending Playwright test generation request to Gemini API...")
+    playwright_data = call_gemini_json(GEMINI_MODEL, prompt, gemini_key)
+    print("📥 Processed Gemini API response")
+    
+    # Enhanced validation to ensure test quality
+    print("🔍 Validating and enhancing test cases...")
+    return [validate_test_case(test) for test in playwright_data.get("tests", [])]
+
+def stream_playwright_tests_for_plan(test_plan_data, gemini_key, use_cache=True):
+    """Yield validated Playwright tests one by one while Gemini is still generating.
+    
+    Falls back to parsing the complete response if no test could be
+    extracted incrementally.
+    """
+    prompt = build_playwright_prompt(test_plan_data)
+    cached = RESPONSE_CACHE.get(GEMINI_MODEL, prompt) if use_cache else None
+    if cached is not None:
+        print("💾 Using cached Gemini response")
+        chunks = [cached]
+    else:
+        print("📤 Streaming Playwright test generation request to Gemini API...")
+        chunks = get_gemini_client(gemini_key, BACKOFF_POLICY).generate_stream(GEMINI_MODEL, prompt)
+    
+    parser = StreamingJsonArrayParser("tests")
+    received = []
+    emitted = 0
+    for chunk in chunks:
+        received.append(chunk)
+        for test in parser.feed(chunk):
+            emitted += 1
+            print(f"📥 Received test {emitted}: {test.get('name', 'Unnamed test')}")
+            yield validate_test_case(test)
+    
+    response_text = "".join(received).strip()
+    remaining = []
+    if emitted == 0:
+        print("⚠️ No tests parsed from the stream, parsing the full response instead")
+        try:
+            remaining = extract_json_from_text(response_text).get("tests", [])
+        except ValueError:
+            if cached is not None:
+                RESPONSE_CACHE.delete(GEMINI_MODEL, prompt)
+            raise
+    elif not parser.closed:
+        # A truncated stream still yielded its complete tests, but must not be replayed from the cache
+        print("⚠️ Gemini stream ended before the tests array was closed")
+        if cached is not None:
+            RESPONSE_CACHE.delete(GEMINI_MODEL, prompt)
+        return
+    
+    if cached is None and use_cache:
+        RESPONSE_CACHE.put(GEMINI_MODEL, prompt, response_text)
+    for test in remaining:
+        yield validate_test_case(test)
+
+def write_playwright_tests(tests, output_dir="."):
+    """Save Playwright test cases as JSON and return the file path."""
+    playwright_path = os.path.join(output_dir, "playwright_tests.json")
+    with open(playwright_path, "w", encoding="utf-8") as f:
+        json.dump({"tests": tests}, f, indent=4, ensure_ascii=False)
+    
+    print(f"✅ Playwright test cases JSON generated: {playwright_path}")
+    return playwright_path
+
+def generate_playwright_testcases(test_plan_path, output_dir=".", gemini_key=None, stream=False, on_test=None):
+    """Generate Playwright test cases based on the test plan.
+    
+    With stream=True tests are parsed from the streamed response as they
+    arrive and each one is passed to on_test before the file is written.
+    """
+    if not gemini_key:
+        raise ValueError("Gemini API key is required")
+    
+    try:
+        # Read the test plan JSON
+        with open(test_plan_path, "r", encoding="utf-8") as f:
+            test_plan_data = json.load(f)
         
-        print(f"✅ Playwright test cases JSON generated: {playwright_path}")
-        return playwright_path
+        if stream:
+            tests = []
+            for test in stream_playwright_tests_for_plan(test_plan_data, gemini_key):
+                tests.append(test)
+                if on_test:
+                    on_test(test)
+        else:
+            tests = generate_playwright_tests_for_plan(test_plan_data, gemini_key)
+        return write_playwright_tests(tests, output_dir)
     
     except Exception as e:
         print(f"❌ Error generating Playwright test cases: {e}")
         return None
 
-def run_test_generation_pipeline(doc_path, output_dir=".", gemini_key=None):
-    """Run the test generation pipeline."""
+def generate_incremental(requirements_path, output_dir=".", gemini_key=None, chunk_chars=None,
+                         max_workers=CHUNK_CONCURRENCY):
+    """Regenerate the test plan and Playwright tests only for new or changed requirements.
+    
+    Results for unchanged requirements are taken from the generation
+    manifest in output_dir. Returns (test_plan_path, playwright_path), or
+    (None, None) on failure.
+    """
+    if not gemini_key:
+        raise ValueError("Gemini API key is required")
+    
+    try:
+        with open(requirements_path, "r", encoding="utf-8") as f:
+            requirements_data = json.load(f)
+        
+        requirements = requirements_data.get("requirements", [])
+        headings = set(requirements_data.get("headings", []))
+        hashes = [fingerprint_requirement(r) for r in requirements]
+        manifest = GenerationManifest.for_output_dir(output_dir)
+        
+        # Reuse stored groups whose requirements are all unchanged
+        covered = set()
+        group_ids = []
+        for gid in manifest.reusable_groups(hashes):
+            group_hashes = manifest.groups[gid]["requirements"]
+            if covered.isdisjoint(group_hashes):
+                covered.update(group_hashes)
+                group_ids.append(gid)
+        
+        pending = [i for i, h in enumerate(hashes) if h not in covered]
+        print(f"♻️ Reusing {len(group_ids)} groups for {len(requirements) - len(pending)} unchanged requirements")
+        print(f"🆕 {len(pending)} new or changed requirements to generate")
+        
+        # Generate the rest in chunks, one group per chunk
+        chunks = []
+        position = 0
+        for chunk in split_requirements(
+            [requirements[i] for i in pending],
+            [n for n, i in enumerate(pending) if i in headings],
+            chunk_chars or CHUNK_CHAR_BUDGET
+        ):
+            chunks.append(pending[position:position + len(chunk)])
+            position += len(chunk)
+        
+        def generate_group(indices):
+            test_plan = generate_testplan_for_text("\n".join(requirements[i] for i in indices), gemini_key)
+            tests = generate_playwright_tests_for_plan(test_plan, gemini_key)
+            return [hashes[i] for i in indices], test_plan, tests
+        
+        if chunks:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                for group_hashes, test_plan, tests in executor.map(generate_group, chunks):
+                    group_ids.append(manifest.add_group(group_hashes, test_plan, tests))
+        
+        # Assemble outputs in document order
+        first_position = {}
+        for i, h in enumerate(hashes):
+            first_position.setdefault(h, i)
+        group_ids.sort(key=lambda gid: min(first_position[h] for h in manifest.groups[gid]["requirements"]))
+        
+        manifest.retain(group_ids)
+        manifest.save()
+        
+        groups = [manifest.groups[gid] for gid in group_ids]
+        test_plan_path = write_test_plan(merge_test_plans([g["test_plan"] for g in groups]), output_dir)
+        playwright_path = write_playwright_tests([t for g in groups for t in g["tests"]], output_dir)
+        return test_plan_path, playwright_path
+    
+    except Exception as e:
+        print(f"❌ Error in incremental generation: {e}")
+        return None, None
+
+def run_test_generation_pipeline(doc_path, output_dir=".", gemini_key=None, chunk_chars=None, incremental=False,
+                                 stream=False, pipelined=False, base_url=None, progress=None, cancel_event=None,
+                                 on_event=None, browser_pool=None):
+    """Run the test generation pipeline.
+    
+    chunk_chars enables chunked, concurrent test plan generation for large
+    requirement documents. incremental regenerates only the requirements
+    that changed since the last run in output_dir. stream parses Playwright
+    tests from the streamed Gemini response as they arrive. pipelined feeds
+    streamed tests straight into running browser workers, overlapping
+    generation with execution. incremental cannot be combined with stream
+    or pipelined.
+    
+    base_url overrides the --base-url flag. progress(stage, message) is
+    called as the pipeline moves between stages, and cancel_event stops
+    test execution early when set. on_event receives live executor events.
+    browser_pool is a BrowserPool that runs the sync engine on warm browsers.
+    """
     if not gemini_key:
         print("❌ Error: Gemini API key is required")
         return False
+    if incremental and (stream or pipelined):
+        print("❌ Error: incremental generation cannot be combined with stream or pipelined mode")
+        return False
+    
+    def report_progress(stage, message=""):
+        if progress:
+            progress(stage, message)
     
     try:
+        import argparse
+        parser = argparse.ArgumentParser(description="Run automated Playwright tests")
+        parser.add_argument("--test-file", default=None, help="Path to test cases JSON file")
+        parser.add_argument("--headless", action="store_true", default=True, help="Run in headless mode")
+        parser.add_argument("--timeout", type=int, default=5000, help="Timeout in milliseconds")
+        parser.add_argument("--retries", type=int, default=2, help="Number of retries for failed tests")
+        parser.add_argument("--workers", type=int, default=1, help="Number of parallel browser workers")
+        parser.add_argument("--engine", choices=["sync", "async"], default="sync", help="Executor engine to use")
+        parser.add_argument("--concurrency", type=int, default=10, help="Concurrent pages for the async engine")
+        parser.add_argument("--wait-mode", choices=["fixed", "smart"], default="fixed", help="Fixed sleeps or event-driven waits after submissions")
+        parser.add_argument("--base-url", default="https://krishi-mitra-front.vercel.app/", help="Base URL for tests")
+        args, _ = parser.parse_known_args()
+        if base_url:
+            args.base_url = base_url
+        args.cancel_event = cancel_event
+        args.on_event = on_event
+        args.browser_pool = browser_pool
+        
         print("\n🚀 Starting test generation pipeline...")
         print(f"📄 Input document: {doc_path}")
         print(f"📁 Output directory: {output_dir}")
         
         # Step 1: Parse requirements from Word doc to JSON
         print("\n--- STEP 1: Parse Requirements ---")
+        report_progress("parse", "Parsing requirements")
         requirements_path = parse_requirements(doc_path, output_dir)
         if not requirements_path:
             return False
         
-        # Step 2: Generate test plan from requirements JSON
-        print("\n--- STEP 2: Generate Test Plan ---")
-        test_plan_path = generate_functionality_testplan(requirements_path, output_dir, gemini_key)
-        if not test_plan_path:
-            return False
-        
-        # Step 3: Generate Playwright test cases from test plan
-        print("\n--- STEP 3: Generate Playwright Tests ---")
-        playwright_path = generate_playwright_testcases(test_plan_path, output_dir, gemini_key)
-        if not playwright_path:
-            return False
+        if incremental:
+            # Steps 2-3: Regenerate only new or changed requirements
+            print("\n--- STEP 2-3: Incremental Test Generation ---")
+            report_progress("generate", "Regenerating tests for changed requirements")
+            test_plan_path, playwright_path = generate_incremental(requirements_path, output_dir, gemini_key, chunk_chars)
+            if not playwright_path:
+                return False
+        else:
+            # Step 2: Generate test plan from requirements JSON
+            print("\n--- STEP 2: Generate Test Plan ---")
+            report_progress("plan", "Generating test plan")
+            test_plan_path = generate_functionality_testplan(requirements_path, output_dir, gemini_key, chunk_chars=chunk_chars)
+            if not test_plan_path:
+                return False
+            
+            if pipelined:
+                # Steps 3-4: Generate Playwright tests and execute them as they arrive
+                print("\n--- STEP 3-4: Pipelined Generation and Execution ---")
+                report_progress("execute", "Generating and executing tests")
+                return run_pipelined_generation(test_plan_path, output_dir, gemini_key, args)
+            
+            # Step 3: Generate Playwright test cases from test plan
+            print("\n--- STEP 3: Generate Playwright Tests ---")
+            report_progress("generate", "Generating Playwright tests")
+            playwright_path = generate_playwright_testcases(test_plan_path, output_dir, gemini_key, stream=stream)
+            if not playwright_path:
+                return False
         
         # Print summary
         print("\n✅ Test generation pipeline completed!")
         print(f"📁 Requirements JSON: {requirements_path}")
         print(f"📁 Test Plan JSON: {test_plan_path}")
         print(f"📁 Playwright Tests JSON: {playwright_path}")
+        cache_stats = RESPONSE_CACHE.stats()
+        print(f"💾 Gemini response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
         
         # Display test count if available
         try:
@@ -537,57 +802,89 @@ def run_test_generation_pipeline(doc_path, output_dir=".", gemini_key=None):
                 print(f"📋 Generated {test_count} Playwright test cases")
         except Exception as e:
             print(f"⚠️ Could not count test cases: {e}")
-            
-        import argparse
-        parser = argparse.ArgumentParser(description="Run automated Playwright tests")
-        parser.add_argument("--test-file", default=playwright_path, help="Path to test cases JSON file")
-        parser.add_argument("--headless", action="store_true", default=True, help="Run in headless mode")
-        parser.add_argument("--timeout", type=int, default=5000, help="Timeout in milliseconds")
-        parser.add_argument("--retries", type=int, default=2, help="Number of retries for failed tests")
-        parser.add_argument("--base-url", default="https://krishi-mitra-front.vercel.app/", help="Base URL for tests")
-        args = parser.parse_args()
         
         # Load and execute test cases
+        report_progress("execute", "Executing tests")
+        test_file = args.test_file or playwright_path
         print(f"🚀 Starting automated test execution")
-        print(f"📋 Loading test cases from: {args.test_file}")
-        test_cases = load_test_cases(args.test_file)
+        print(f"📋 Loading test cases from: {test_file}")
+        test_cases = load_test_cases(test_file)
         
         # Add base URL to test cases if needed
         if test_cases and args.base_url:
             print(f"🌐 Base URL: {args.base_url}")
             for test in test_cases.get("tests", []):
-                # If the first step isn't navigate, add it
-                if not test["steps"] or test["steps"][0]["action"] != "navigate":
-                    test["steps"].insert(0, {
-                        "action": "navigate",
-                        "value": args.base_url
-                    })
-                # If the first step is navigate but has no value or needs to be prefixed
-                elif test["steps"][0]["action"] == "navigate":
-                    # If value is empty or a relative path
-                    if not test["steps"][0].get("value") or not test["steps"][0]["value"].startswith(("http://", "https://")):
-                        # For empty value, use base URL directly
-                        if not test["steps"][0].get("value"):
-                            test["steps"][0]["value"] = args.base_url
-                        # For relative paths, combine with base URL
-                        else:
-                            relative_path = test["steps"][0]["value"]
-                            base = args.base_url.rstrip('/')
-                            test["steps"][0]["value"] = f"{base}/{relative_path.lstrip('/')}"
+                apply_base_url(test, args.base_url)
         
         if test_cases:
-            remote_file = execute_test_cases(
-                test_cases, 
-                headless=args.headless, 
-                timeout=args.timeout,
-                retries=args.retries
-            )
+            if args.engine == "async":
+                remote_file = execute_test_cases_async(
+                    test_cases,
+                    headless=args.headless,
+                    timeout=args.timeout,
+                    retries=args.retries,
+                    concurrency=args.concurrency,
+                    cancel_event=cancel_event,
+                    on_event=on_event,
+                    suite=test_file,
+                    wait_mode=args.wait_mode
+                )
+            else:
+                remote_file = execute_test_cases(
+                    test_cases, 
+                    headless=args.headless, 
+                    timeout=args.timeout,
+                    retries=args.retries,
+                    workers=args.workers,
+                    cancel_event=cancel_event,
+                    on_event=on_event,
+                    suite=test_file,
+                    wait_mode=args.wait_mode,
+                    pool=browser_pool
+                )
                 
             return remote_file
     except Exception as e:
         print(f"❌ Error in test generation pipeline: {e}")
         return False
 
+def run_pipelined_generation(test_plan_path, output_dir, gemini_key, args):
+    """Stream Playwright tests from Gemini into browser workers and return the report path.
+    
+    The generated tests are still written to playwright_tests.json, without
+    the base URL applied, once generation has finished.
+    """
+    with open(test_plan_path, "r", encoding="utf-8") as f:
+        test_plan_data = json.load(f)
+    
+    generated = []
+    
+    def generated_tests():
+        for test in stream_playwright_tests_for_plan(test_plan_data, gemini_key):
+            generated.append(copy.deepcopy(test))
+            if args.base_url:
+                apply_base_url(test, args.base_url)
+            yield test
+    
+    print(f"🌐 Base URL: {args.base_url}")
+    remote_file = execute_test_stream(
+        generated_tests(),
+        headless=args.headless,
+        timeout=args.timeout,
+        retries=args.retries,
+        workers=args.workers,
+        cancel_event=args.cancel_event,
+        on_event=args.on_event,
+        suite=os.path.join(output_dir, "playwright_tests.json"),
+        wait_mode=args.wait_mode,
+        pool=args.browser_pool
+    )
+    
+    playwright_path = write_playwright_tests(generated, output_dir)
+    print(f"📋 Generated and executed {len(generated)} Playwright test cases")
+    print(f"📁 Playwright Tests JSON: {playwright_path}")
+    return remote_file
+
 def main():
     # Configuration parameters
     DOC_PATH = "C:/Users/dange/OneDrive/Desktop/Work/6th sem/test.docx"
@@ -601,8 +898,18 @@ def main():
     parser.add_argument('--generate', action='store_true', help='Generate test cases')
     parser.add_argument('--doc_path', type=str, default=DOC_PATH, help='Path to the requirements document')
     parser.add_argument('--output_dir', type=str, default=OUTPUT_DIR, help='Output directory for generated files')
+    parser.add_argument('--no-llm-cache', action='store_true', help='Bypass the Gemini response cache')
+    parser.add_argument('--chunk-chars', type=int, default=None, help='Split requirements into chunks of this many characters')
+    parser.add_argument('--incremental', action='store_true', help='Only regenerate tests for changed requirements')
+    parser.add_argument('--stream', action='store_true', help='Stream Playwright test generation from Gemini')
+    parser.add_argument('--pipelined', action='store_true', help='Execute generated tests while generation is still running')
+    
+    args, _ = parser.parse_known_args()
+    if args.incremental and (args.stream or args.pipelined):
+        parser.error("--incremental cannot be combined with --stream or --pipelined")
     
-    args = parser.parse_args()
+    if args.no_llm_cache:
+        RESPONSE_CACHE.enabled = False
     
     # If no action specified, default to generate
     if not args.generate:
@@ -612,7 +919,11 @@ def main():
     success = run_test_generation_pipeline(
         args.doc_path, 
         args.output_dir, 
-        GEMINI_KEY
+        GEMINI_KEY,
+        chunk_chars=args.chunk_chars,
+        incremental=args.incremental,
+        stream=args.stream,
+        pipelined=args.pipelined
     )
     
     if success: